@@ -22,6 +22,13 @@ if not require_auth():
 # Initialize data manager
 data_manager = DBDataManager()
 
+# Icons for Quick Search results by item type
+SEARCH_RESULT_ICONS = {
+    'resource': "📁",
+    'project': "🚀",
+    'documentation': "📚"
+}
+
 # Main page content
 def main():
     st.title("📚 V-Learn: Learning Resources on the Go")
@@ -61,31 +68,28 @@ def main():
     st.subheader("📊 Platform Statistics")
     col1, col2, col3, col4 = st.columns(4)
     
-    resources = data_manager.load_resources()
-    projects = data_manager.load_projects()
-    user_data = data_manager.load_user_data()
+    stats = data_manager.get_platform_stats(latest=3)
+    user_counts = data_manager.get_user_counters()
     
     with col1:
-        st.metric("Total Resources", len(resources))
+        st.metric("Total Resources", stats['totals']['resources'])
     
     with col2:
-        st.metric("Projects Showcased", len(projects))
+        st.metric("Projects Showcased", stats['totals']['projects'])
     
     with col3:
-        bookmarked = len(user_data.get("bookmarks", []))
-        st.metric("Your Bookmarks", bookmarked)
+        st.metric("Your Bookmarks", user_counts['bookmarks'])
     
     with col4:
-        completed = len(user_data.get("completed", []))
-        st.metric("Completed", completed)
+        st.metric("Completed", user_counts['completed'])
     
     # Recent activity
     st.markdown("---")
     st.subheader("📈 Recent Activity")
     
-    if resources:
+    recent_resources = stats['latest_resources']
+    if recent_resources:
         st.write("**Latest Resources:**")
-        recent_resources = sorted(resources, key=lambda x: x.get('timestamp', ''), reverse=True)[:3]
         for resource in recent_resources:
             with st.container():
                 col1, col2 = st.columns([3, 1])
@@ -97,9 +101,9 @@ def main():
     else:
         st.info("No resources uploaded yet. Be the first to share!")
     
-    if projects:
+    recent_projects = stats['latest_projects']
+    if recent_projects:
         st.write("**Latest Projects:**")
-        recent_projects = sorted(projects, key=lambda x: x.get('timestamp', ''), reverse=True)[:3]
         for project in recent_projects:
             with st.container():
                 col1, col2 = st.columns([3, 1])
@@ -138,10 +142,23 @@ def render_sidebar():
         st.subheader("🔍 Quick Search")
         search_term = st.text_input("Search resources/projects...")
         
-        if search_term and st.button("Search", use_container_width=True):
-            # Store search term in session state and navigate
-            st.session_state.search_term = search_term
-            st.switch_page("pages/2_📁_Resource_Library.py")
+        if search_term:
+            results = data_manager.search(search_term, limit=8)
+            if results:
+                for item in results:
+                    icon = SEARCH_RESULT_ICONS.get(item['item_type'], "•")
+                    if item['item_type'] == 'documentation':
+                        st.markdown(f"{icon} [{item['title']}]({item['url']})")
+                    else:
+                        st.markdown(f"{icon} **{item['title']}**")
+                        st.caption(f"By {item['author']} | {item['category']}")
+            else:
+                st.caption("No matches found")
+            
+            if st.button("Search Resource Library", use_container_width=True):
+                # Store search term in session state and navigate
+                st.session_state.search_term = search_term
+                st.switch_page("pages/2_📁_Resource_Library.py")
         
         st.markdown("---")
         
@@ -32,11 +32,8 @@ def main():
     filtered_links = doc_links
     
     if search_term:
-        filtered_links = [
-            link for link in filtered_links 
-            if search_term.lower() in link['title'].lower() 
-            or search_term.lower() in link['description'].lower()
-        ]
+        matching_ids = data_manager.search_item_ids(search_term, 'documentation')
+        filtered_links = [link for link in filtered_links if link['id'] in matching_ids]
     
     if selected_category != "All":
         filtered_links = [link for link in filtered_links if link['category'] == selected_category]
@@ -51,6 +48,9 @@ def main():
                 links_by_category[category] = []
             links_by_category[category].append(link)
         
+        # Load bookmark state once for every card
+        user_state = data_manager.get_user_state()
+        
         for category, links in links_by_category.items():
             st.subheader(f"📂 {category}")
             
@@ -68,7 +68,11 @@ def main():
                         with col2:
                             st.caption(f"⭐ {link['rating']}/5")
                         with col3:
-                            if st.button(f"Bookmark", key=f"bookmark_{link['id']}"):
+                            if user_state.is_bookmarked(link['id'], 'documentation'):
+                                if st.button("Unbookmark", key=f"bookmark_{link['id']}"):
+                                    data_manager.remove_bookmark(link['id'], 'documentation')
+                                    st.rerun()
+                            elif st.button(f"Bookmark", key=f"bookmark_{link['id']}"):
                                 data_manager.add_bookmark(link['id'], 'documentation')
                                 st.success("Bookmarked!")
                                 st.rerun()
@@ -1,8 +1,11 @@
 import streamlit as st
+import os
 import json
 from datetime import datetime
 from utils.db_data_manager import DBDataManager
-from utils.file_handler import FileHandler
+from utils.widgets import facet_selectbox
+from utils.file_handler import FileHandler, FileTooLargeError
+from utils.file_server import ensure_file_server
 from utils.auth_manager import require_auth, init_session_state, get_current_user
 
 st.set_page_config(page_title="Resource Library", page_icon="📁", layout="wide")
@@ -15,6 +18,20 @@ if not require_auth():
 data_manager = DBDataManager()
 file_handler = FileHandler()
 
+# Downloads are served by a separate static server so files never pass through Streamlit
+if os.getenv('FILE_SERVER_EMBEDDED', 'true').lower() in ('1', 'true', 'yes'):
+    ensure_file_server()
+
+# Sort options shown in the Library mapped to DatabaseManager sort keys
+SORT_OPTIONS = {
+    "Newest First": "newest",
+    "Oldest First": "oldest",
+    "Title A-Z": "title_asc",
+    "Title Z-A": "title_desc"
+}
+
+PAGE_SIZE = 20
+
 def main():
     st.title("📁 Resource Library")
     st.markdown("Upload, share, and discover learning resources from the community")
@@ -33,8 +50,6 @@ def main():
         upload_resource()
 
 def browse_resources():
-    resources = data_manager.load_resources()
-    
     # Search and filters
     col1, col2, col3 = st.columns([2, 1, 1])
     
@@ -46,48 +61,50 @@ def browse_resources():
         if 'search_term' in st.session_state:
             del st.session_state.search_term
     
+    # Facet counts reflect the choices made so far, read from the widgets' state
+    current_category = st.session_state.get('resource_category', "All")
+    current_type = st.session_state.get('resource_type', "All")
+    facets = data_manager.get_resource_facets(
+        search=search_term or None,
+        category=None if current_category == "All" else current_category,
+        type=None if current_type == "All" else current_type
+    )
+    
     with col2:
-        categories = list(set([resource['category'] for resource in resources])) if resources else []
-        selected_category = st.selectbox("Category", ["All"] + categories)
+        selected_category = facet_selectbox("Category", facets['category'], current_category, key='resource_category')
     
     with col3:
-        resource_types = list(set([resource['type'] for resource in resources])) if resources else []
-        selected_type = st.selectbox("Type", ["All"] + resource_types)
-    
-    # Filter resources
-    filtered_resources = resources
-    
-    if search_term:
-        filtered_resources = [
-            resource for resource in filtered_resources
-            if search_term.lower() in resource['title'].lower()
-            or search_term.lower() in resource.get('description', '').lower()
-            or search_term.lower() in resource['author'].lower()
-        ]
-    
-    if selected_category != "All":
-        filtered_resources = [r for r in filtered_resources if r['category'] == selected_category]
-    
-    if selected_type != "All":
-        filtered_resources = [r for r in filtered_resources if r['type'] == selected_type]
+        selected_type = facet_selectbox("Type", facets['type'], current_type, key='resource_type')
     
     # Sort options
-    sort_option = st.selectbox("Sort by", ["Newest First", "Oldest First", "Title A-Z", "Title Z-A"])
+    sort_option = st.selectbox("Sort by", list(SORT_OPTIONS.keys()))
     
-    if sort_option == "Newest First":
-        filtered_resources.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-    elif sort_option == "Oldest First":
-        filtered_resources.sort(key=lambda x: x.get('timestamp', ''))
-    elif sort_option == "Title A-Z":
-        filtered_resources.sort(key=lambda x: x['title'])
-    elif sort_option == "Title Z-A":
-        filtered_resources.sort(key=lambda x: x['title'], reverse=True)
+    # Go back to the first page whenever the filters change
+    filter_state = (search_term, selected_category, selected_type, sort_option)
+    if st.session_state.get('resource_filter_state') != filter_state:
+        st.session_state.resource_filter_state = filter_state
+        st.session_state.resource_page = 0
+    page = st.session_state.get('resource_page', 0)
+    
+    result = data_manager.query_resources(
+        search=search_term or None,
+        category=None if selected_category == "All" else selected_category,
+        type=None if selected_type == "All" else selected_type,
+        sort=SORT_OPTIONS[sort_option],
+        limit=PAGE_SIZE,
+        offset=page * PAGE_SIZE
+    )
+    filtered_resources = result['items']
     
     st.markdown("---")
     
     # Display resources
     if filtered_resources:
-        st.write(f"Found {len(filtered_resources)} resources")
+        total_pages = (result['total'] + PAGE_SIZE - 1) // PAGE_SIZE
+        st.write(f"Found {result['total']} resources (page {page + 1} of {total_pages})")
+        
+        # Load bookmark/completed/todo state once for every card on the page
+        user_state = data_manager.get_user_state()
         
         for resource in filtered_resources:
             with st.container():
@@ -113,17 +130,16 @@ def browse_resources():
                 
                 with col2:
                     # Action buttons
-                    user_data = data_manager.load_user_data()
                     resource_id = resource['id']
                     
-                    is_bookmarked = resource_id in user_data.get('bookmarks', [])
-                    is_completed = resource_id in user_data.get('completed', [])
-                    is_todo = resource_id in user_data.get('todo', [])
+                    is_bookmarked = user_state.is_bookmarked(resource_id)
+                    is_completed = user_state.is_completed(resource_id)
+                    is_todo = user_state.is_todo(resource_id)
                     
                     if st.button("⭐ Bookmark" if not is_bookmarked else "❌ Remove Bookmark", 
                                key=f"bookmark_{resource_id}"):
                         if is_bookmarked:
-                            data_manager.remove_bookmark(resource_id)
+                            data_manager.remove_bookmark(resource_id, 'resource')
                         else:
                             data_manager.add_bookmark(resource_id, 'resource')
                         st.rerun()
@@ -145,6 +161,19 @@ def browse_resources():
                         st.rerun()
                 
                 st.markdown("---")
+        
+        # Pagination controls
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if page > 0 and st.button("⬅️ Previous", key="resource_prev_page"):
+                st.session_state.resource_page = page - 1
+                st.rerun()
+        with col2:
+            st.caption(f"Page {page + 1} of {total_pages}")
+        with col3:
+            if result['has_more'] and st.button("Next ➡️", key="resource_next_page"):
+                st.session_state.resource_page = page + 1
+                st.rerun()
     else:
         st.info("No resources found matching your criteria. Try adjusting your search or filters.")
 
@@ -162,7 +191,7 @@ def display_resource_content(resource):
     elif resource['type'] == 'Image':
         if resource.get('file_path'):
             try:
-                st.image(resource['file_path'], caption=resource['title'], use_container_width=True)
+                st.image(file_handler.get_thumbnail(resource['file_path']), caption=resource['title'], use_container_width=True)
             except:
                 st.error("Image file not found")
     
@@ -176,8 +205,14 @@ def display_resource_content(resource):
     
     elif resource['type'] == 'File':
         if resource.get('file_path'):
-            st.markdown(f"📁 File: {resource.get('original_filename', 'Unknown')}")
-            # In a real app, you'd provide download functionality
+            filename = resource.get('original_filename') or 'Unknown'
+            file_info = file_handler.get_file_info(resource['file_path'])
+            if file_info['exists']:
+                st.markdown(f"📁 File: {filename} ({file_info['size'] / 1024:,.1f} KB)")
+                st.markdown(f"⬇️ [Download]({file_handler.get_download_url(resource['file_path'], resource.get('original_filename'))})")
+            else:
+                st.markdown(f"📁 File: {filename}")
+                st.caption("File not available")
 
 def upload_resource():
     st.subheader("📤 Upload New Resource")
@@ -236,26 +271,35 @@ def upload_resource():
                     original_filename = None
                     
                     # Handle file uploads
+                    upload_failed = False
                     if uploaded_file:
-                        # Generate temporary ID for file naming
-                        temp_id = 1  # Will be replaced with actual ID after database insert
-                        file_path = file_handler.save_uploaded_file(uploaded_file, temp_id)
+                        # Stored by content hash, so re-uploading the same file reuses it
+                        try:
+                            file_path = file_handler.store_uploaded_file(uploaded_file)
+                        except FileTooLargeError as e:
+                            st.error(str(e))
+                            upload_failed = True
+                        else:
+                            if not file_path:
+                                st.error("Could not save the uploaded file. Please try again.")
+                                upload_failed = True
                         original_filename = uploaded_file.name
                     
-                    # Add resource to database
-                    resource_id = data_manager.add_resource(
-                        title=title,
-                        author=author,
-                        category=category,
-                        type=resource_type,
-                        description=description,
-                        content=content,
-                        file_path=file_path,
-                        original_filename=original_filename
-                    )
-                    
-                    st.success("Resource uploaded successfully!")
-                    st.balloons()
+                    if not upload_failed:
+                        # Add resource to database
+                        resource_id = data_manager.add_resource(
+                            title=title,
+                            author=author,
+                            category=category,
+                            type=resource_type,
+                            description=description,
+                            content=content,
+                            file_path=file_path,
+                            original_filename=original_filename
+                        )
+                        
+                        st.success("Resource uploaded successfully!")
+                        st.balloons()
             else:
                 st.error("Please fill in all required fields.")
 
@@ -2,8 +2,10 @@ import streamlit as st
 import json
 from datetime import datetime
 from utils.db_data_manager import DBDataManager
-from utils.file_handler import FileHandler
+from utils.widgets import facet_selectbox
+from utils.file_handler import FileHandler, FileTooLargeError
 from utils.auth_manager import require_auth, init_session_state, get_current_user
+from utils.technologies import parse_technologies
 
 st.set_page_config(page_title="Project Showcase", page_icon="🚀", layout="wide")
 
@@ -15,6 +17,17 @@ if not require_auth():
 data_manager = DBDataManager()
 file_handler = FileHandler()
 
+# Sort options shown in the Showcase mapped to DatabaseManager sort keys
+SORT_OPTIONS = {
+    "Newest First": "newest",
+    "Oldest First": "oldest",
+    "Title A-Z": "title_asc",
+    "Most Liked": "most_liked"
+}
+
+# Cards fetched per "Load more"
+PAGE_SIZE = 12
+
 def main():
     st.title("🚀 Project Showcase")
     st.markdown("Showcase your projects and discover what others have built")
@@ -30,7 +43,8 @@ def main():
         upload_project()
 
 def browse_projects():
-    projects = data_manager.load_projects()
+    filter_options = data_manager.get_project_filter_options()
+    technologies = data_manager.get_technology_facets()
     
     # Search and filters
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -39,113 +53,143 @@ def browse_projects():
         search_term = st.text_input("🔍 Search projects...", placeholder="Title, description, or author")
     
     with col2:
-        categories = list(set([project['category'] for project in projects])) if projects else []
-        selected_category = st.selectbox("Category", ["All"] + categories)
+        selected_category = st.selectbox("Category", ["All"] + filter_options['categories'])
     
     with col3:
-        tech_stacks = []
-        for project in projects:
-            tech_stacks.extend(project.get('technologies', []))
-        unique_techs = list(set(tech_stacks))
-        selected_tech = st.selectbox("Technology", ["All"] + unique_techs)
-    
-    # Filter projects
-    filtered_projects = projects
-    
-    if search_term:
-        filtered_projects = [
-            project for project in filtered_projects
-            if search_term.lower() in project['title'].lower()
-            or search_term.lower() in project.get('description', '').lower()
-            or search_term.lower() in project['author'].lower()
-        ]
-    
-    if selected_category != "All":
-        filtered_projects = [p for p in filtered_projects if p['category'] == selected_category]
-    
-    if selected_tech != "All":
-        filtered_projects = [p for p in filtered_projects if selected_tech in p.get('technologies', [])]
+        current_tech = st.session_state.get('project_technology', "All")
+        selected_tech = facet_selectbox("Technology", technologies, current_tech, key='project_technology')
     
     # Sort options
-    sort_option = st.selectbox("Sort by", ["Newest First", "Oldest First", "Title A-Z"])
+    sort_option = st.selectbox("Sort by", list(SORT_OPTIONS.keys()))
+    
+    # Start again from the first page whenever the filters change; each "Load more"
+    # adds the keyset cursor of the next page
+    filter_state = (search_term, selected_category, selected_tech, sort_option)
+    if st.session_state.get('project_filter_state') != filter_state:
+        st.session_state.project_filter_state = filter_state
+        st.session_state.project_cursors = [None]
     
-    if sort_option == "Newest First":
-        filtered_projects.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-    elif sort_option == "Oldest First":
-        filtered_projects.sort(key=lambda x: x.get('timestamp', ''))
-    elif sort_option == "Title A-Z":
-        filtered_projects.sort(key=lambda x: x['title'])
+    filtered_projects = []
+    result = None
+    for cursor in st.session_state.project_cursors:
+        result = data_manager.query_projects(
+            search=search_term or None,
+            category=None if selected_category == "All" else selected_category,
+            technology=None if selected_tech == "All" else selected_tech,
+            sort=SORT_OPTIONS[sort_option],
+            limit=PAGE_SIZE,
+            cursor=cursor
+        )
+        filtered_projects.extend(result['items'])
     
     st.markdown("---")
     
     # Display projects
     if filtered_projects:
-        st.write(f"Found {len(filtered_projects)} projects")
+        st.write(f"Showing {len(filtered_projects)} of {result['total']} projects")
+        
+        # Load bookmark and like state once for every card
+        user_state = data_manager.get_user_state()
+        liked_ids = data_manager.get_liked_project_ids([project['id'] for project in filtered_projects])
         
         # Display in grid layout
         cols = st.columns(2)
         
         for idx, project in enumerate(filtered_projects):
             with cols[idx % 2]:
-                with st.container():
-                    # Project header
-                    st.subheader(project['title'])
-                    st.write(f"**By:** {project['author']}")
-                    
-                    # Project image/screenshot
-                    if project.get('image_path'):
-                        try:
-                            st.image(project['image_path'], use_container_width=True)
-                        except:
-                            st.info("📷 Image not available")
-                    else:
-                        st.info("📷 No preview image")
-                    
-                    # Description
-                    st.write(project.get('description', 'No description available'))
-                    
-                    # Technologies used
-                    if project.get('technologies'):
-                        st.write("**Technologies:**")
-                        tech_cols = st.columns(min(len(project['technologies']), 4))
-                        for i, tech in enumerate(project['technologies'][:4]):
-                            with tech_cols[i]:
-                                st.caption(f"🔧 {tech}")
-                        if len(project['technologies']) > 4:
-                            st.caption(f"... and {len(project['technologies']) - 4} more")
-                    
-                    # Project details
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.caption(f"📂 {project['category']}")
-                        st.caption(f"📅 {project.get('timestamp', 'Unknown date')}")
-                    
-                    with col2:
-                        if project.get('github_url'):
-                            st.markdown(f"[🔗 GitHub]({project['github_url']})")
-                        if project.get('demo_url'):
-                            st.markdown(f"[🌐 Live Demo]({project['demo_url']})")
-                        if project.get('external_link'):
-                            st.markdown(f"[📄 External Link]({project['external_link']})")
-                    
-                    # Action buttons
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("⭐ Bookmark", key=f"bookmark_proj_{project['id']}"):
-                            data_manager.add_bookmark(project['id'], 'project')
-                            st.success("Bookmarked!")
-                            st.rerun()
-                    
-                    with col2:
-                        if st.button("👍 Like", key=f"like_proj_{project['id']}"):
-                            # In a real app, this would increment likes
-                            st.success("Liked!")
-                    
-                    st.markdown("---")
-                    st.markdown("<br>", unsafe_allow_html=True)
+                display_project_card(project, user_state, project['id'] in liked_ids)
+        
+        if result['has_more'] and st.button("⬇️ Load more", key="project_load_more", use_container_width=True):
+            st.session_state.project_cursors.append(result['next_cursor'])
+            st.rerun()
     else:
         st.info("No projects found matching your criteria.")
 
+def display_project_card(project, user_state, is_liked):
+    """Render one Showcase card; the write-up fields are only fetched once it is expanded"""
+    with st.container():
+        # Project header
+        st.subheader(project['title'])
+        st.write(f"**By:** {project['author']}")
+        
+        # Project image/screenshot
+        if project.get('image_path'):
+            try:
+                st.image(file_handler.get_thumbnail(project['image_path']), use_container_width=True)
+            except:
+                st.info("📷 Image not available")
+        else:
+            st.info("📷 No preview image")
+        
+        # Description
+        st.write(project.get('description', 'No description available'))
+        
+        # Technologies used
+        if project.get('technologies'):
+            st.write("**Technologies:**")
+            tech_cols = st.columns(min(len(project['technologies']), 4))
+            for i, tech in enumerate(project['technologies'][:4]):
+                with tech_cols[i]:
+                    st.caption(f"🔧 {tech}")
+            if len(project['technologies']) > 4:
+                st.caption(f"... and {len(project['technologies']) - 4} more")
+        
+        # Project details
+        col1, col2 = st.columns(2)
+        with col1:
+            st.caption(f"📂 {project['category']}")
+            st.caption(f"📅 {project.get('timestamp', 'Unknown date')}")
+        
+        with col2:
+            if project.get('github_url'):
+                st.markdown(f"[🔗 GitHub]({project['github_url']})")
+            if project.get('demo_url'):
+                st.markdown(f"[🌐 Live Demo]({project['demo_url']})")
+            if project.get('external_link'):
+                st.markdown(f"[📄 External Link]({project['external_link']})")
+        
+        # Write-up, loaded on demand
+        expanded_projects = st.session_state.setdefault('expanded_projects', set())
+        is_expanded = project['id'] in expanded_projects
+        if st.button("🔼 Hide details" if is_expanded else "📖 Show details", key=f"details_proj_{project['id']}"):
+            if is_expanded:
+                expanded_projects.discard(project['id'])
+            else:
+                expanded_projects.add(project['id'])
+            st.rerun()
+        if is_expanded:
+            details = data_manager.get_project_details(project['id']) or {}
+            if details.get('status'):
+                st.caption(f"📌 {details['status']}")
+            for label, field in [("Challenges", 'challenges'), ("Learnings", 'learnings'), ("Future Plans", 'future_plans')]:
+                if details.get(field):
+                    st.write(f"**{label}:** {details[field]}")
+        
+        # Action buttons
+        col1, col2 = st.columns(2)
+        with col1:
+            if user_state.is_bookmarked(project['id'], 'project'):
+                if st.button("❌ Remove Bookmark", key=f"bookmark_proj_{project['id']}"):
+                    data_manager.remove_bookmark(project['id'], 'project')
+                    st.rerun()
+            elif st.button("⭐ Bookmark", key=f"bookmark_proj_{project['id']}"):
+                data_manager.add_bookmark(project['id'], 'project')
+                st.success("Bookmarked!")
+                st.rerun()
+        
+        with col2:
+            likes = project.get('likes') or 0
+            if is_liked:
+                if st.button(f"💙 Liked ({likes:,})", key=f"like_proj_{project['id']}", help="Remove your like"):
+                    data_manager.unlike_project(project['id'])
+                    st.rerun()
+            elif st.button(f"👍 Like ({likes:,})", key=f"like_proj_{project['id']}"):
+                data_manager.like_project(project['id'])
+                st.rerun()
+        
+        st.markdown("---")
+        st.markdown("<br>", unsafe_allow_html=True)
+
 def upload_project():
     st.subheader("📤 Share Your Project")
     
@@ -211,7 +255,7 @@ def upload_project():
         other_tech = st.text_input("Other Technologies (comma-separated)", 
                                   placeholder="Flutter, Django, PostgreSQL")
         if other_tech:
-            technologies.extend([tech.strip() for tech in other_tech.split(',')])
+            technologies.extend(parse_technologies(other_tech))
         
         # Project image/screenshot
         uploaded_image = st.file_uploader("Upload Project Screenshot/Image", 
@@ -230,29 +274,38 @@ def upload_project():
             if title and author and category and description:
                 # Handle image upload
                 image_path = None
+                upload_failed = False
                 if uploaded_image:
-                    temp_id = 1  # Will be replaced with actual ID after database insert
-                    image_path = file_handler.save_uploaded_file(uploaded_image, temp_id, prefix="project_")
-                
-                # Add project to database
-                project_id = data_manager.add_project(
-                    title=title,
-                    author=author,
-                    category=category,
-                    description=description,
-                    technologies=technologies,
-                    github_url=github_url,
-                    demo_url=demo_url,
-                    external_link=external_link,
-                    status=project_status,
-                    challenges=challenges,
-                    learnings=learnings,
-                    future_plans=future_plans,
-                    image_path=image_path
-                )
+                    try:
+                        image_path = file_handler.store_uploaded_file(uploaded_image)
+                    except FileTooLargeError as e:
+                        st.error(str(e))
+                        upload_failed = True
+                    else:
+                        if not image_path:
+                            st.error("Could not save the uploaded image. Please try again.")
+                            upload_failed = True
                 
-                st.success("Project shared successfully! Thank you for contributing to the community.")
-                st.balloons()
+                if not upload_failed:
+                    # Add project to database
+                    project_id = data_manager.add_project(
+                        title=title,
+                        author=author,
+                        category=category,
+                        description=description,
+                        technologies=technologies,
+                        github_url=github_url,
+                        demo_url=demo_url,
+                        external_link=external_link,
+                        status=project_status,
+                        challenges=challenges,
+                        learnings=learnings,
+                        future_plans=future_plans,
+                        image_path=image_path
+                    )
+                    
+                    st.success("Project shared successfully! Thank you for contributing to the community.")
+                    st.balloons()
             else:
                 st.error("Please fill in all required fields (marked with *).")
 
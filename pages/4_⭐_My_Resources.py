@@ -17,57 +17,37 @@ def main():
     st.markdown("---")
     
     # Load user data
-    user_data = data_manager.load_user_data()
-    resources = data_manager.load_resources()
-    projects = data_manager.load_projects()
-    doc_links = data_manager.load_documentation_links()
+    item_refs = data_manager.load_user_item_refs()
     
     # Tabs for different user resource categories
     tab1, tab2, tab3, tab4 = st.tabs(["📚 Bookmarks", "✅ Completed", "📝 Todo List", "📊 Progress"])
     
     with tab1:
-        display_bookmarks(user_data, resources, projects, doc_links)
+        display_bookmarks(item_refs)
     
     with tab2:
-        display_completed(user_data, resources)
+        display_completed(item_refs)
     
     with tab3:
-        display_todo(user_data, resources)
+        display_todo(item_refs)
     
     with tab4:
-        display_progress(user_data, resources, projects)
+        display_progress()
 
-def display_bookmarks(user_data, resources, projects, doc_links):
+def display_bookmarks(item_refs):
     st.subheader("📚 Your Bookmarked Items")
     
-    bookmarks = user_data.get('bookmarks', [])
+    bookmarks = item_refs.get('bookmarks', [])
     
     if not bookmarks:
         st.info("You haven't bookmarked anything yet. Start exploring and bookmark items you want to save!")
         return
     
     # Categorize bookmarks
-    resource_bookmarks = []
-    project_bookmarks = []
-    doc_bookmarks = []
-    
-    for bookmark_id in bookmarks:
-        # Check if it's a resource
-        resource = next((r for r in resources if r['id'] == bookmark_id), None)
-        if resource:
-            resource_bookmarks.append(resource)
-            continue
-        
-        # Check if it's a project
-        project = next((p for p in projects if p['id'] == bookmark_id), None)
-        if project:
-            project_bookmarks.append(project)
-            continue
-        
-        # Check if it's documentation
-        doc = next((d for d in doc_links if d['id'] == bookmark_id), None)
-        if doc:
-            doc_bookmarks.append(doc)
+    bookmarked_items = data_manager.get_items_by_refs(bookmarks, shape='summary')
+    resource_bookmarks = [item for item in bookmarked_items if item['item_type'] == 'resource']
+    project_bookmarks = [item for item in bookmarked_items if item['item_type'] == 'project']
+    doc_bookmarks = [item for item in bookmarked_items if item['item_type'] == 'documentation']
     
     # Display bookmarked resources
     if resource_bookmarks:
@@ -80,7 +60,7 @@ def display_bookmarks(user_data, resources, projects, doc_links):
                     st.caption(f"By {resource['author']} | {resource.get('description', '')[:100]}...")
                 with col2:
                     if st.button("❌", key=f"remove_res_{resource['id']}", help="Remove bookmark"):
-                        data_manager.remove_bookmark(resource['id'])
+                        data_manager.remove_bookmark(resource['id'], 'resource')
                         st.rerun()
         st.markdown("---")
     
@@ -95,7 +75,7 @@ def display_bookmarks(user_data, resources, projects, doc_links):
                     st.caption(f"By {project['author']} | {project.get('description', '')[:100]}...")
                 with col2:
                     if st.button("❌", key=f"remove_proj_{project['id']}", help="Remove bookmark"):
-                        data_manager.remove_bookmark(project['id'])
+                        data_manager.remove_bookmark(project['id'], 'project')
                         st.rerun()
         st.markdown("---")
     
@@ -110,23 +90,19 @@ def display_bookmarks(user_data, resources, projects, doc_links):
                     st.caption(doc.get('description', '')[:100] + "...")
                 with col2:
                     if st.button("❌", key=f"remove_doc_{doc['id']}", help="Remove bookmark"):
-                        data_manager.remove_bookmark(doc['id'])
+                        data_manager.remove_bookmark(doc['id'], 'documentation')
                         st.rerun()
 
-def display_completed(user_data, resources):
+def display_completed(item_refs):
     st.subheader("✅ Completed Resources")
     
-    completed_ids = user_data.get('completed', [])
+    completed_refs = item_refs.get('completed', [])
     
-    if not completed_ids:
+    if not completed_refs:
         st.info("You haven't marked any resources as completed yet. Start learning and track your progress!")
         return
     
-    completed_resources = []
-    for resource_id in completed_ids:
-        resource = next((r for r in resources if r['id'] == resource_id), None)
-        if resource:
-            completed_resources.append(resource)
+    completed_resources = data_manager.get_items_by_refs(completed_refs, shape='summary')
     
     if completed_resources:
         st.write(f"You have completed **{len(completed_resources)}** resources! 🎉")
@@ -144,20 +120,16 @@ def display_completed(user_data, resources):
     else:
         st.info("Some completed resources may no longer be available.")
 
-def display_todo(user_data, resources):
+def display_todo(item_refs):
     st.subheader("📝 Your Todo List")
     
-    todo_ids = user_data.get('todo', [])
+    todo_refs = item_refs.get('todo', [])
     
-    if not todo_ids:
+    if not todo_refs:
         st.info("Your todo list is empty. Add resources you want to learn later!")
         return
     
-    todo_resources = []
-    for resource_id in todo_ids:
-        resource = next((r for r in resources if r['id'] == resource_id), None)
-        if resource:
-            todo_resources.append(resource)
+    todo_resources = data_manager.get_items_by_refs(todo_refs, shape='summary')
     
     if todo_resources:
         st.write(f"You have **{len(todo_resources)}** items in your todo list:")
@@ -180,13 +152,14 @@ def display_todo(user_data, resources):
     else:
         st.info("Some todo resources may no longer be available.")
 
-def display_progress(user_data, resources, projects):
+def display_progress():
     st.subheader("📊 Your Learning Progress")
     
-    total_resources = len(resources)
-    completed_count = len(user_data.get('completed', []))
-    bookmarked_count = len(user_data.get('bookmarks', []))
-    todo_count = len(user_data.get('todo', []))
+    user_counts = data_manager.get_user_counters()
+    total_resources = data_manager.get_platform_stats()['totals']['resources']
+    completed_count = user_counts['completed']
+    bookmarked_count = user_counts['bookmarks']
+    todo_count = user_counts['todo']
     
     # Progress metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -2,7 +2,9 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from utils.db_data_manager import DBDataManager
+from utils.widgets import facet_selectbox
 from utils.auth_manager import require_auth, init_session_state, get_current_user, is_admin
+from utils.database import get_engine_stats
 
 st.set_page_config(page_title="Admin Panel", page_icon="🔧", layout="wide")
 
@@ -18,6 +20,9 @@ if not is_admin():
 
 data_manager = DBDataManager()
 
+# Resources listed per "Load more" in Manage Resources
+ADMIN_PAGE_SIZE = 50
+
 def main():
     st.title("🔧 Admin Panel")
     st.markdown("Manage V-Learn platform content and users")
@@ -75,25 +80,23 @@ def admin_dashboard():
     st.subheader("📊 Platform Overview")
     
     # Load data for statistics
-    resources = data_manager.load_resources()
-    projects = data_manager.load_projects()
-    doc_links = data_manager.load_documentation_links()
-    user_data = data_manager.load_user_data()
+    stats = data_manager.get_platform_stats(latest=5)
+    user_counts = data_manager.get_user_counters()
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Resources", len(resources))
+        st.metric("Total Resources", stats['totals']['resources'])
     
     with col2:
-        st.metric("Total Projects", len(projects))
+        st.metric("Total Projects", stats['totals']['projects'])
     
     with col3:
-        st.metric("Documentation Links", len(doc_links))
+        st.metric("Documentation Links", stats['totals']['documentation_links'])
     
     with col4:
-        total_interactions = len(user_data.get('bookmarks', [])) + len(user_data.get('completed', [])) + len(user_data.get('todo', []))
+        total_interactions = sum(user_counts.values())
         st.metric("User Interactions", total_interactions)
     
     st.markdown("---")
@@ -103,9 +106,8 @@ def admin_dashboard():
     
     with col1:
         st.subheader("📈 Recent Resources")
-        if resources:
-            recent_resources = sorted(resources, key=lambda x: x.get('timestamp', ''), reverse=True)[:5]
-            for resource in recent_resources:
+        if stats['latest_resources']:
+            for resource in stats['latest_resources']:
                 with st.container():
                     st.write(f"**{resource['title']}** - {resource['type']}")
                     st.caption(f"By {resource['author']} | {resource.get('timestamp', 'Unknown date')}")
@@ -114,14 +116,90 @@ def admin_dashboard():
     
     with col2:
         st.subheader("🚀 Recent Projects")
-        if projects:
-            recent_projects = sorted(projects, key=lambda x: x.get('timestamp', ''), reverse=True)[:5]
-            for project in recent_projects:
+        if stats['latest_projects']:
+            for project in stats['latest_projects']:
                 with st.container():
                     st.write(f"**{project['title']}** - {project['category']}")
                     st.caption(f"By {project['author']} | {project.get('timestamp', 'Unknown date')}")
         else:
             st.info("No projects available")
+    
+    # Breakdowns
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.subheader("📂 Resources by Category")
+        for category, count in sorted(stats['resources_by_category'].items(), key=lambda x: -x[1]):
+            st.write(f"{category}: **{count}**")
+    
+    with col2:
+        st.subheader("📄 Resources by Type")
+        for resource_type, count in sorted(stats['resources_by_type'].items(), key=lambda x: -x[1]):
+            st.write(f"{resource_type}: **{count}**")
+    
+    with col3:
+        st.subheader("🚀 Projects by Category")
+        for category, count in sorted(stats['projects_by_category'].items(), key=lambda x: -x[1]):
+            st.write(f"{category}: **{count}**")
+    
+    if st.button("🔄 Rebuild Counters", key="rebuild_counters", help="Recompute dashboard counters from the source tables"):
+        rebuilt = data_manager.rebuild_counters()
+        st.success(f"Rebuilt {rebuilt} counters")
+    
+    # Connection pool health
+    st.markdown("---")
+    with st.expander("🔌 Database Connections"):
+        engine_stats = get_engine_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Engines Created", engine_stats['engines_created'])
+        with col2:
+            st.metric("Engine Reuses", engine_stats['engine_reuses'] + engine_stats['manager_reuses'])
+        with col3:
+            st.metric("Schema Initializations", engine_stats['schema_initializations'])
+        with col4:
+            st.metric("Connection Reuse", f"{engine_stats['connection_reuse_rate'] * 100:.1f}%")
+        st.caption(f"{engine_stats['pool_connects']} new connections for {engine_stats['pool_checkouts']} checkouts")
+        for url, pool in engine_stats['pools'].items():
+            st.caption(f"{url}: {pool['status']}")
+    
+    with st.expander("🗄️ Catalog Cache"):
+        cache_stats = data_manager.get_cache_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Hits", cache_stats['hits'])
+        with col2:
+            st.metric("Misses", cache_stats['misses'])
+        with col3:
+            st.metric("Hit Rate", f"{cache_stats['hit_rate'] * 100:.1f}%")
+        with col4:
+            st.metric("Entries", f"{cache_stats['size']}/{cache_stats['max_entries']}")
+        st.caption(f"{cache_stats['invalidations']} invalidations, {cache_stats['evictions']} evictions, "
+                   f"{cache_stats['expirations']} expirations")
+    
+    with st.expander("⚙️ Background Jobs"):
+        job_stats = data_manager.get_job_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Queued", job_stats['queued'])
+        with col2:
+            st.metric("Running", job_stats['running'])
+        with col3:
+            st.metric("Done", job_stats['done'])
+        with col4:
+            st.metric("Failed", job_stats['failed'])
+        st.caption("Start a worker with `python -m utils.worker` to process queued jobs")
+        text_stats = data_manager.get_resource_text_stats()
+        st.caption(f"Extracted text indexed for {text_stats['resources']} files ({text_stats['pages']} pages)")
+        
+        for job in job_stats['recent_failures']:
+            st.write(f"**#{job['id']} {job['kind']}** ({job['status']}, attempt {job['attempts']}/{job['max_attempts']})")
+            st.caption(job['last_error'])
+        
+        if job_stats['failed'] and st.button("🔁 Retry Failed Jobs", key="retry_failed_jobs"):
+            retried = data_manager.retry_failed_jobs()
+            st.success(f"Re-queued {retried} jobs")
 
 def manage_documentation_links():
     st.subheader("📚 Manage Documentation Links")
@@ -180,36 +258,41 @@ def manage_documentation_links():
 def manage_resources():
     st.subheader("📁 Manage Resources")
     
-    resources = data_manager.load_resources()
+    # Facet counts reflect the choices made so far, read from the widgets' state
+    current = {
+        facet: st.session_state.get(f'admin_resource_{facet}', "All")
+        for facet in ('category', 'type', 'author')
+    }
+    filters = {facet: None if value == "All" else value for facet, value in current.items()}
+    facets = data_manager.get_resource_facets(**filters)
     
-    if resources:
-        st.write(f"**Total Resources: {len(resources)}**")
+    if facets['total'] or any(filters.values()):
+        st.write(f"**Total Resources: {facets['total']:,}**")
         
         # Filter options
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            categories = list(set([r['category'] for r in resources]))
-            filter_category = st.selectbox("Filter by Category", ["All"] + categories)
+            facet_selectbox("Filter by Category", facets['category'], current['category'], 'admin_resource_category')
         
         with col2:
-            types = list(set([r['type'] for r in resources]))
-            filter_type = st.selectbox("Filter by Type", ["All"] + types)
+            facet_selectbox("Filter by Type", facets['type'], current['type'], 'admin_resource_type')
         
         with col3:
-            authors = list(set([r['author'] for r in resources]))
-            filter_author = st.selectbox("Filter by Author", ["All"] + authors)
+            facet_selectbox("Filter by Author", facets['author'], current['author'], 'admin_resource_author')
         
-        # Apply filters
-        filtered_resources = resources
-        if filter_category != "All":
-            filtered_resources = [r for r in filtered_resources if r['category'] == filter_category]
-        if filter_type != "All":
-            filtered_resources = [r for r in filtered_resources if r['type'] == filter_type]
-        if filter_author != "All":
-            filtered_resources = [r for r in filtered_resources if r['author'] == filter_author]
+        # Start from the first page whenever the filters change
+        if st.session_state.get('admin_resource_filters') != filters:
+            st.session_state.admin_resource_filters = filters
+            st.session_state.admin_resource_cursors = [None]
         
-        st.write(f"**Showing {len(filtered_resources)} resources**")
+        filtered_resources = []
+        result = None
+        for cursor in st.session_state.admin_resource_cursors:
+            result = data_manager.query_resources(limit=ADMIN_PAGE_SIZE, cursor=cursor, **filters)
+            filtered_resources.extend(result['items'])
+        
+        st.write(f"**Showing {len(filtered_resources)} of {result['total']:,} resources**")
         
         # Display resources
         for resource in filtered_resources:
@@ -233,18 +316,30 @@ def manage_resources():
                     
                     if st.button("✏️ Edit", key=f"edit_res_{resource['id']}"):
                         st.info("Edit functionality would be implemented here")
+        
+        if result['has_more'] and st.button("⬇️ Load more", key="admin_resource_load_more"):
+            st.session_state.admin_resource_cursors.append(result['next_cursor'])
+            st.rerun()
     else:
         st.info("No resources found")
 
 def manage_projects():
     st.subheader("🚀 Manage Projects")
     
-    projects = data_manager.load_projects()
+    # Pages of project cards; each "Load more" adds the keyset cursor of the next page
+    cursors = st.session_state.setdefault('admin_project_cursors', [None])
+    projects = []
+    result = None
+    for cursor in cursors:
+        result = data_manager.query_projects(limit=ADMIN_PAGE_SIZE, cursor=cursor)
+        projects.extend(result['items'])
     
     if projects:
-        st.write(f"**Total Projects: {len(projects)}**")
+        st.write(f"**Total Projects: {result['total']:,}**")
+        st.write(f"**Showing {len(projects)} of {result['total']:,} projects**")
         
         # Display projects
+        expanded_projects = st.session_state.setdefault('admin_expanded_projects', set())
         for project in projects:
             with st.expander(f"{project['title']} - {project['category']}"):
                 col1, col2 = st.columns([3, 1])
@@ -252,7 +347,6 @@ def manage_projects():
                 with col1:
                     st.write(f"**Author:** {project['author']}")
                     st.write(f"**Description:** {project.get('description', 'No description')}")
-                    st.write(f"**Status:** {project.get('status', 'Unknown')}")
                     st.write(f"**Technologies:** {', '.join(project.get('technologies', []))}")
                     
                     if project.get('github_url'):
@@ -262,6 +356,23 @@ def manage_projects():
                         st.write(f"**Demo:** {project['demo_url']}")
                     
                     st.write(f"**Created:** {project.get('timestamp', 'Unknown')}")
+                    
+                    # Write-up, loaded on demand: expander bodies run even while collapsed
+                    is_expanded = project['id'] in expanded_projects
+                    if st.button("🔼 Hide write-up" if is_expanded else "📖 Show write-up",
+                                 key=f"admin_details_proj_{project['id']}"):
+                        if is_expanded:
+                            expanded_projects.discard(project['id'])
+                        else:
+                            expanded_projects.add(project['id'])
+                        st.rerun()
+                    if is_expanded:
+                        details = data_manager.get_project_details(project['id']) or {}
+                        st.write(f"**Status:** {details.get('status') or 'Unknown'}")
+                        for label, field in [("Challenges", 'challenges'), ("Learnings", 'learnings'),
+                                             ("Future Plans", 'future_plans')]:
+                            if details.get(field):
+                                st.write(f"**{label}:** {details[field]}")
                 
                 with col2:
                     if st.button("🗑️ Delete", key=f"del_proj_{project['id']}"):
@@ -269,6 +380,10 @@ def manage_projects():
                     
                     if st.button("✏️ Edit", key=f"edit_proj_{project['id']}"):
                         st.info("Edit functionality would be implemented here")
+        
+        if result['has_more'] and st.button("⬇️ Load more", key="admin_project_load_more"):
+            cursors.append(result['next_cursor'])
+            st.rerun()
     else:
         st.info("No projects found")
 
@@ -1,6 +1,7 @@
 import hashlib
+import threading
 import streamlit as st
-from utils.database import DatabaseManager
+from utils.database import get_database_manager
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -19,14 +20,21 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime)
 
+# Database URLs whose users table and default admin are already set up in this process
+_auth_initialized_urls = set()
+_auth_lock = threading.Lock()
+
 class AuthManager:
     def __init__(self):
-        self.db = DatabaseManager()
-        # Add User table to existing database
-        User.metadata.create_all(bind=self.db.engine)
-        
-        # Create default admin user if not exists
-        self.create_default_admin()
+        self.db = get_database_manager()
+        with _auth_lock:
+            if self.db.database_url not in _auth_initialized_urls:
+                # Add User table to existing database
+                User.metadata.create_all(bind=self.db.engine)
+                
+                # Create default admin user if not exists
+                self.create_default_admin()
+                _auth_initialized_urls.add(self.db.database_url)
     
     def hash_password(self, password):
         """Hash a password for storing"""
@@ -0,0 +1,78 @@
+import os
+import hashlib
+import tempfile
+from utils.storage import CHUNK_SIZE
+
+# Blob IDs stored in Resource.file_path / Project.image_path look like "sha256:<hex digest>"
+BLOB_ID_PREFIX = "sha256:"
+
+def is_blob_id(value):
+    """Check whether a stored file reference is a blob ID rather than a legacy path"""
+    return bool(value) and value.startswith(BLOB_ID_PREFIX)
+
+def blob_key(blob_id):
+    """Storage key of a blob: ab/cd/<sha256 hex>"""
+    digest = blob_id[len(BLOB_ID_PREFIX):]
+    return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+class BlobStore:
+    """Content-addressed file store sharded as ab/cd/<sha256> in a storage backend.
+    
+    Identical content is stored once; reference counts live in the blobs table
+    and are maintained by DatabaseManager alongside the rows that point at blobs.
+    """
+    
+    def __init__(self, storage):
+        self.storage = storage
+    
+    def path_for(self, blob_id):
+        """Get the local path of a blob, or None if the backend is remote"""
+        return self.storage.local_path(blob_key(blob_id))
+    
+    def exists(self, blob_id):
+        return self.storage.exists(blob_key(blob_id))
+    
+    def put_stream(self, stream):
+        """Store a readable stream, hashing it while it is spooled to a temporary file.
+        
+        Returns (blob_id, size, created) where created is False if identical
+        content was already stored.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.storage.temp_dir, prefix='.blob_', suffix='.part')
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    temp_file.write(chunk)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            
+            blob_id = BLOB_ID_PREFIX + digest.hexdigest()
+            key = blob_key(blob_id)
+            if self.storage.exists(key):
+                os.remove(temp_path)
+                # Refresh the mtime so the upload GC's grace period covers the new reference
+                self.storage.touch(key)
+                return blob_id, size, False
+            
+            self.storage.store_file(key, temp_path)
+            return blob_id, size, True
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def put_file(self, file_path):
+        """Store an existing local file's content and return (blob_id, size, created)"""
+        with open(file_path, 'rb') as f:
+            return self.put_stream(f)
+    
+    def delete(self, blob_id):
+        """Remove a blob from storage; returns False if it didn't exist"""
+        return self.storage.delete(blob_key(blob_id))
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+class ReadThroughCache:
+    """Size-bounded LRU cache with TTL and generation-based invalidation.
+    
+    Entries live in namespaces (e.g. 'resources'). Each namespace has a generation
+    number read from `generation_source`, a callable returning {namespace: generation}.
+    A cached entry is only served while its namespace's generation is unchanged, so a
+    write in another process that bumps the generation invalidates it here too.
+    The source is consulted at most once every `generation_check_interval` seconds.
+    """
+    
+    def __init__(self, generation_source, max_entries=None, ttl=None, generation_check_interval=None):
+        self.generation_source = generation_source
+        self.max_entries = max_entries or int(os.getenv('CATALOG_CACHE_SIZE', '256'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('CATALOG_CACHE_TTL', '300'))
+        self.generation_check_interval = (
+            generation_check_interval if generation_check_interval is not None
+            else float(os.getenv('CATALOG_CACHE_GENERATION_CHECK', '1'))
+        )
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._generations_checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+    
+    def get_or_load(self, namespace, key, loader, ttl=None):
+        """Return the cached value for (namespace, key), calling loader() on a miss.
+        
+        ttl overrides the cache-wide TTL for this entry.
+        """
+        generation = self._current_generation(namespace)
+        cache_key = (namespace, key)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                entry_generation, expires_at, value = entry
+                if entry_generation == generation and expires_at > now:
+                    self._entries.move_to_end(cache_key)
+                    self._stats['hits'] += 1
+                    return value
+                del self._entries[cache_key]
+                if entry_generation == generation:
+                    self._stats['expirations'] += 1
+                else:
+                    self._stats['invalidations'] += 1
+            self._stats['misses'] += 1
+        
+        # Load outside the lock so slow queries don't block other readers
+        value = loader()
+        
+        with self._lock:
+            self._entries[cache_key] = (generation, now + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return value
+    
+    def invalidate(self, namespace, generation=None):
+        """Drop a namespace after a local write, optionally recording its new generation"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == namespace]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+            if generation is not None:
+                self._generations[namespace] = generation
+            else:
+                # Force a re-read of the generations on next access
+                self._generations_checked_at = 0.0
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._generations_checked_at = 0.0
+    
+    def stats(self):
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['max_entries'] = self.max_entries
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+    
+    def _current_generation(self, namespace):
+        now = time.monotonic()
+        with self._lock:
+            fresh = now - self._generations_checked_at < self.generation_check_interval
+            if fresh:
+                return self._generations.get(namespace, 0)
+        generations = self.generation_source()
+        with self._lock:
+            self._generations.update(generations)
+            self._generations_checked_at = now
+            return self._generations.get(namespace, 0)
@@ -1,11 +1,25 @@
-import json
 import os
 from datetime import datetime
+from utils.json_store import RecordStore, ListSetStore, get_json_store
+from utils.data_store import DataStore
 
-class DataManager:
-    def __init__(self):
-        self.data_dir = "data"
+USER_LISTS = ("bookmarks", "completed", "todo")
+
+class DataManager(DataStore):
+    """JSON-file backend. Each file is a JsonLogStore, so writes append to a log
+    instead of rewriting the file and are safe across concurrent processes."""
+    
+    def __init__(self, data_dir="data"):
+        self.data_dir = data_dir
         self.ensure_data_directory()
+        self.documentation_links = get_json_store(
+            os.path.join(self.data_dir, "documentation_links.json"), RecordStore, self.get_default_documentation_links()
+        )
+        self.resources = get_json_store(os.path.join(self.data_dir, "resources.json"), RecordStore, [])
+        self.projects = get_json_store(os.path.join(self.data_dir, "projects.json"), RecordStore, [])
+        self.user_data = get_json_store(
+            os.path.join(self.data_dir, "user_data.json"), ListSetStore, {name: [] for name in USER_LISTS}
+        )
         self.ensure_data_files()
     
     def ensure_data_directory(self):
@@ -15,29 +29,10 @@ class DataManager:
     
     def ensure_data_files(self):
         """Ensure all data files exist with default content"""
-        # Documentation links
-        doc_file = os.path.join(self.data_dir, "documentation_links.json")
-        if not os.path.exists(doc_file):
-            self.save_documentation_links(self.get_default_documentation_links())
-        
-        # Resources
-        resources_file = os.path.join(self.data_dir, "resources.json")
-        if not os.path.exists(resources_file):
-            self.save_resources([])
-        
-        # Projects
-        projects_file = os.path.join(self.data_dir, "projects.json")
-        if not os.path.exists(projects_file):
-            self.save_projects([])
-        
-        # User data
-        user_file = os.path.join(self.data_dir, "user_data.json")
-        if not os.path.exists(user_file):
-            self.save_user_data({
-                "bookmarks": [],
-                "completed": [],
-                "todo": []
-            })
+        # Compacting a new store writes its default content as the snapshot
+        for store in (self.documentation_links, self.resources, self.projects, self.user_data):
+            if not store.exists():
+                store.compact()
     
     def get_default_documentation_links(self):
         """Return default documentation links"""
@@ -127,96 +122,122 @@ class DataManager:
     def load_documentation_links(self):
         """Load documentation links from file"""
         try:
-            with open(os.path.join(self.data_dir, "documentation_links.json"), 'r') as f:
-                return json.load(f)
-        except:
+            return self.documentation_links.load()
+        except Exception:
             return self.get_default_documentation_links()
     
     def save_documentation_links(self, links):
         """Save documentation links to file"""
-        with open(os.path.join(self.data_dir, "documentation_links.json"), 'w') as f:
-            json.dump(links, f, indent=2)
+        self.documentation_links.save(links)
+    
+    def add_documentation_link(self, title, url, description, category, rating=5):
+        """Add a new documentation link"""
+        return self.documentation_links.insert({
+            "title": title,
+            "url": url,
+            "description": description,
+            "category": category,
+            "rating": rating
+        })
     
     def load_resources(self):
         """Load resources from file"""
         try:
-            with open(os.path.join(self.data_dir, "resources.json"), 'r') as f:
-                return json.load(f)
-        except:
+            return self.resources.load()
+        except Exception:
             return []
     
     def save_resources(self, resources):
         """Save resources to file"""
-        with open(os.path.join(self.data_dir, "resources.json"), 'w') as f:
-            json.dump(resources, f, indent=2)
+        self.resources.save(resources)
+    
+    def add_resource(self, title, author, category, type, description, content=None, file_path=None, original_filename=None):
+        """Add a new resource"""
+        return self.resources.insert({
+            "title": title,
+            "author": author,
+            "category": category,
+            "type": type,
+            "description": description,
+            "content": content,
+            "file_path": file_path,
+            "original_filename": original_filename,
+            "timestamp": str(datetime.utcnow())
+        })
     
     def load_projects(self):
         """Load projects from file"""
         try:
-            with open(os.path.join(self.data_dir, "projects.json"), 'r') as f:
-                return json.load(f)
-        except:
+            return self.projects.load()
+        except Exception:
             return []
     
     def save_projects(self, projects):
         """Save projects to file"""
-        with open(os.path.join(self.data_dir, "projects.json"), 'w') as f:
-            json.dump(projects, f, indent=2)
+        self.projects.save(projects)
+    
+    def add_project(self, title, author, category, description, technologies=None, github_url=None,
+                    demo_url=None, external_link=None, status=None, challenges=None, learnings=None, future_plans=None,
+                    image_path=None):
+        """Add a new project"""
+        return self.projects.insert({
+            "title": title,
+            "author": author,
+            "category": category,
+            "description": description,
+            "technologies": technologies or [],
+            "github_url": github_url,
+            "demo_url": demo_url,
+            "external_link": external_link,
+            "status": status,
+            "challenges": challenges,
+            "learnings": learnings,
+            "future_plans": future_plans,
+            "image_path": image_path,
+            "likes": 0,
+            "timestamp": str(datetime.utcnow())
+        })
     
     def load_user_data(self):
         """Load user data from file"""
         try:
-            with open(os.path.join(self.data_dir, "user_data.json"), 'r') as f:
-                return json.load(f)
-        except:
-            return {"bookmarks": [], "completed": [], "todo": []}
+            user_data = self.user_data.load()
+        except Exception:
+            user_data = {}
+        for name in USER_LISTS:
+            user_data.setdefault(name, [])
+        return user_data
     
     def save_user_data(self, user_data):
         """Save user data to file"""
-        with open(os.path.join(self.data_dir, "user_data.json"), 'w') as f:
-            json.dump(user_data, f, indent=2)
+        self.user_data.save(user_data)
+    
+    def compact(self):
+        """Fold every write-ahead log into its snapshot file"""
+        for store in (self.documentation_links, self.resources, self.projects, self.user_data):
+            store.compact()
     
     def add_bookmark(self, item_id, item_type=None):
         """Add item to bookmarks"""
-        user_data = self.load_user_data()
-        if item_id not in user_data.get("bookmarks", []):
-            user_data.setdefault("bookmarks", []).append(item_id)
-            self.save_user_data(user_data)
+        self.user_data.update(add=[("bookmarks", item_id)])
     
-    def remove_bookmark(self, item_id):
+    def remove_bookmark(self, item_id, item_type=None):
         """Remove item from bookmarks"""
-        user_data = self.load_user_data()
-        if item_id in user_data.get("bookmarks", []):
-            user_data["bookmarks"].remove(item_id)
-            self.save_user_data(user_data)
+        self.user_data.update(remove=[("bookmarks", item_id)])
     
     def add_completed(self, item_id):
         """Add item to completed list"""
-        user_data = self.load_user_data()
-        if item_id not in user_data.get("completed", []):
-            user_data.setdefault("completed", []).append(item_id)
-            # Remove from todo if present
-            if item_id in user_data.get("todo", []):
-                user_data["todo"].remove(item_id)
-            self.save_user_data(user_data)
+        # Remove from todo if present
+        self.user_data.update(add=[("completed", item_id)], remove=[("todo", item_id)])
     
     def remove_completed(self, item_id):
         """Remove item from completed list"""
-        user_data = self.load_user_data()
-        if item_id in user_data.get("completed", []):
-            user_data["completed"].remove(item_id)
-            self.save_user_data(user_data)
+        self.user_data.update(remove=[("completed", item_id)])
     
     def add_todo(self, item_id):
         """Add item to todo list"""
-        user_data = self.load_user_data()
-        if item_id not in user_data.get("todo", []):
-            user_data.setdefault("todo", []).append(item_id)
-            self.save_user_data(user_data)
+        self.user_data.update(add=[("todo", item_id)])
     
     def remove_todo(self, item_id):
         """Remove item from todo list"""
-        user_data = self.load_user_data()
-        if item_id in user_data.get("todo", []):
-            user_data["todo"].remove(item_id)
-            self.save_user_data(user_data)
+        self.user_data.update(remove=[("todo", item_id)])
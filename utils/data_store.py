@@ -0,0 +1,84 @@
+import os
+
+class DataStore:
+    """What every data backend provides: the catalog (documentation links, resources,
+    projects) and one user's bookmarks, completed and todo lists.
+    
+    Backends: utils.data_manager.DataManager (JSON files) and
+    utils.db_data_manager.DBDataManager (SQLite or Postgres). Select one with
+    DATA_BACKEND; see get_data_store(). The pages also use search, statistics and
+    paging that only the database backends provide.
+    """
+    
+    def load_documentation_links(self):
+        raise NotImplementedError
+    
+    def add_documentation_link(self, title, url, description, category, rating=5):
+        """Add a link and return its ID"""
+        raise NotImplementedError
+    
+    def load_resources(self):
+        raise NotImplementedError
+    
+    def add_resource(self, title, author, category, type, description, content=None, file_path=None, original_filename=None):
+        """Add a resource and return its ID"""
+        raise NotImplementedError
+    
+    def load_projects(self):
+        raise NotImplementedError
+    
+    def add_project(self, title, author, category, description, technologies=None, github_url=None,
+                    demo_url=None, external_link=None, status=None, challenges=None, learnings=None, future_plans=None,
+                    image_path=None):
+        """Add a project and return its ID"""
+        raise NotImplementedError
+    
+    def load_user_data(self):
+        """{'bookmarks': [...], 'completed': [...], 'todo': [...]} of item IDs"""
+        raise NotImplementedError
+    
+    def save_user_data(self, user_data):
+        raise NotImplementedError
+    
+    def add_bookmark(self, item_id, item_type='resource'):
+        raise NotImplementedError
+    
+    def remove_bookmark(self, item_id, item_type=None):
+        raise NotImplementedError
+    
+    def add_completed(self, item_id):
+        """Mark an item completed, removing it from todo"""
+        raise NotImplementedError
+    
+    def remove_completed(self, item_id):
+        raise NotImplementedError
+    
+    def add_todo(self, item_id):
+        raise NotImplementedError
+    
+    def remove_todo(self, item_id):
+        raise NotImplementedError
+
+def get_data_store(backend=None, location=None, user_id=None):
+    """Build the data store for a backend (default: DATA_BACKEND).
+    
+    location is the data directory for json, the database file for sqlite and the
+    database URL for postgres; by default the configured one is used.
+    """
+    from utils.database import get_data_backend, get_sqlite_url, DATA_BACKENDS
+    
+    backend = (backend or get_data_backend()).lower()
+    if backend == 'json':
+        from utils.data_manager import DataManager
+        return DataManager(data_dir=location or os.getenv('JSON_DATA_DIR', 'data'))
+    
+    from utils.db_data_manager import DBDataManager
+    if backend == 'sqlite':
+        return DBDataManager(database_url=get_sqlite_url(location), user_id=user_id)
+    if backend == 'postgres':
+        # Never fall back to whatever DATABASE_URL holds, which may be a SQLite file
+        database_url = location or os.getenv('DATABASE_URL')
+        if not (database_url or '').startswith('postgres'):
+            raise ValueError("The postgres backend needs a postgresql:// URL (location or DATABASE_URL)")
+        return DBDataManager(database_url=database_url, user_id=user_id)
+    raise ValueError(f"Unknown data backend: {backend} (expected one of {', '.join(DATA_BACKENDS)})")
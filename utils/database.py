@@ -1,12 +1,22 @@
 import os
 import json
-from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, func, or_, and_, select, literal, null, union_all, Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from utils.search import SearchIndex
+from utils.blob_store import BLOB_ID_PREFIX, is_blob_id
+from utils.text_extraction import can_extract
+from utils.technologies import normalize_technologies, technology_key
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, deferred, undefer_group
 
 Base = declarative_base()
 
+# Long text columns are deferred: they load only for reads that ask for the detail shape
+LONG_TEXT_GROUP = 'long_text'
+
 class DocumentationLink(Base):
     __tablename__ = 'documentation_links'
     
@@ -27,7 +37,7 @@ class Resource(Base):
     category = Column(String(100))
     type = Column(String(50))  # Link, Text, Image, Video, File
     description = Column(Text)
-    content = Column(Text)  # For text content or URLs
+    content = deferred(Column(Text), group=LONG_TEXT_GROUP)  # For text content or URLs
     file_path = Column(String(500))  # For uploaded files
     original_filename = Column(String(255))
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -45,49 +55,310 @@ class Project(Base):
     demo_url = Column(String(500))
     external_link = Column(String(500))
     status = Column(String(50))
-    challenges = Column(Text)
-    learnings = Column(Text)
-    future_plans = Column(Text)
+    challenges = deferred(Column(Text), group=LONG_TEXT_GROUP)
+    learnings = deferred(Column(Text), group=LONG_TEXT_GROUP)
+    future_plans = deferred(Column(Text), group=LONG_TEXT_GROUP)
     image_path = Column(String(500))
     likes = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class ProjectTechnology(Base):
+    __tablename__ = 'project_technologies'
+    __table_args__ = (
+        Index('ix_project_technologies_tech_key', 'tech_key', 'project_id'),
+    )
+    
+    project_id = Column(Integer, primary_key=True)
+    tech_key = Column(String(100), primary_key=True)  # lowercased canonical name, see utils.technologies
+    name = Column(String(100), nullable=False)  # canonical display name
+
+class ProjectLike(Base):
+    __tablename__ = 'project_likes'
+    __table_args__ = (
+        Index('ix_project_likes_user_id', 'user_id', 'project_id'),
+    )
+    
+    project_id = Column(Integer, primary_key=True)
+    user_id = Column(String(255), primary_key=True)  # one like per user and project
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 class UserData(Base):
     __tablename__ = 'user_data'
     
     id = Column(Integer, primary_key=True)
     user_id = Column(String(255), default='default_user')  # For future multi-user support
-    bookmarks = Column(JSON)  # Store as JSON array
-    completed = Column(JSON)  # Store as JSON array
-    todo = Column(JSON)  # Store as JSON array
+    bookmarks = Column(JSON)  # Legacy JSON array, migrated into user_item_state
+    completed = Column(JSON)  # Legacy JSON array, migrated into user_item_state
+    todo = Column(JSON)  # Legacy JSON array, migrated into user_item_state
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+# Item types stored before bookmarks carried their type
+UNTYPED_ITEM = 'item'
+
+class UserItemState(Base):
+    __tablename__ = 'user_item_state'
+    __table_args__ = (
+        Index('ix_user_item_state_unique', 'user_id', 'state', 'item_type', 'item_id', unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String(255), nullable=False)
+    item_type = Column(String(50), nullable=False, default=UNTYPED_ITEM)  # resource, project, documentation
+    item_id = Column(Integer, nullable=False)
+    state = Column(String(20), nullable=False)  # bookmarks, completed, todo
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+USER_STATES = ('bookmarks', 'completed', 'todo')
+
+class CacheGeneration(Base):
+    __tablename__ = 'cache_generations'
+    
+    namespace = Column(String(100), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+class PlatformCounter(Base):
+    __tablename__ = 'platform_counters'
+    
+    counter = Column(String(100), primary_key=True)  # e.g. total, resources_by_category, user_bookmarks
+    key = Column(String(255), primary_key=True)  # e.g. resources, a category name, a user_id
+    value = Column(Integer, nullable=False, default=0)
+
+class Blob(Base):
+    __tablename__ = 'blobs'
+    
+    blob_id = Column(String(100), primary_key=True)  # sha256:<hex digest>
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ResourceText(Base):
+    __tablename__ = 'resource_texts'
+    
+    resource_id = Column(Integer, primary_key=True)
+    page = Column(Integer, primary_key=True)  # page, slide or chunk number, from 1
+    content = Column(Text, nullable=False)
+
+class Job(Base):
+    __tablename__ = 'jobs'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100), nullable=False)  # a handler name in utils.worker.JOB_HANDLERS
+    payload = Column(JSON)
+    status = Column(String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    last_error = Column(Text)
+    run_after = Column(DateTime, default=datetime.utcnow)
+    locked_by = Column(String(255))
+    locked_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+# Columns that may hold a blob ID instead of a legacy upload path
+BLOB_REFERENCE_COLUMNS = [
+    (Resource, Resource.file_path),
+    (Project, Project.image_path)
+]
+
+# Cache namespaces whose generation is bumped by catalog writes
+CACHE_NAMESPACES = ('documentation_links', 'resources', 'projects')
+
+# Model behind each item type, in the order legacy untyped IDs were resolved
+ITEM_MODELS = {
+    'resource': Resource,
+    'project': Project,
+    'documentation': DocumentationLink
+}
+
+# Read shapes: 'detail' is the whole item, 'summary' what list views show
+ITEM_SHAPES = ('summary', 'detail')
+
+# Characters of description sent with summaries
+SNIPPET_LENGTH = int(os.getenv('SNIPPET_LENGTH', '100'))
+
+# Process-wide registry: Streamlit re-executes page scripts on every interaction,
+# but utils modules are imported once, so engines and managers kept here are shared
+# by every rerun and every session in the server process.
+_registry_lock = threading.RLock()
+_engines = {}
+_managers = {}
+_initialized_urls = set()
+_engine_stats = {
+    'engines_created': 0,
+    'engine_reuses': 0,
+    'schema_initializations': 0,
+    'manager_reuses': 0,
+    'pool_connects': 0,
+    'pool_checkouts': 0
+}
+
+def get_pool_settings():
+    """Read connection pool settings from the environment"""
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    }
+
+def _count_connect(dbapi_connection, connection_record):
+    _engine_stats['pool_connects'] += 1
+
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    _engine_stats['pool_checkouts'] += 1
+
+# Data backends the app can run on; the JSON files backend is utils.data_manager.DataManager
+DATA_BACKENDS = ('sqlite', 'postgres', 'json')
+
+def get_data_backend():
+    """The configured DATA_BACKEND, defaulting to postgres when DATABASE_URL is set and SQLite otherwise"""
+    backend = os.getenv('DATA_BACKEND', 'postgres' if os.getenv('DATABASE_URL') else 'sqlite').lower()
+    if backend not in DATA_BACKENDS:
+        raise ValueError(f"Unknown DATA_BACKEND: {backend}")
+    return backend
+
+def get_sqlite_url(path=None):
+    """URL of a SQLite database file, by default SQLITE_PATH"""
+    path = path or os.getenv('SQLITE_PATH', os.path.join('data', 'vlearn.db'))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return f"sqlite:///{path}"
+
+def get_database_url():
+    """The database URL for the configured backend; SQLite needs no configuration"""
+    database_url = os.getenv('DATABASE_URL')
+    backend = get_data_backend()
+    if backend == 'json':
+        raise ValueError("DATA_BACKEND=json has no database; the app and its tools need sqlite or postgres")
+    if backend == 'sqlite' and not (database_url or '').startswith('sqlite'):
+        return get_sqlite_url()
+    if not database_url:
+        raise ValueError("DATABASE_URL environment variable not found")
+    return database_url
+
+# Applied to every new SQLite connection. WAL lets readers run alongside the single
+# writer, and synchronous=NORMAL is durable in WAL mode except on power loss.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'),
+    'cache_size': -int(os.getenv('SQLITE_CACHE_MB', '64')) * 1024,
+    'temp_store': 'MEMORY',
+    'mmap_size': int(os.getenv('SQLITE_MMAP_MB', '256')) * 1024 * 1024,
+    'foreign_keys': 'ON'
+}
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def get_engine(database_url):
+    """Get the shared engine for a database URL, creating it on first use"""
+    with _registry_lock:
+        engine = _engines.get(database_url)
+        if engine is not None:
+            _engine_stats['engine_reuses'] += 1
+            return engine
+        
+        settings = get_pool_settings()
+        if database_url.startswith('sqlite'):
+            # SQLite pools don't accept sizing options
+            settings = {
+                'pool_recycle': settings['pool_recycle'],
+                'pool_pre_ping': settings['pool_pre_ping'],
+                # Pooled connections are handed between Streamlit's threads
+                'connect_args': {'check_same_thread': False}
+            }
+        
+        engine = create_engine(database_url, **settings)
+        if database_url.startswith('sqlite'):
+            event.listen(engine, 'connect', _configure_sqlite)
+        event.listen(engine, 'connect', _count_connect)
+        event.listen(engine, 'checkout', _count_checkout)
+        _engines[database_url] = engine
+        _engine_stats['engines_created'] += 1
+        return engine
+
+def _dispose_engines_after_fork():
+    # A forked child (e.g. a worker pool process) inherits the parent's pooled connections;
+    # sharing one socket between processes garbles both sides, so the child starts new pools
+    for engine in _engines.values():
+        engine.dispose(close=False)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_engines_after_fork)
+
+def get_database_manager(database_url=None):
+    """Get the process-wide DatabaseManager for a database URL, by default the configured one"""
+    database_url = database_url or get_database_url()
+    with _registry_lock:
+        manager = _managers.get(database_url)
+        if manager is not None:
+            _engine_stats['manager_reuses'] += 1
+            return manager
+        manager = DatabaseManager(database_url=database_url)
+        _managers[database_url] = manager
+        return manager
+
+def get_engine_stats():
+    """Get engine and connection pool reuse statistics"""
+    with _registry_lock:
+        stats = dict(_engine_stats)
+        pools = {}
+        for engine in _engines.values():
+            pool = engine.pool
+            pools[engine.url.render_as_string(hide_password=True)] = {
+                'status': pool.status(),
+                'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else 0
+            }
+    checkouts = stats['pool_checkouts']
+    stats['connection_reuse_rate'] = (1 - stats['pool_connects'] / checkouts) if checkouts else 0.0
+    stats['pools'] = pools
+    return stats
+
 class DatabaseManager:
-    def __init__(self):
-        self.database_url = os.getenv('DATABASE_URL')
-        if not self.database_url:
-            raise ValueError("DATABASE_URL environment variable not found")
+    def __init__(self, initialize=True, database_url=None):
+        self.database_url = database_url or get_database_url()
         
-        self.engine = create_engine(self.database_url)
+        self.engine = get_engine(self.database_url)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.search_index = SearchIndex(self.engine)
         
-        # Create tables
-        Base.metadata.create_all(bind=self.engine)
-        
-        # Initialize with default data if empty
-        self.initialize_default_data()
+        # Migrate the schema and seed default data once per process, not once per rerun
+        with _registry_lock:
+            if not initialize or self.database_url in _initialized_urls:
+                self.search_index.create()
+                return
+            from utils.migrations import upgrade, migration_lock
+            # Other processes (app replicas, the worker) may be starting against the same database
+            with migration_lock(self):
+                self.search_index.create()
+                if os.getenv('DB_AUTO_MIGRATE', 'true').lower() in ('1', 'true', 'yes'):
+                    upgrade(self)
+                if self.initialize_default_data():
+                    self.rebuild_counters()
+                self.ensure_search_index()
+            _initialized_urls.add(self.database_url)
+            _engine_stats['schema_initializations'] += 1
     
     def get_session(self):
         """Get a database session"""
         return self.SessionLocal()
     
     def initialize_default_data(self):
-        """Initialize database with default data if empty"""
+        """Initialize database with default data if empty; returns True if links were seeded"""
         session = self.get_session()
         try:
             # Check if documentation links exist
+            seeded = False
             if session.query(DocumentationLink).count() == 0:
                 self.create_default_documentation_links(session)
+                seeded = True
             
             # Check if user data exists
             if session.query(UserData).count() == 0:
@@ -100,9 +371,11 @@ class DatabaseManager:
                 session.add(default_user_data)
             
             session.commit()
+            return seeded
         except Exception as e:
             session.rollback()
             print(f"Error initializing default data: {e}")
+            return False
         finally:
             session.close()
     
@@ -185,23 +458,88 @@ class DatabaseManager:
             doc_link = DocumentationLink(**link_data)
             session.add(doc_link)
     
+    # Cache generation methods
+    def ensure_cache_generations(self):
+        """Create a generation row for every cache namespace"""
+        session = self.get_session()
+        try:
+            rows = [{'namespace': namespace, 'generation': 0} for namespace in CACHE_NAMESPACES]
+            self._insert_ignore(session, CacheGeneration, rows, ['namespace'])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error creating cache generations: {e}")
+        finally:
+            session.close()
+    
+    def get_cache_generations(self):
+        """Get the current generation of every cache namespace"""
+        session = self.get_session()
+        try:
+            return {namespace: generation for namespace, generation in session.query(
+                CacheGeneration.namespace, CacheGeneration.generation
+            )}
+        finally:
+            session.close()
+    
+    def bump_cache_generation(self, session, namespace):
+        """Atomically advance a namespace's generation inside the writing transaction"""
+        session.query(CacheGeneration).filter_by(namespace=namespace).update(
+            {CacheGeneration.generation: CacheGeneration.generation + 1},
+            synchronize_session=False
+        )
+    
     # Documentation Links methods
+    # Summary shapes: short columns only, with the description cut to a snippet in SQL
+    SUMMARY_COLUMNS = {
+        'resource': (Resource.id, Resource.title, Resource.author, Resource.category, Resource.type,
+                     Resource.description, Resource.created_at),
+        'project': (Project.id, Project.title, Project.author, Project.category, Project.description,
+                    Project.created_at),
+        'documentation': (DocumentationLink.id, DocumentationLink.title, DocumentationLink.url,
+                          DocumentationLink.category, DocumentationLink.description, DocumentationLink.rating)
+    }
+    
+    def _check_shape(self, shape):
+        if shape not in ITEM_SHAPES:
+            raise ValueError(f"Unknown shape: {shape}")
+    
+    def _snippet(self, column, length=None):
+        """Truncate a text column in SQL so only its first characters are transferred"""
+        return func.substr(column, 1, length or SNIPPET_LENGTH).label(column.key)
+    
+    def _summary_query(self, session, item_type):
+        columns = [
+            self._snippet(column) if column.key == 'description' else column
+            for column in self.SUMMARY_COLUMNS[item_type]
+        ]
+        return session.query(*columns)
+    
+    def _summary_to_dict(self, row):
+        """Convert a summary row to a dict shaped like the detail dicts"""
+        item = dict(row._mapping)
+        if 'created_at' in item:
+            created_at = item.pop('created_at')
+            item['timestamp'] = str(created_at) if created_at else ''
+        return item
+    
+    def _documentation_link_to_dict(self, link):
+        """Convert a DocumentationLink row to the dict shape used by the pages"""
+        return {
+            'id': link.id,
+            'title': link.title,
+            'url': link.url,
+            'description': link.description,
+            'category': link.category,
+            'rating': link.rating
+        }
+    
     def get_documentation_links(self):
         """Get all documentation links"""
         session = self.get_session()
         try:
             links = session.query(DocumentationLink).all()
-            return [
-                {
-                    'id': link.id,
-                    'title': link.title,
-                    'url': link.url,
-                    'description': link.description,
-                    'category': link.category,
-                    'rating': link.rating
-                }
-                for link in links
-            ]
+            return [self._documentation_link_to_dict(link) for link in links]
         finally:
             session.close()
     
@@ -217,6 +555,13 @@ class DatabaseManager:
                 rating=rating
             )
             session.add(new_link)
+            session.flush()
+            self._index_item(session, 'documentation', new_link)
+            self.bump_cache_generation(session, 'documentation_links')
+            self._bump_counters(session, {
+                ('total', 'documentation_links'): 1,
+                ('documentation_by_category', category or ''): 1
+            })
             session.commit()
             return new_link.id
         except Exception as e:
@@ -226,26 +571,163 @@ class DatabaseManager:
             session.close()
     
     # Resources methods
-    def get_resources(self):
-        """Get all resources"""
+    def _resource_to_dict(self, resource):
+        """Convert a Resource row to the dict shape used by the pages"""
+        return {
+            'id': resource.id,
+            'title': resource.title,
+            'author': resource.author,
+            'category': resource.category,
+            'type': resource.type,
+            'description': resource.description,
+            'content': resource.content,
+            'file_path': resource.file_path,
+            'original_filename': resource.original_filename,
+            'timestamp': str(resource.created_at) if resource.created_at else ''
+        }
+    
+    def get_resources(self, shape='detail'):
+        """Get all resources in the 'summary' or 'detail' shape"""
+        self._check_shape(shape)
         session = self.get_session()
         try:
-            resources = session.query(Resource).all()
-            return [
-                {
-                    'id': resource.id,
-                    'title': resource.title,
-                    'author': resource.author,
-                    'category': resource.category,
-                    'type': resource.type,
-                    'description': resource.description,
-                    'content': resource.content,
-                    'file_path': resource.file_path,
-                    'original_filename': resource.original_filename,
-                    'timestamp': str(resource.created_at) if resource.created_at else ''
-                }
-                for resource in resources
-            ]
+            if shape == 'summary':
+                return [self._summary_to_dict(row) for row in self._summary_query(session, 'resource')]
+            resources = session.query(Resource).options(undefer_group(LONG_TEXT_GROUP)).all()
+            return [self._resource_to_dict(resource) for resource in resources]
+        finally:
+            session.close()
+    
+    # Sort keys accepted by query_resources: (column, descending)
+    RESOURCE_SORTS = {
+        'newest': (Resource.created_at, True),
+        'oldest': (Resource.created_at, False),
+        'title_asc': (Resource.title, False),
+        'title_desc': (Resource.title, True)
+    }
+    
+    def _filter_resources(self, query, search=None, category=None, type=None, author=None):
+        """Apply search/category/type/author filters to a resource query"""
+        if search:
+            if self.search_index.available:
+                if self.search_index.build_match(search):
+                    query = query.filter(Resource.id.in_(self.search_index.match_ids(search, 'resource')))
+            else:
+                pattern = f"%{search}%"
+                query = query.filter(or_(
+                    Resource.title.ilike(pattern),
+                    Resource.description.ilike(pattern),
+                    Resource.author.ilike(pattern)
+                ))
+        if category:
+            query = query.filter(Resource.category == category)
+        if type:
+            query = query.filter(Resource.type == type)
+        if author:
+            query = query.filter(Resource.author == author)
+        return query
+    
+    # Facet dimensions of the Resource Library: facet name -> column
+    RESOURCE_FACETS = {
+        'category': Resource.category,
+        'type': Resource.type,
+        'author': Resource.author
+    }
+    
+    def get_resource_facets(self, search=None, category=None, type=None, author=None):
+        """Count resources per category, type and author under the current filters.
+        
+        Each facet is counted with every filter except its own, so a dropdown shows
+        what choosing another value would return. All facets come from one UNION ALL
+        of grouped queries. Returns {'total': n, facet: [(value, count), ...]} with
+        values ordered by count, most frequent first.
+        """
+        filters = {'category': category, 'type': type, 'author': author}
+        grouped = []
+        for facet, column in self.RESOURCE_FACETS.items():
+            other_filters = dict(filters, **{facet: None})
+            stmt = select(
+                literal(facet).label('facet'), column.label('value'), func.count(Resource.id).label('count')
+            )
+            grouped.append(self._filter_resources(stmt, search, **other_filters).group_by(column))
+        
+        session = self.get_session()
+        try:
+            facets = {facet: [] for facet in self.RESOURCE_FACETS}
+            for row in session.execute(union_all(*grouped)):
+                facets[row.facet].append((row.value, row.count))
+        finally:
+            session.close()
+        
+        # The category facet ignores only the category filter, so its selected bucket is the total
+        category_counts = dict(facets['category'])
+        total = category_counts.get(category, 0) if category else sum(category_counts.values())
+        result = {'total': total}
+        for facet, values in facets.items():
+            result[facet] = sorted(
+                ((value, count) for value, count in values if value),
+                key=lambda item: (-item[1], item[0])
+            )
+        return result
+    
+    def _keyset_page(self, query, column, id_column, descending, limit, cursor=None, offset=0):
+        """Fetch one page of query ordered by (sort column, id_column).
+        
+        With a cursor (the (sort value, id) of the previous page's last row) the page
+        starts after it, so deep pages stay index-only; otherwise offset applies.
+        Returns (rows, next_cursor, has_more).
+        """
+        if cursor is not None:
+            last_value, last_id = cursor
+            if descending:
+                query = query.filter(or_(column < last_value, and_(column == last_value, id_column < last_id)))
+            else:
+                query = query.filter(or_(column > last_value, and_(column == last_value, id_column > last_id)))
+        
+        if descending:
+            query = query.order_by(column.desc(), id_column.desc())
+        else:
+            query = query.order_by(column.asc(), id_column.asc())
+        if cursor is None and offset:
+            query = query.offset(offset)
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = (getattr(last, column.key), getattr(last, id_column.key))
+        return rows, next_cursor, has_more
+    
+    def query_resources(self, search=None, category=None, type=None, sort='newest', limit=20, offset=0, cursor=None,
+                        author=None):
+        """Get one page of filtered, sorted resources plus the total match count.
+        
+        Pass either an offset or the keyset cursor returned with the previous page.
+        """
+        if sort not in self.RESOURCE_SORTS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        column, descending = self.RESOURCE_SORTS[sort]
+        
+        session = self.get_session()
+        try:
+            # The Library shows each resource's content, so it reads the detail shape
+            query = self._filter_resources(
+                session.query(Resource).options(undefer_group(LONG_TEXT_GROUP)), search, category, type, author
+            )
+            total = query.order_by(None).count()
+            rows, next_cursor, has_more = self._keyset_page(
+                query, column, Resource.id, descending, limit, cursor, offset
+            )
+            return {
+                'items': [self._resource_to_dict(resource) for resource in rows],
+                'total': total,
+                'next_cursor': next_cursor,
+                'has_more': has_more
+            }
         finally:
             session.close()
     
@@ -264,6 +746,19 @@ class DatabaseManager:
                 original_filename=original_filename
             )
             session.add(new_resource)
+            session.flush()
+            self._index_item(session, 'resource', new_resource)
+            self.retain_blob(session, file_path)
+            if type == 'Image' and file_path:
+                self._enqueue_job(session, 'generate_thumbnails', {'file_ref': file_path})
+            if type == 'File' and file_path and can_extract(original_filename or file_path):
+                self._enqueue_job(session, 'extract_text', {'resource_id': new_resource.id})
+            self.bump_cache_generation(session, 'resources')
+            self._bump_counters(session, {
+                ('total', 'resources'): 1,
+                ('resources_by_category', category or ''): 1,
+                ('resources_by_type', type or ''): 1
+            })
             session.commit()
             return new_resource.id
         except Exception as e:
@@ -273,32 +768,181 @@ class DatabaseManager:
             session.close()
     
     # Projects methods
-    def get_projects(self):
-        """Get all projects"""
+    def _project_to_dict(self, project):
+        """Convert a Project row to the dict shape used by the pages"""
+        return {
+            'id': project.id,
+            'title': project.title,
+            'author': project.author,
+            'category': project.category,
+            'description': project.description,
+            'technologies': project.technologies if project.technologies is not None else [],
+            'github_url': project.github_url,
+            'demo_url': project.demo_url,
+            'external_link': project.external_link,
+            'status': project.status,
+            'challenges': project.challenges,
+            'learnings': project.learnings,
+            'future_plans': project.future_plans,
+            'image_path': project.image_path,
+            'likes': project.likes,
+            'timestamp': str(project.created_at) if project.created_at else ''
+        }
+    
+    def get_projects(self, shape='detail'):
+        """Get all projects in the 'summary' or 'detail' shape"""
+        self._check_shape(shape)
         session = self.get_session()
         try:
-            projects = session.query(Project).all()
-            return [
-                {
-                    'id': project.id,
-                    'title': project.title,
-                    'author': project.author,
-                    'category': project.category,
-                    'description': project.description,
-                    'technologies': project.technologies if project.technologies is not None else [],
-                    'github_url': project.github_url,
-                    'demo_url': project.demo_url,
-                    'external_link': project.external_link,
-                    'status': project.status,
-                    'challenges': project.challenges,
-                    'learnings': project.learnings,
-                    'future_plans': project.future_plans,
-                    'image_path': project.image_path,
-                    'likes': project.likes,
-                    'timestamp': str(project.created_at) if project.created_at else ''
-                }
-                for project in projects
-            ]
+            if shape == 'summary':
+                return [self._summary_to_dict(row) for row in self._summary_query(session, 'project')]
+            projects = session.query(Project).options(undefer_group(LONG_TEXT_GROUP)).all()
+            return [self._project_to_dict(project) for project in projects]
+        finally:
+            session.close()
+    
+    # Sort keys accepted by query_projects: (column, descending)
+    PROJECT_SORTS = {
+        'newest': (Project.created_at, True),
+        'oldest': (Project.created_at, False),
+        'title_asc': (Project.title, False),
+        'most_liked': (Project.likes, True)
+    }
+    
+    # Showcase cards show these; challenges, learnings and future_plans load on demand
+    PROJECT_CARD_COLUMNS = (
+        Project.id, Project.title, Project.author, Project.category, Project.description,
+        Project.technologies, Project.github_url, Project.demo_url, Project.external_link,
+        Project.image_path, Project.likes, Project.created_at
+    )
+    
+    def _project_card_to_dict(self, row):
+        """Convert a PROJECT_CARD_COLUMNS row to a card dict"""
+        return {
+            'id': row.id,
+            'title': row.title,
+            'author': row.author,
+            'category': row.category,
+            'description': row.description,
+            'technologies': row.technologies if row.technologies is not None else [],
+            'github_url': row.github_url,
+            'demo_url': row.demo_url,
+            'external_link': row.external_link,
+            'image_path': row.image_path,
+            'likes': row.likes,
+            'timestamp': str(row.created_at) if row.created_at else ''
+        }
+    
+    def _filter_projects(self, query, search=None, category=None, technology=None):
+        """Apply search/category/technology filters to a project query"""
+        if search:
+            if self.search_index.available:
+                if self.search_index.build_match(search):
+                    query = query.filter(Project.id.in_(self.search_index.match_ids(search, 'project')))
+            else:
+                pattern = f"%{search}%"
+                query = query.filter(or_(
+                    Project.title.ilike(pattern),
+                    Project.description.ilike(pattern),
+                    Project.author.ilike(pattern)
+                ))
+        if category:
+            query = query.filter(Project.category == category)
+        if technology:
+            query = query.filter(Project.id.in_(
+                select(ProjectTechnology.project_id).where(ProjectTechnology.tech_key == technology_key(technology))
+            ))
+        return query
+    
+    def query_projects(self, search=None, category=None, technology=None, sort='newest', limit=12, cursor=None):
+        """Get one page of project cards plus the total match count.
+        
+        Pages are keyset-paginated on (sort column, id): pass the next_cursor returned
+        with the previous page to get the following one.
+        """
+        if sort not in self.PROJECT_SORTS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        column, descending = self.PROJECT_SORTS[sort]
+        
+        session = self.get_session()
+        try:
+            query = self._filter_projects(session.query(*self.PROJECT_CARD_COLUMNS), search, category, technology)
+            total = query.order_by(None).count()
+            rows, next_cursor, has_more = self._keyset_page(query, column, Project.id, descending, limit, cursor)
+            return {
+                'items': [self._project_card_to_dict(row) for row in rows],
+                'total': total,
+                'next_cursor': next_cursor,
+                'has_more': has_more
+            }
+        finally:
+            session.close()
+    
+    def get_project_details(self, project_id):
+        """Get the write-up fields a Showcase card leaves out"""
+        session = self.get_session()
+        try:
+            row = session.query(
+                Project.status, Project.challenges, Project.learnings, Project.future_plans
+            ).filter(Project.id == project_id).first()
+            if row is None:
+                return None
+            return {
+                'status': row.status,
+                'challenges': row.challenges,
+                'learnings': row.learnings,
+                'future_plans': row.future_plans
+            }
+        finally:
+            session.close()
+    
+    def get_project_filter_options(self):
+        """Get the distinct categories used by projects; technologies come from get_technology_facets"""
+        session = self.get_session()
+        try:
+            categories = [row[0] for row in session.query(Project.category).distinct().order_by(Project.category) if row[0]]
+            return {'categories': categories}
+        finally:
+            session.close()
+    
+    # Technology facets
+    def _technology_counts(self, session):
+        """(name, project count) per technology, most used first, from the project_technologies index"""
+        rows = session.query(
+            func.min(ProjectTechnology.name), func.count(ProjectTechnology.project_id)
+        ).group_by(ProjectTechnology.tech_key).all()
+        return sorted(((name, count) for name, count in rows), key=lambda row: (-row[1], row[0].lower()))
+    
+    def get_technology_facets(self):
+        """Get [(technology name, project count)], most used first"""
+        session = self.get_session()
+        try:
+            return self._technology_counts(session)
+        finally:
+            session.close()
+    
+    def _technology_rows(self, project_id, technologies):
+        return [
+            ProjectTechnology(project_id=project_id, tech_key=name.lower(), name=name)
+            for name in normalize_technologies(technologies)
+        ]
+    
+    def rebuild_project_technologies(self):
+        """Re-derive the project_technologies index from every project's technologies"""
+        session = self.get_session()
+        try:
+            session.query(ProjectTechnology).delete()
+            count = 0
+            for project_id, technologies in session.query(Project.id, Project.technologies).yield_per(500):
+                rows = self._technology_rows(project_id, technologies)
+                session.add_all(rows)
+                count += len(rows)
+            self.bump_cache_generation(session, 'projects')
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            raise e
         finally:
             session.close()
     
@@ -313,7 +957,7 @@ class DatabaseManager:
                 author=author,
                 category=category,
                 description=description,
-                technologies=technologies or [],
+                technologies=normalize_technologies(technologies),
                 github_url=github_url,
                 demo_url=demo_url,
                 external_link=external_link,
@@ -324,6 +968,17 @@ class DatabaseManager:
                 image_path=image_path
             )
             session.add(new_project)
+            session.flush()
+            session.add_all(self._technology_rows(new_project.id, new_project.technologies))
+            self._index_item(session, 'project', new_project)
+            self.retain_blob(session, image_path)
+            if image_path:
+                self._enqueue_job(session, 'generate_thumbnails', {'file_ref': image_path})
+            self.bump_cache_generation(session, 'projects')
+            self._bump_counters(session, {
+                ('total', 'projects'): 1,
+                ('projects_by_category', category or ''): 1
+            })
             session.commit()
             return new_project.id
         except Exception as e:
@@ -332,48 +987,936 @@ class DatabaseManager:
         finally:
             session.close()
     
-    # User Data methods
-    def get_user_data(self, user_id='default_user'):
-        """Get user data"""
+    # Project likes
+    def _change_likes(self, session, project_id, delta):
+        # A single UPDATE ... SET likes = likes + delta: the database applies concurrent
+        # changes one after another, so no click is lost to a read-modify-write race
+        session.query(Project).filter(Project.id == project_id).update(
+            {Project.likes: func.coalesce(Project.likes, 0) + delta}, synchronize_session=False
+        )
+        self.bump_cache_generation(session, 'projects')
+    
+    def like_project(self, project_id, user_id='default_user'):
+        """Record a user's like; returns False if they already liked it or the project doesn't exist"""
         session = self.get_session()
         try:
-            user_data = session.query(UserData).filter_by(user_id=user_id).first()
-            if not user_data:
-                # Create default user data
-                user_data = UserData(
-                    user_id=user_id,
-                    bookmarks=[],
-                    completed=[],
-                    todo=[]
-                )
-                session.add(user_data)
-                session.commit()
+            if session.query(Project.id).filter(Project.id == project_id).first() is None:
+                return False
+            liked = self._insert_ignore(session, ProjectLike, [{
+                'project_id': project_id,
+                'user_id': user_id,
+                'created_at': datetime.utcnow()
+            }], ['project_id', 'user_id']) > 0
+            if liked:
+                self._change_likes(session, project_id, 1)
+            session.commit()
+            return liked
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def unlike_project(self, project_id, user_id='default_user'):
+        """Withdraw a user's like; returns False if they hadn't liked the project"""
+        session = self.get_session()
+        try:
+            unliked = session.query(ProjectLike).filter_by(project_id=project_id, user_id=user_id).delete() > 0
+            if unliked:
+                self._change_likes(session, project_id, -1)
+            session.commit()
+            return unliked
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_liked_project_ids(self, user_id='default_user', project_ids=None):
+        """Get the IDs of the projects a user liked, optionally only among project_ids"""
+        session = self.get_session()
+        try:
+            query = session.query(ProjectLike.project_id).filter(ProjectLike.user_id == user_id)
+            if project_ids is not None:
+                if not project_ids:
+                    return set()
+                query = query.filter(ProjectLike.project_id.in_(project_ids))
+            return {row[0] for row in query}
+        finally:
+            session.close()
+    
+    def rebuild_project_likes(self):
+        """Recompute every project's likes from project_likes to repair drift"""
+        session = self.get_session()
+        try:
+            like_count = select(func.count(ProjectLike.user_id)).where(
+                ProjectLike.project_id == Project.id
+            ).scalar_subquery()
+            updated = session.query(Project).update({Project.likes: like_count}, synchronize_session=False)
+            self.bump_cache_generation(session, 'projects')
+            session.commit()
+            return updated
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    # Blob reference counting
+    def retain_blob(self, session, blob_id):
+        """Add a reference to a stored blob inside the caller's transaction (no-op for legacy paths)"""
+        if not is_blob_id(blob_id):
+            return
+        dialect = self.engine.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(Blob).values(blob_id=blob_id, refcount=1, created_at=datetime.utcnow())
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['blob_id'],
+                set_={'refcount': Blob.refcount + 1}
+            )
+            session.execute(stmt)
+            return
+        updated = session.query(Blob).filter_by(blob_id=blob_id).update(
+            {Blob.refcount: Blob.refcount + 1}, synchronize_session=False
+        )
+        if not updated:
+            session.add(Blob(blob_id=blob_id, refcount=1))
+    
+    def rebuild_blob_refcounts(self):
+        """Recompute blob reference counts from the rows that point at blobs"""
+        session = self.get_session()
+        try:
+            counts = {}
+            for model, column in BLOB_REFERENCE_COLUMNS:
+                rows = session.query(column, func.count(model.id)).filter(
+                    column.like(f'{BLOB_ID_PREFIX}%')
+                ).group_by(column)
+                for blob_id, count in rows:
+                    counts[blob_id] = counts.get(blob_id, 0) + count
             
-            return {
-                'bookmarks': user_data.bookmarks if user_data.bookmarks is not None else [],
-                'completed': user_data.completed if user_data.completed is not None else [],
-                'todo': user_data.todo if user_data.todo is not None else []
+            # Keep unreferenced blobs at zero so they can be found and collected
+            session.query(Blob).update({Blob.refcount: 0}, synchronize_session=False)
+            existing = {row[0] for row in session.query(Blob.blob_id)}
+            for blob_id, count in counts.items():
+                if blob_id in existing:
+                    session.query(Blob).filter_by(blob_id=blob_id).update(
+                        {Blob.refcount: count}, synchronize_session=False
+                    )
+                else:
+                    session.add(Blob(blob_id=blob_id, refcount=count))
+            session.commit()
+            return len(counts)
+        except Exception as e:
+            session.rollback()
+            print(f"Error rebuilding blob refcounts: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def get_referenced_files(self, file_refs):
+        """Get the subset of file references (blob IDs or legacy paths) that some row still uses.
+        
+        Blobs with a positive reference count are answered from the blobs table; the
+        rest are confirmed against the referencing rows, so a count that has drifted
+        to zero never gets a live file collected.
+        """
+        if not file_refs:
+            return set()
+        session = self.get_session()
+        try:
+            blob_ids = [ref for ref in file_refs if is_blob_id(ref)]
+            referenced = {
+                row[0] for row in session.query(Blob.blob_id).filter(Blob.blob_id.in_(blob_ids), Blob.refcount > 0)
+            } if blob_ids else set()
+            unresolved = [ref for ref in file_refs if ref not in referenced]
+            for model, column in BLOB_REFERENCE_COLUMNS:
+                if not unresolved:
+                    break
+                rows = session.query(column).filter(column.in_(unresolved)).distinct()
+                referenced.update(row[0] for row in rows)
+            return referenced
+        finally:
+            session.close()
+    
+    def forget_blobs(self, blob_ids):
+        """Remove the refcount rows of deleted blobs that nothing references"""
+        session = self.get_session()
+        try:
+            session.query(Blob).filter(Blob.blob_id.in_(blob_ids), Blob.refcount <= 0).delete(
+                synchronize_session=False
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_legacy_file_references(self):
+        """Get the distinct file references, exactly as stored, that are paths rather than blob IDs"""
+        session = self.get_session()
+        try:
+            paths = set()
+            for model, column in BLOB_REFERENCE_COLUMNS:
+                rows = session.query(column).filter(
+                    column.isnot(None), column != '', ~column.like(f'{BLOB_ID_PREFIX}%')
+                ).distinct()
+                paths.update(row[0] for row in rows)
+            return paths
+        finally:
+            session.close()
+    
+    def replace_file_references(self, mapping):
+        """Point rows that reference legacy upload paths at their blob IDs.
+        
+        mapping is {old_path: blob_id}; returns the number of rows updated.
+        """
+        if not mapping:
+            return 0
+        session = self.get_session()
+        try:
+            updated = 0
+            for model, column in BLOB_REFERENCE_COLUMNS:
+                for old_path, blob_id in mapping.items():
+                    updated += session.query(model).filter(column == old_path).update(
+                        {column: blob_id}, synchronize_session=False
+                    )
+            if updated:
+                self.bump_cache_generation(session, 'resources')
+                self.bump_cache_generation(session, 'projects')
+            session.commit()
+            return updated
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    # Background job queue
+    def _job_to_dict(self, job):
+        """Convert a Job row to a plain dict"""
+        return {
+            'id': job.id,
+            'kind': job.kind,
+            'payload': job.payload or {},
+            'status': job.status,
+            'attempts': job.attempts,
+            'max_attempts': job.max_attempts,
+            'last_error': job.last_error,
+            'locked_by': job.locked_by,
+            'created_at': str(job.created_at) if job.created_at else '',
+            'finished_at': str(job.finished_at) if job.finished_at else ''
+        }
+    
+    def _enqueue_job(self, session, kind, payload, max_attempts=None):
+        """Queue a job inside the caller's transaction so it only exists if the write commits"""
+        job = Job(
+            kind=kind,
+            payload=payload,
+            status='queued',
+            max_attempts=max_attempts or int(os.getenv('JOB_MAX_ATTEMPTS', '3')),
+            run_after=datetime.utcnow()
+        )
+        session.add(job)
+        return job
+    
+    def enqueue_job(self, kind, payload, max_attempts=None):
+        """Queue a background job and return its ID"""
+        session = self.get_session()
+        try:
+            job = self._enqueue_job(session, kind, payload, max_attempts)
+            session.commit()
+            return job.id
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def claim_job(self, worker_id, kinds=None):
+        """Atomically move the next due job to running and return it, or None if the queue is empty"""
+        session = self.get_session()
+        try:
+            now = datetime.utcnow()
+            candidates = session.query(Job.id).filter(Job.status == 'queued', Job.run_after <= now)
+            if kinds:
+                candidates = candidates.filter(Job.kind.in_(kinds))
+            candidates = candidates.order_by(Job.run_after, Job.id).limit(10)
+            if self.engine.dialect.name == 'postgresql':
+                candidates = candidates.with_for_update(skip_locked=True)
+            
+            for (job_id,) in candidates.all():
+                # The status check makes the claim safe against other workers racing for the row
+                claimed = session.query(Job).filter(Job.id == job_id, Job.status == 'queued').update({
+                    Job.status: 'running',
+                    Job.attempts: Job.attempts + 1,
+                    Job.locked_by: worker_id,
+                    Job.locked_at: now
+                }, synchronize_session=False)
+                if claimed:
+                    session.commit()
+                    return self._job_to_dict(session.get(Job, job_id))
+            session.commit()
+            return None
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def complete_job(self, job_id, worker_id):
+        """Mark a job as done if worker_id still holds it; returns False if it has been taken back"""
+        session = self.get_session()
+        try:
+            completed = session.query(Job).filter(
+                Job.id == job_id, Job.status == 'running', Job.locked_by == worker_id
+            ).update({
+                Job.status: 'done',
+                Job.last_error: None,
+                Job.locked_by: None,
+                Job.locked_at: None,
+                Job.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+            session.commit()
+            return completed > 0
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def fail_job(self, job_id, error, worker_id):
+        """Record a failed attempt, re-queueing with exponential backoff until attempts run out.
+        
+        Returns the job's new status, or None if worker_id no longer holds the job.
+        """
+        session = self.get_session()
+        try:
+            job = session.query(Job).filter(
+                Job.id == job_id, Job.status == 'running', Job.locked_by == worker_id
+            ).with_for_update().first()
+            if job is None:
+                return None
+            job.last_error = str(error)[:2000]
+            job.locked_by = None
+            job.locked_at = None
+            if job.attempts < job.max_attempts:
+                delay = float(os.getenv('JOB_RETRY_DELAY', '10')) * 2 ** (job.attempts - 1)
+                job.status = 'queued'
+                job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            else:
+                job.status = 'failed'
+                job.finished_at = datetime.utcnow()
+            session.commit()
+            return job.status
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def heartbeat_jobs(self, job_ids, worker_id):
+        """Refresh locked_at on the jobs worker_id is still running, so they don't look stale"""
+        if not job_ids:
+            return 0
+        session = self.get_session()
+        try:
+            refreshed = session.query(Job).filter(
+                Job.id.in_(job_ids), Job.status == 'running', Job.locked_by == worker_id
+            ).update({Job.locked_at: datetime.utcnow()}, synchronize_session=False)
+            session.commit()
+            return refreshed
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def requeue_stale_jobs(self, timeout=None, worker_id=None):
+        """Return running jobs whose worker stopped responding to the queue.
+        
+        Live workers refresh locked_at with heartbeat_jobs, so only jobs whose worker
+        died or hung go stale; the calling worker's own jobs (worker_id) are skipped.
+        A timeout counts as a failed attempt: jobs that have used up their attempts are
+        marked failed, so a job that keeps hanging or killing its worker stops retrying.
+        """
+        timeout = timeout if timeout is not None else float(os.getenv('JOB_TIMEOUT', '600'))
+        session = self.get_session()
+        try:
+            now = datetime.utcnow()
+            stale = session.query(Job).filter(Job.status == 'running', Job.locked_at < now - timedelta(seconds=timeout))
+            if worker_id is not None:
+                stale = stale.filter(Job.locked_by != worker_id)
+            stale.filter(Job.attempts >= Job.max_attempts).update({
+                Job.status: 'failed',
+                Job.locked_by: None,
+                Job.locked_at: None,
+                Job.last_error: 'Worker timed out',
+                Job.finished_at: now
+            }, synchronize_session=False)
+            requeued = stale.filter(Job.attempts < Job.max_attempts).update({
+                Job.status: 'queued',
+                Job.locked_by: None,
+                Job.locked_at: None,
+                Job.last_error: 'Worker timed out'
+            }, synchronize_session=False)
+            session.commit()
+            return requeued
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def retry_failed_jobs(self):
+        """Put every failed job back on the queue with a fresh attempt budget"""
+        session = self.get_session()
+        try:
+            retried = session.query(Job).filter(Job.status == 'failed').update({
+                Job.status: 'queued',
+                Job.attempts: 0,
+                Job.run_after: datetime.utcnow(),
+                Job.finished_at: None
+            }, synchronize_session=False)
+            session.commit()
+            return retried
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_job_stats(self, recent=10):
+        """Get job counts by status plus the most recent failures"""
+        session = self.get_session()
+        try:
+            stats = {status: 0 for status in JOB_STATUSES}
+            for status, count in session.query(Job.status, func.count(Job.id)).group_by(Job.status):
+                stats[status] = count
+            failures = session.query(Job).filter(Job.last_error.isnot(None), Job.status != 'done').order_by(
+                Job.id.desc()
+            ).limit(recent)
+            stats['recent_failures'] = [self._job_to_dict(job) for job in failures]
+            return stats
+        finally:
+            session.close()
+    
+    # Counter methods
+    def _bump_counters(self, session, deltas):
+        """Atomically add deltas to platform counters inside the caller's transaction.
+        
+        deltas maps (counter, key) to an increment; zero deltas are skipped.
+        """
+        rows = [
+            {'counter': counter, 'key': key, 'value': delta}
+            for (counter, key), delta in deltas.items() if delta
+        ]
+        if not rows:
+            return
+        dialect = self.engine.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(PlatformCounter).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['counter', 'key'],
+                set_={'value': PlatformCounter.value + stmt.excluded.value}
+            )
+            session.execute(stmt)
+            return
+        for row in rows:
+            updated = session.query(PlatformCounter).filter_by(counter=row['counter'], key=row['key']).update(
+                {PlatformCounter.value: PlatformCounter.value + row['value']}, synchronize_session=False
+            )
+            if not updated:
+                session.add(PlatformCounter(**row))
+    
+    def rebuild_counters(self):
+        """Recompute every platform counter from the source tables to repair drift"""
+        session = self.get_session()
+        try:
+            rows = {}
+            rows[('total', 'resources')] = session.query(Resource).count()
+            rows[('total', 'projects')] = session.query(Project).count()
+            rows[('total', 'documentation_links')] = session.query(DocumentationLink).count()
+            grouped = [
+                ('resources_by_category', Resource, Resource.category),
+                ('resources_by_type', Resource, Resource.type),
+                ('projects_by_category', Project, Project.category),
+                ('documentation_by_category', DocumentationLink, DocumentationLink.category)
+            ]
+            for counter, model, column in grouped:
+                for key, count in session.query(column, func.count(model.id)).group_by(column):
+                    rows[(counter, key or '')] = rows.get((counter, key or ''), 0) + count
+            for state, user_id, count in session.query(
+                UserItemState.state, UserItemState.user_id, func.count(UserItemState.id)
+            ).group_by(UserItemState.state, UserItemState.user_id):
+                rows[(f'user_{state}', user_id)] = count
+            
+            session.query(PlatformCounter).delete()
+            session.add_all([
+                PlatformCounter(counter=counter, key=key, value=value)
+                for (counter, key), value in rows.items()
+            ])
+            session.commit()
+            return len(rows)
+        except Exception as e:
+            session.rollback()
+            print(f"Error rebuilding counters: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def get_counters(self):
+        """Get catalog totals and breakdowns from the counters table"""
+        session = self.get_session()
+        try:
+            counters = {
+                'totals': {'resources': 0, 'projects': 0, 'documentation_links': 0},
+                'resources_by_category': {},
+                'resources_by_type': {},
+                'projects_by_category': {},
+                'documentation_by_category': {}
             }
+            placeholders = {'resources_by_type': 'Unknown'}
+            breakdowns = [name for name in counters if name != 'totals']
+            rows = session.query(PlatformCounter.counter, PlatformCounter.key, PlatformCounter.value).filter(
+                PlatformCounter.counter.in_(['total'] + breakdowns)
+            )
+            for counter, key, value in rows:
+                if counter == 'total':
+                    counters['totals'][key] = value
+                elif value:
+                    counters[counter][key or placeholders.get(counter, 'Uncategorized')] = value
+            return counters
         finally:
             session.close()
     
-    def update_user_data(self, bookmarks=None, completed=None, todo=None, user_id='default_user'):
-        """Update user data"""
+    def get_user_counters(self, user_id='default_user'):
+        """Get a user's bookmark/completed/todo counts from the counters table"""
+        session = self.get_session()
+        try:
+            counts = {state: 0 for state in USER_STATES}
+            rows = session.query(PlatformCounter.counter, PlatformCounter.value).filter(
+                PlatformCounter.counter.in_([f'user_{state}' for state in USER_STATES]),
+                PlatformCounter.key == user_id
+            )
+            for counter, value in rows:
+                counts[counter[len('user_'):]] = value
+            return counts
+        finally:
+            session.close()
+    
+    # Statistics methods
+    def get_platform_stats(self, latest=5):
+        """Get catalog counts, per-category/per-type breakdowns and the newest items"""
+        session = self.get_session()
+        try:
+            # Counts come from the materialized counters table
+            stats = self.get_counters()
+            
+            # Newest resources and projects in one query
+            latest_resources = select(
+                literal('resource').label('item_type'), Resource.id, Resource.title, Resource.author,
+                Resource.category, Resource.type, self._snippet(Resource.description), Resource.created_at
+            ).order_by(Resource.created_at.desc(), Resource.id.desc()).limit(latest).subquery()
+            latest_projects = select(
+                literal('project').label('item_type'), Project.id, Project.title, Project.author,
+                Project.category, null().label('type'), self._snippet(Project.description), Project.created_at
+            ).order_by(Project.created_at.desc(), Project.id.desc()).limit(latest).subquery()
+            
+            stats['latest_resources'] = []
+            stats['latest_projects'] = []
+            for row in session.execute(union_all(select(latest_resources), select(latest_projects))):
+                item = {
+                    'id': row.id,
+                    'title': row.title,
+                    'author': row.author,
+                    'category': row.category,
+                    'type': row.type,
+                    'description': row.description,
+                    'timestamp': str(row.created_at) if row.created_at else ''
+                }
+                stats['latest_resources' if row.item_type == 'resource' else 'latest_projects'].append(item)
+            for key in ('latest_resources', 'latest_projects'):
+                stats[key].sort(key=lambda item: (item['timestamp'], item['id']), reverse=True)
+            return stats
+        finally:
+            session.close()
+    
+    # Search methods
+    def _search_fields(self, item_type, row):
+        """Get the (title, description, author, tags) text indexed for an item"""
+        if item_type == 'resource':
+            return row.title, row.description, row.author, f"{row.category or ''} {row.type or ''}"
+        if item_type == 'project':
+            technologies = ' '.join(row.technologies or [])
+            return row.title, row.description, row.author, f"{technologies} {row.category or ''}"
+        return row.title, row.description, None, row.category
+    
+    def _index_item(self, session, item_type, row):
+        """Index an item inside the session that writes it"""
+        body = self._resource_body(session, row.id) if item_type == 'resource' else None
+        self.search_index.index_item(session, item_type, row.id, *self._search_fields(item_type, row), body=body)
+    
+    def _resource_body(self, session, resource_id):
+        """Extracted text of a resource for the search index, capped at SEARCH_BODY_MAX_CHARS"""
+        max_chars = int(os.getenv('SEARCH_BODY_MAX_CHARS', '1000000'))
+        pieces = []
+        size = 0
+        pages = session.query(ResourceText.content).filter_by(resource_id=resource_id).order_by(ResourceText.page)
+        for (content,) in pages.yield_per(50):
+            pieces.append(content[:max_chars - size])
+            size += len(pieces[-1])
+            if size >= max_chars:
+                break
+        return '\n'.join(pieces)
+    
+    # Extracted document text
+    def get_resource(self, resource_id):
+        """Get one resource by ID, or None"""
+        session = self.get_session()
+        try:
+            resource = session.get(Resource, resource_id, options=[undefer_group(LONG_TEXT_GROUP)])
+            return self._resource_to_dict(resource) if resource else None
+        finally:
+            session.close()
+    
+    def store_resource_text(self, resource_id, pages, batch_size=20):
+        """Replace a resource's extracted text from an iterable of page strings and re-index it.
+        
+        Pages are flushed in batches so only batch_size pages are held at once.
+        Returns the number of pages stored.
+        """
         session = self.get_session()
         try:
-            user_data = session.query(UserData).filter_by(user_id=user_id).first()
-            if not user_data:
-                user_data = UserData(user_id=user_id)
-                session.add(user_data)
+            session.query(ResourceText).filter_by(resource_id=resource_id).delete()
+            count = 0
+            for text in pages:
+                count += 1
+                # NUL bytes can't be stored in PostgreSQL text columns
+                session.add(ResourceText(resource_id=resource_id, page=count, content=text.replace('\x00', '')))
+                if count % batch_size == 0:
+                    session.flush()
+                    session.expunge_all()
+            session.flush()
             
-            if bookmarks is not None:
-                user_data.bookmarks = bookmarks
-            if completed is not None:
-                user_data.completed = completed
-            if todo is not None:
-                user_data.todo = todo
+            resource = session.get(Resource, resource_id)
+            if resource is not None:
+                self._index_item(session, 'resource', resource)
+            session.commit()
+            return count
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def get_resource_text_stats(self):
+        """Get the number of resources with extracted text and their total page count"""
+        session = self.get_session()
+        try:
+            resources, pages = session.query(
+                func.count(func.distinct(ResourceText.resource_id)), func.count(ResourceText.page)
+            ).one()
+            return {'resources': resources, 'pages': pages}
+        finally:
+            session.close()
+    
+    def get_resources_missing_text(self):
+        """Get the IDs of extractable File resources that have no extracted text yet"""
+        session = self.get_session()
+        try:
+            extracted = session.query(ResourceText.resource_id).distinct()
+            rows = session.query(Resource.id, Resource.file_path, Resource.original_filename).filter(
+                Resource.type == 'File',
+                Resource.file_path.isnot(None),
+                Resource.id.notin_(extracted)
+            )
+            return [
+                resource_id for resource_id, file_path, original_filename in rows
+                if can_extract(original_filename or file_path)
+            ]
+        finally:
+            session.close()
+    
+    def rebuild_search_index(self):
+        """Re-index every resource, project and documentation link"""
+        session = self.get_session()
+        try:
+            self.search_index.clear(session)
+            indexed = 0
+            for item_type, model in ITEM_MODELS.items():
+                for row in session.query(model).yield_per(500):
+                    self._index_item(session, item_type, row)
+                    indexed += 1
+            session.commit()
+            return indexed
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def ensure_search_index(self):
+        """Backfill the search index if it is out of step with the content tables"""
+        if not self.search_index.available:
+            return
+        session = self.get_session()
+        try:
+            total = sum(session.query(model).count() for model in ITEM_MODELS.values())
+        finally:
+            session.close()
+        if total != self.search_index.count():
+            self.rebuild_search_index()
+    
+    def search_items(self, query, item_types=None, limit=20):
+        """Ranked full-text search across content types.
+        
+        Returns item dicts tagged with 'item_type' and 'rank', best match first.
+        """
+        if self.search_index.available:
+            hits = self.search_index.search(query, item_types, limit)
+            ranks = {(item_type, item_id): rank for item_type, item_id, rank in hits}
+            items = self.get_items_by_refs([(item_type, item_id) for item_type, item_id, _ in hits])
+            for item in items:
+                item['rank'] = ranks[(item['item_type'], item['id'])]
+            return items
+        
+        # LIKE fallback for databases without a full-text index
+        refs = []
+        for item_type in item_types or ITEM_MODELS:
+            refs.extend((item_type, item_id) for item_id in self.search_item_ids(query, item_type))
+        items = self.get_items_by_refs(refs[:limit])
+        for item in items:
+            item['rank'] = 0.0
+        return items
+    
+    def search_item_ids(self, query, item_type):
+        """Get the set of IDs of one item type matching a search query"""
+        model = ITEM_MODELS[item_type]
+        session = self.get_session()
+        try:
+            if self.search_index.available:
+                if not self.search_index.build_match(query):
+                    return set()
+                return {row[0] for row in session.execute(self.search_index.match_ids(query, item_type))}
+            pattern = f"%{query}%"
+            columns = [model.title, model.description]
+            if hasattr(model, 'author'):
+                columns.append(model.author)
+            return {row[0] for row in session.query(model.id).filter(or_(*[c.ilike(pattern) for c in columns]))}
+        finally:
+            session.close()
+    
+    # User Data methods
+    def _insert_ignore(self, session, model, rows, index_elements):
+        """Insert rows in one statement, skipping rows that hit the unique index; returns rows inserted"""
+        if not rows:
+            return 0
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            stmt = postgresql.insert(model).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+        elif dialect == 'sqlite':
+            stmt = sqlite.insert(model).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+        else:
+            # Generic fallback: one row at a time inside savepoints
+            inserted = 0
+            for row in rows:
+                try:
+                    with session.begin_nested():
+                        session.execute(model.__table__.insert().values(**row))
+                    inserted += 1
+                except IntegrityError:
+                    pass
+            return inserted
+        return session.execute(stmt).rowcount
+    
+    def _state_rows(self, user_id, state, item_ids, item_type=UNTYPED_ITEM):
+        """Build user_item_state rows for a list of item IDs"""
+        now = datetime.utcnow()
+        return [
+            {'user_id': user_id, 'item_type': item_type, 'item_id': item_id, 'state': state, 'created_at': now}
+            for item_id in item_ids
+        ]
+    
+    def migrate_user_data_json(self):
+        """Move bookmarks/completed/todo from the legacy JSON columns into user_item_state"""
+        session = self.get_session()
+        try:
+            migrated = 0
+            for user_data in session.query(UserData).all():
+                for state in USER_STATES:
+                    item_ids = getattr(user_data, state) or []
+                    if not item_ids:
+                        continue
+                    rows = self._state_rows(user_data.user_id, state, list(dict.fromkeys(item_ids)))
+                    self._insert_ignore(session, UserItemState, rows, ['user_id', 'state', 'item_type', 'item_id'])
+                    # Empty the JSON column so the migration is idempotent
+                    setattr(user_data, state, [])
+                    migrated += len(rows)
+            session.commit()
+            return migrated
+        except Exception as e:
+            session.rollback()
+            print(f"Error migrating user data: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def resolve_untyped_item_states(self):
+        """Assign item types to rows migrated from the untyped JSON arrays"""
+        session = self.get_session()
+        try:
+            untyped = session.query(UserItemState).filter_by(item_type=UNTYPED_ITEM).all()
+            if not untyped:
+                return 0
             
-            # Updated timestamp will be handled automatically by SQLAlchemy onupdate
+            # Completed and todo only ever held resources; bookmarks take the first
+            # table containing the ID, matching how they used to be displayed
+            item_ids = {row.item_id for row in untyped}
+            existing = {
+                item_type: {row[0] for row in session.query(model.id).filter(model.id.in_(item_ids))}
+                for item_type, model in ITEM_MODELS.items()
+            }
+            typed = {
+                (row.user_id, row.state, row.item_type, row.item_id)
+                for row in session.query(UserItemState).filter(
+                    UserItemState.item_type != UNTYPED_ITEM,
+                    UserItemState.item_id.in_(item_ids)
+                )
+            }
+            
+            resolved = 0
+            for row in untyped:
+                if row.state == 'bookmarks':
+                    item_type = next((t for t, ids in existing.items() if row.item_id in ids), None)
+                else:
+                    item_type = 'resource'
+                
+                if item_type is None or (row.user_id, row.state, item_type, row.item_id) in typed:
+                    # Dangling or duplicate reference
+                    session.delete(row)
+                else:
+                    row.item_type = item_type
+                    typed.add((row.user_id, row.state, item_type, row.item_id))
+                    resolved += 1
+            session.commit()
+            return resolved
+        except Exception as e:
+            session.rollback()
+            print(f"Error resolving item types: {e}")
+            return 0
+        finally:
+            session.close()
+    
+    def get_user_item_refs(self, user_id='default_user'):
+        """Get the user's lists as (item_type, item_id) references"""
+        session = self.get_session()
+        try:
+            refs = {state: [] for state in USER_STATES}
+            rows = session.query(UserItemState.state, UserItemState.item_type, UserItemState.item_id).filter(
+                UserItemState.user_id == user_id
+            ).order_by(UserItemState.id)
+            for state, item_type, item_id in rows:
+                refs[state].append((item_type, item_id))
+            return refs
+        finally:
+            session.close()
+    
+    def get_user_data(self, user_id='default_user'):
+        """Get user data"""
+        refs = self.get_user_item_refs(user_id)
+        return {state: [item_id for _, item_id in refs[state]] for state in USER_STATES}
+    
+    def get_items_by_refs(self, refs, shape='detail'):
+        """Resolve (item_type, item_id) references with one IN query per table.
+        
+        Returns item dicts in the 'summary' or 'detail' shape, tagged with 'item_type',
+        in the order of refs; dangling references are skipped.
+        """
+        self._check_shape(shape)
+        converters = {
+            'resource': self._resource_to_dict,
+            'project': self._project_to_dict,
+            'documentation': self._documentation_link_to_dict
+        }
+        ids_by_type = {}
+        for item_type, item_id in refs:
+            if item_type in ITEM_MODELS:
+                ids_by_type.setdefault(item_type, set()).add(item_id)
+        
+        session = self.get_session()
+        try:
+            found = {}
+            for item_type, item_ids in ids_by_type.items():
+                model = ITEM_MODELS[item_type]
+                if shape == 'summary':
+                    rows = self._summary_query(session, item_type).filter(model.id.in_(item_ids))
+                    convert = self._summary_to_dict
+                else:
+                    rows = session.query(model).options(undefer_group(LONG_TEXT_GROUP)).filter(model.id.in_(item_ids))
+                    convert = converters[item_type]
+                for row in rows:
+                    item = convert(row)
+                    item['item_type'] = item_type
+                    found[(item_type, row.id)] = item
+            return [found[ref] for ref in refs if ref in found]
+        finally:
+            session.close()
+    
+    def update_user_data(self, bookmarks=None, completed=None, todo=None, user_id='default_user'):
+        """Replace whole lists of user data.
+        
+        Lists may hold (item_type, item_id) references or bare resource IDs.
+        """
+        session = self.get_session()
+        try:
+            for state, items in (('bookmarks', bookmarks), ('completed', completed), ('todo', todo)):
+                if items is None:
+                    continue
+                deleted = session.query(UserItemState).filter_by(user_id=user_id, state=state).delete()
+                refs = [item if isinstance(item, (tuple, list)) else ('resource', item) for item in items]
+                rows = []
+                for item_type, item_id in dict.fromkeys(map(tuple, refs)):
+                    rows.extend(self._state_rows(user_id, state, [item_id], item_type))
+                inserted = self._insert_ignore(session, UserItemState, rows, ['user_id', 'state', 'item_type', 'item_id'])
+                self._bump_counters(session, {(f'user_{state}', user_id): inserted - deleted})
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def _add_state(self, item_id, state, user_id, item_type, remove_states=()):
+        """Add an item to a list, optionally removing it from other lists in the same transaction"""
+        session = self.get_session()
+        try:
+            rows = self._state_rows(user_id, state, [item_id], item_type)
+            deltas = {(f'user_{state}', user_id): self._insert_ignore(
+                session, UserItemState, rows, ['user_id', 'state', 'item_type', 'item_id']
+            )}
+            for other_state in remove_states:
+                deltas[(f'user_{other_state}', user_id)] = -session.query(UserItemState).filter_by(
+                    user_id=user_id, state=other_state, item_type=item_type, item_id=item_id
+                ).delete()
+            self._bump_counters(session, deltas)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def _remove_state(self, item_id, state, user_id, item_type=None):
+        """Remove an item from a list; without an item_type every type with that ID is removed"""
+        session = self.get_session()
+        try:
+            query = session.query(UserItemState).filter_by(user_id=user_id, state=state, item_id=item_id)
+            if item_type is not None:
+                query = query.filter_by(item_type=item_type)
+            self._bump_counters(session, {(f'user_{state}', user_id): -query.delete()})
             session.commit()
         except Exception as e:
             session.rollback()
@@ -381,56 +1924,27 @@ class DatabaseManager:
         finally:
             session.close()
     
-    def add_bookmark(self, item_id, user_id='default_user'):
+    def add_bookmark(self, item_id, user_id='default_user', item_type='resource'):
         """Add item to bookmarks"""
-        user_data = self.get_user_data(user_id)
-        bookmarks = user_data['bookmarks']
-        if item_id not in bookmarks:
-            bookmarks.append(item_id)
-            self.update_user_data(bookmarks=bookmarks, user_id=user_id)
+        self._add_state(item_id, 'bookmarks', user_id, item_type)
     
-    def remove_bookmark(self, item_id, user_id='default_user'):
+    def remove_bookmark(self, item_id, user_id='default_user', item_type=None):
         """Remove item from bookmarks"""
-        user_data = self.get_user_data(user_id)
-        bookmarks = user_data['bookmarks']
-        if item_id in bookmarks:
-            bookmarks.remove(item_id)
-            self.update_user_data(bookmarks=bookmarks, user_id=user_id)
+        self._remove_state(item_id, 'bookmarks', user_id, item_type)
     
     def add_completed(self, item_id, user_id='default_user'):
         """Add item to completed list"""
-        user_data = self.get_user_data(user_id)
-        completed = user_data['completed']
-        todo = user_data['todo']
-        
-        if item_id not in completed:
-            completed.append(item_id)
         # Remove from todo if present
-        if item_id in todo:
-            todo.remove(item_id)
-        
-        self.update_user_data(completed=completed, todo=todo, user_id=user_id)
+        self._add_state(item_id, 'completed', user_id, 'resource', remove_states=('todo',))
     
     def remove_completed(self, item_id, user_id='default_user'):
         """Remove item from completed list"""
-        user_data = self.get_user_data(user_id)
-        completed = user_data['completed']
-        if item_id in completed:
-            completed.remove(item_id)
-            self.update_user_data(completed=completed, user_id=user_id)
+        self._remove_state(item_id, 'completed', user_id, 'resource')
     
     def add_todo(self, item_id, user_id='default_user'):
         """Add item to todo list"""
-        user_data = self.get_user_data(user_id)
-        todo = user_data['todo']
-        if item_id not in todo:
-            todo.append(item_id)
-            self.update_user_data(todo=todo, user_id=user_id)
+        self._add_state(item_id, 'todo', user_id, 'resource')
     
     def remove_todo(self, item_id, user_id='default_user'):
         """Remove item from todo list"""
-        user_data = self.get_user_data(user_id)
-        todo = user_data['todo']
-        if item_id in todo:
-            todo.remove(item_id)
-            self.update_user_data(todo=todo, user_id=user_id)
\ No newline at end of file
+        self._remove_state(item_id, 'todo', user_id, 'resource')
@@ -1,14 +1,64 @@
-from utils.database import DatabaseManager
+import os
+import threading
+from utils.database import get_database_manager
+from utils.cache import ReadThroughCache
+from utils.data_store import DataStore
 
-class DBDataManager:
+# One catalog cache per database, shared by every rerun and session in the process
+_catalog_caches = {}
+_catalog_caches_lock = threading.Lock()
+
+# Dashboard statistics span every catalog table, so they are only kept briefly
+PLATFORM_STATS_TTL = float(os.getenv('PLATFORM_STATS_TTL', '30'))
+
+def get_catalog_cache(db):
+    """Get the process-wide catalog cache for a DatabaseManager"""
+    with _catalog_caches_lock:
+        cache = _catalog_caches.get(db.database_url)
+        if cache is None:
+            cache = ReadThroughCache(db.get_cache_generations)
+            _catalog_caches[db.database_url] = cache
+        return cache
+
+class UserStateSnapshot:
+    """Bookmarks, completed and todo items for one user, loaded once as sets of (item_type, item_id)"""
+    
+    def __init__(self, item_refs):
+        self.bookmarks = set(item_refs.get('bookmarks', []))
+        self.completed = set(item_refs.get('completed', []))
+        self.todo = set(item_refs.get('todo', []))
+    
+    def is_bookmarked(self, item_id, item_type='resource'):
+        return (item_type, item_id) in self.bookmarks
+    
+    def is_completed(self, item_id, item_type='resource'):
+        return (item_type, item_id) in self.completed
+    
+    def is_todo(self, item_id, item_type='resource'):
+        return (item_type, item_id) in self.todo
+
+class DBDataManager(DataStore):
     """Database-based data manager that replaces the file-based approach"""
     
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, database_url=None, user_id=None):
+        self.db = get_database_manager(database_url)
+        # A fixed user for scripts; pages act as the logged-in user
+        self.user_id = user_id
+        self.cache = get_catalog_cache(self.db)
+        # Pages build a DBDataManager per rerun, so this caches for one rerun only
+        self._user_state = None
+    
+    def _current_user_id(self):
+        """Get the username of the logged-in user, or the default user"""
+        if self.user_id:
+            return self.user_id
+        from utils.auth_manager import get_current_user
+        user = get_current_user()
+        return user['username'] if user else 'default_user'
     
     def load_documentation_links(self):
         """Load documentation links from database"""
-        return self.db.get_documentation_links()
+        return list(self.cache.get_or_load('documentation_links', 'all', self.db.get_documentation_links))
     
     def save_documentation_links(self, links):
         """This method is kept for compatibility but not used since we add links individually"""
@@ -16,11 +66,31 @@ class DBDataManager:
     
     def add_documentation_link(self, title, url, description, category, rating=5):
         """Add a new documentation link"""
-        return self.db.add_documentation_link(title, url, description, category, rating)
+        link_id = self.db.add_documentation_link(title, url, description, category, rating)
+        self.cache.invalidate('documentation_links')
+        self.cache.invalidate('platform_stats')
+        return link_id
+    
+    def load_resources(self, shape='detail'):
+        """Load resources from database in the 'summary' or 'detail' shape"""
+        return list(self.cache.get_or_load('resources', ('all', shape), lambda: self.db.get_resources(shape)))
     
-    def load_resources(self):
-        """Load resources from database"""
-        return self.db.get_resources()
+    def query_resources(self, search=None, category=None, type=None, sort='newest', limit=20, offset=0, cursor=None,
+                        author=None):
+        """Load one page of filtered resources with the total match count"""
+        key = ('query', search, category, type, author, sort, limit, offset, cursor)
+        result = self.cache.get_or_load('resources', key, lambda: self.db.query_resources(
+            search, category, type, sort, limit, offset, cursor, author
+        ))
+        return dict(result, items=list(result['items']))
+    
+    def get_resource_facets(self, search=None, category=None, type=None, author=None):
+        """Load category/type/author facet counts for a filter combination"""
+        key = ('facets', search, category, type, author)
+        facets = self.cache.get_or_load('resources', key, lambda: self.db.get_resource_facets(
+            search, category, type, author
+        ))
+        return {name: list(values) if isinstance(values, list) else values for name, values in facets.items()}
     
     def save_resources(self, resources):
         """This method is kept for compatibility but not used since we add resources individually"""
@@ -28,11 +98,55 @@ class DBDataManager:
     
     def add_resource(self, title, author, category, type, description, content=None, file_path=None, original_filename=None):
         """Add a new resource"""
-        return self.db.add_resource(title, author, category, type, description, content, file_path, original_filename)
+        resource_id = self.db.add_resource(title, author, category, type, description, content, file_path, original_filename)
+        self.cache.invalidate('resources')
+        self.cache.invalidate('platform_stats')
+        return resource_id
+    
+    def load_projects(self, shape='detail'):
+        """Load projects from database in the 'summary' or 'detail' shape"""
+        return list(self.cache.get_or_load('projects', ('all', shape), lambda: self.db.get_projects(shape)))
+    
+    def query_projects(self, search=None, category=None, technology=None, sort='newest', limit=12, cursor=None):
+        """Load one keyset page of project cards with the total match count"""
+        key = ('query', search, category, technology, sort, limit, cursor)
+        result = self.cache.get_or_load('projects', key, lambda: self.db.query_projects(
+            search, category, technology, sort, limit, cursor
+        ))
+        return dict(result, items=list(result['items']))
+    
+    def get_project_details(self, project_id):
+        """Load the write-up fields of one project"""
+        details = self.cache.get_or_load('projects', ('details', project_id),
+                                         lambda: self.db.get_project_details(project_id))
+        return dict(details) if details is not None else None
+    
+    def get_project_filter_options(self):
+        """Load the distinct project categories"""
+        options = self.cache.get_or_load('projects', 'filter_options', self.db.get_project_filter_options)
+        return {name: list(values) for name, values in options.items()}
+    
+    def get_technology_facets(self):
+        """Load [(technology, project count)], most used first"""
+        return list(self.cache.get_or_load('projects', 'technology_facets', self.db.get_technology_facets))
     
-    def load_projects(self):
-        """Load projects from database"""
-        return self.db.get_projects()
+    def like_project(self, project_id):
+        """Like a project as the current user; liking twice has no effect"""
+        liked = self.db.like_project(project_id, self._current_user_id())
+        if liked:
+            self.cache.invalidate('projects')
+        return liked
+    
+    def unlike_project(self, project_id):
+        """Withdraw the current user's like"""
+        unliked = self.db.unlike_project(project_id, self._current_user_id())
+        if unliked:
+            self.cache.invalidate('projects')
+        return unliked
+    
+    def get_liked_project_ids(self, project_ids=None):
+        """IDs of the projects the current user liked, optionally only among project_ids"""
+        return self.db.get_liked_project_ids(self._current_user_id(), project_ids)
     
     def save_projects(self, projects):
         """This method is kept for compatibility but not used since we add projects individually"""
@@ -42,63 +156,111 @@ class DBDataManager:
                    demo_url=None, external_link=None, status=None, challenges=None, learnings=None, future_plans=None, 
                    image_path=None):
         """Add a new project"""
-        return self.db.add_project(title, author, category, description, technologies, github_url,
-                                 demo_url, external_link, status, challenges, learnings, future_plans, image_path)
+        project_id = self.db.add_project(title, author, category, description, technologies, github_url,
+                                         demo_url, external_link, status, challenges, learnings, future_plans, image_path)
+        self.cache.invalidate('projects')
+        self.cache.invalidate('platform_stats')
+        return project_id
+    
+    def get_platform_stats(self, latest=5):
+        """Load dashboard counts, breakdowns and the newest resources and projects"""
+        return self.cache.get_or_load('platform_stats', latest, lambda: self.db.get_platform_stats(latest),
+                                      ttl=PLATFORM_STATS_TTL)
+    
+    def get_user_counters(self, user_id=None):
+        """Load the user's bookmark/completed/todo counts"""
+        if user_id is None:
+            user_id = self._current_user_id()
+        return self.db.get_user_counters(user_id)
+    
+    def rebuild_counters(self):
+        """Recompute platform counters from the source tables"""
+        count = self.db.rebuild_counters()
+        self.cache.invalidate('platform_stats')
+        return count
+    
+    def get_cache_stats(self):
+        """Catalog cache hit/miss counters"""
+        return self.cache.stats()
+    
+    def get_job_stats(self):
+        """Background job counts by status and recent failures"""
+        return self.db.get_job_stats()
+    
+    def retry_failed_jobs(self):
+        """Re-queue every failed background job"""
+        return self.db.retry_failed_jobs()
+    
+    def get_resource_text_stats(self):
+        """Number of resources and pages with extracted document text"""
+        return self.db.get_resource_text_stats()
+    
+    def search(self, query, item_types=None, limit=20):
+        """Ranked full-text search across resources, projects and documentation links"""
+        return self.db.search_items(query, item_types, limit)
+    
+    def search_item_ids(self, query, item_type):
+        """Get the IDs of one item type matching a search query"""
+        return self.db.search_item_ids(query, item_type)
     
     def load_user_data(self, user_id=None):
         """Load user data from database"""
         if user_id is None:
-            from utils.auth_manager import get_current_user
-            user = get_current_user()
-            user_id = user['username'] if user else 'default_user'
+            user_id = self._current_user_id()
         return self.db.get_user_data(user_id)
     
+    def load_user_item_refs(self, user_id=None):
+        """Load the user's lists as (item_type, item_id) references"""
+        if user_id is None:
+            user_id = self._current_user_id()
+        return self.db.get_user_item_refs(user_id)
+    
+    def get_user_state(self):
+        """Get the current user's state snapshot, loading it at most once per rerun"""
+        if self._user_state is None:
+            self._user_state = UserStateSnapshot(self.load_user_item_refs())
+        return self._user_state
+    
+    def get_items_by_refs(self, refs, shape='detail'):
+        """Resolve (item_type, item_id) references to item dicts in batched queries"""
+        return self.db.get_items_by_refs(refs, shape)
+    
     def save_user_data(self, user_data):
         """Save user data to database"""
+        self._user_state = None
         self.db.update_user_data(
             bookmarks=user_data.get('bookmarks'),
             completed=user_data.get('completed'),
-            todo=user_data.get('todo')
+            todo=user_data.get('todo'),
+            user_id=self._current_user_id()
         )
     
-    def add_bookmark(self, item_id, item_type=None):
+    def add_bookmark(self, item_id, item_type='resource'):
         """Add item to bookmarks"""
-        from utils.auth_manager import get_current_user
-        user = get_current_user()
-        user_id = user['username'] if user else 'default_user'
-        self.db.add_bookmark(item_id, user_id)
+        self._user_state = None
+        self.db.add_bookmark(item_id, self._current_user_id(), item_type)
     
-    def remove_bookmark(self, item_id):
+    def remove_bookmark(self, item_id, item_type=None):
         """Remove item from bookmarks"""
-        from utils.auth_manager import get_current_user
-        user = get_current_user()
-        user_id = user['username'] if user else 'default_user'
-        self.db.remove_bookmark(item_id, user_id)
+        self._user_state = None
+        self.db.remove_bookmark(item_id, self._current_user_id(), item_type)
     
     def add_completed(self, item_id):
         """Add item to completed list"""
-        from utils.auth_manager import get_current_user
-        user = get_current_user()
-        user_id = user['username'] if user else 'default_user'
-        self.db.add_completed(item_id, user_id)
+        self._user_state = None
+        self.db.add_completed(item_id, self._current_user_id())
     
     def remove_completed(self, item_id):
         """Remove item from completed list"""
-        from utils.auth_manager import get_current_user
-        user = get_current_user()
-        user_id = user['username'] if user else 'default_user'
-        self.db.remove_completed(item_id, user_id)
+        self._user_state = None
+        self.db.remove_completed(item_id, self._current_user_id())
     
     def add_todo(self, item_id):
         """Add item to todo list"""
-        from utils.auth_manager import get_current_user
-        user = get_current_user()
-        user_id = user['username'] if user else 'default_user'
-        self.db.add_todo(item_id, user_id)
+        self._user_state = None
+        self.db.add_todo(item_id, self._current_user_id())
     
     def remove_todo(self, item_id):
         """Remove item from todo list"""
-        from utils.auth_manager import get_current_user
-        user = get_current_user()
-        user_id = user['username'] if user else 'default_user'
-        self.db.remove_todo(item_id, user_id)
\ No newline at end of file
+        self._user_state = None
+        self.db.remove_todo(item_id, self._current_user_id())
\ No newline at end of file
@@ -1,10 +1,57 @@
 import os
 import base64
+from contextlib import contextmanager
 from datetime import datetime
+from utils.storage import CHUNK_SIZE, get_storage, copy_to_temp_file
+from utils.blob_store import BlobStore, BLOB_ID_PREFIX, is_blob_id, blob_key
+from utils.image_derivatives import ImageDerivatives, CARD_WIDTH
+
+# File extensions grouped by the size limit that applies to them
+FILE_KINDS = {
+    'image': {'jpg', 'jpeg', 'png', 'gif', 'webp'},
+    'document': {'pdf', 'doc', 'docx', 'txt', 'ppt', 'pptx', 'xls', 'xlsx'},
+    'archive': {'zip'}
+}
+
+# Default per-kind limits in MB, overridable with UPLOAD_MAX_<KIND>_MB
+DEFAULT_SIZE_LIMITS_MB = {
+    'image': 10,
+    'document': 50,
+    'archive': 200,
+    'other': 25
+}
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the size limit for its file type"""
+    
+    def __init__(self, filename, limit):
+        self.filename = filename
+        self.limit = limit
+        super().__init__(f"{filename} is larger than the {limit / (1024 * 1024):g} MB limit for this file type")
+
+class _LimitedReader:
+    """Wrap a readable stream and raise FileTooLargeError once more than limit bytes are read"""
+    
+    def __init__(self, stream, limit, filename):
+        self.stream = stream
+        self.limit = limit
+        self.filename = filename
+        self.bytes_read = 0
+    
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.bytes_read += len(chunk)
+        if self.limit is not None and self.bytes_read > self.limit:
+            raise FileTooLargeError(self.filename, self.limit)
+        return chunk
 
 class FileHandler:
-    def __init__(self):
-        self.upload_dir = "uploads"
+    def __init__(self, size_limits=None, storage=None):
+        self.upload_dir = os.getenv('UPLOAD_DIR', 'uploads')
+        self.size_limits = size_limits or self.get_size_limits()
+        self.storage = storage or get_storage(self.upload_dir)
+        self.blob_store = BlobStore(self.storage)
+        self.derivatives = ImageDerivatives(self)
         self.ensure_upload_directory()
     
     def ensure_upload_directory(self):
@@ -12,35 +59,137 @@ class FileHandler:
         if not os.path.exists(self.upload_dir):
             os.makedirs(self.upload_dir)
     
-    def save_uploaded_file(self, uploaded_file, resource_id, prefix="resource_"):
-        """Save uploaded file and return the file path"""
+    def get_size_limits(self):
+        """Read per-kind upload size limits (in bytes) from the environment"""
+        return {
+            kind: int(os.getenv(f'UPLOAD_MAX_{kind.upper()}_MB', str(default))) * 1024 * 1024
+            for kind, default in DEFAULT_SIZE_LIMITS_MB.items()
+        }
+    
+    def get_file_kind(self, filename):
+        """Classify a filename as image, document, archive or other"""
+        extension = os.path.splitext(filename)[1].lower().lstrip('.')
+        for kind, extensions in FILE_KINDS.items():
+            if extension in extensions:
+                return kind
+        return 'other'
+    
+    def get_size_limit(self, filename):
+        """Get the maximum upload size in bytes for a filename"""
+        return self.size_limits[self.get_file_kind(filename)]
+    
+    def _check_upload_size(self, uploaded_file):
+        """Reject an upload whose declared size is over its limit and return the limit"""
+        limit = self.get_size_limit(uploaded_file.name)
+        if getattr(uploaded_file, 'size', None) is not None and uploaded_file.size > limit:
+            raise FileTooLargeError(uploaded_file.name, limit)
+        return limit
+    
+    def store_uploaded_file(self, uploaded_file):
+        """Store an upload in the content-addressed blob store and return its blob ID.
+        
+        Identical files uploaded again reuse the stored blob. Raises
+        FileTooLargeError if the file exceeds the limit for its type.
+        """
+        limit = self._check_upload_size(uploaded_file)
         try:
-            # Create filename with timestamp to avoid conflicts
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{prefix}{resource_id}_{timestamp}_{uploaded_file.name}"
-            file_path = os.path.join(self.upload_dir, filename)
-            
-            # Save the file
-            with open(file_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            
-            return file_path
+            if hasattr(uploaded_file, 'seek'):
+                uploaded_file.seek(0)
+            blob_id, size, created = self.blob_store.put_stream(
+                _LimitedReader(uploaded_file, limit, uploaded_file.name)
+            )
+            return blob_id
+        except FileTooLargeError:
+            raise
         except Exception as e:
-            print(f"Error saving file: {e}")
+            print(f"Error storing file: {e}")
             return None
     
+    def resolve_path(self, file_path):
+        """Get the local path for a stored file reference (blob ID or legacy path).
+        
+        Returns None for blobs held by a remote storage backend.
+        """
+        if is_blob_id(file_path):
+            return self.blob_store.path_for(file_path)
+        return file_path
+    
+    def get_location(self, file_path, filename=None):
+        """Get a local path or URL that st.image and links can load a stored file from"""
+        local_path = self.resolve_path(file_path)
+        if local_path is not None:
+            return local_path
+        return self.storage.presign(blob_key(file_path), filename)
+    
+    def get_download_url(self, file_path, filename=None):
+        """Get a browser download URL: presigned by the backend if it can, else the local file server"""
+        if is_blob_id(file_path):
+            url = self.storage.presign(blob_key(file_path), filename)
+            if url:
+                return url
+        from utils.file_server import get_download_url
+        return get_download_url(file_path, filename)
+    
+    @contextmanager
+    def open_local(self, file_path):
+        """Context manager giving a local path for a stored file, downloading remote blobs to a temp file"""
+        local_path = self.resolve_path(file_path)
+        if local_path is not None:
+            yield local_path
+            return
+        temp_path = copy_to_temp_file(self.storage, blob_key(file_path))
+        try:
+            yield temp_path
+        finally:
+            os.remove(temp_path)
+    
+    def get_thumbnail(self, file_path, width=CARD_WIDTH):
+        """Get a downscaled copy of a stored image for listings, falling back to the original"""
+        return self.derivatives.get_thumbnail(file_path, width)
+    
+    def iter_file_chunks(self, file_path, chunk_size=CHUNK_SIZE, start=0, end=None):
+        """Yield a file's bytes in chunks, optionally limited to the byte range [start, end)"""
+        if is_blob_id(file_path):
+            yield from self.storage.get_stream(blob_key(file_path), start, end, chunk_size)
+            return
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+    
+    def iter_file_base64(self, file_path, chunk_size=CHUNK_SIZE):
+        """Yield a file as base64 text in pieces that concatenate to the full encoding"""
+        # Read multiples of 3 bytes so no piece needs padding except the last
+        chunk_size -= chunk_size % 3
+        for chunk in self.iter_file_chunks(file_path, chunk_size):
+            yield base64.b64encode(chunk).decode()
+    
     def get_file_as_base64(self, file_path):
-        """Convert file to base64 string for embedding"""
+        """Convert file to base64 string for embedding.
+        
+        This holds the whole encoding in memory; prefer iter_file_base64 for large files.
+        """
         try:
-            with open(file_path, "rb") as f:
-                return base64.b64encode(f.read()).decode()
+            return ''.join(self.iter_file_base64(file_path))
         except Exception as e:
             print(f"Error converting file to base64: {e}")
             return None
     
     def delete_file(self, file_path):
-        """Delete a file if it exists"""
+        """Delete a file if it exists.
+        
+        Blob IDs delete the shared blob, so only call this once nothing references it.
+        """
         try:
+            if is_blob_id(file_path):
+                return self.blob_store.delete(file_path)
             if os.path.exists(file_path):
                 os.remove(file_path)
                 return True
@@ -52,14 +201,26 @@ class FileHandler:
     def get_file_info(self, file_path):
         """Get file information"""
         try:
-            if os.path.exists(file_path):
+            if is_blob_id(file_path):
+                stat = self.storage.stat(blob_key(file_path))
+                if stat is None:
+                    return {"exists": False}
+                # Blob content never changes, so its digest is a strong validator
+                etag = f'"{file_path[len(BLOB_ID_PREFIX):]}"'
+                size, mtime = stat['size'], stat['mtime']
+            elif os.path.isfile(file_path):
                 stat = os.stat(file_path)
-                return {
-                    "size": stat.st_size,
-                    "modified": datetime.fromtimestamp(stat.st_mtime),
-                    "exists": True
-                }
-            return {"exists": False}
+                etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+                size, mtime = stat.st_size, stat.st_mtime
+            else:
+                return {"exists": False}
+            return {
+                "size": size,
+                "modified": datetime.fromtimestamp(mtime),
+                "mtime": mtime,
+                "etag": etag,
+                "exists": True
+            }
         except Exception as e:
             print(f"Error getting file info: {e}")
             return {"exists": False}
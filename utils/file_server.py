@@ -0,0 +1,236 @@
+"""Static download server for uploaded files.
+
+Files are streamed straight from disk with ETag/Last-Modified validation and
+byte-range support, so large downloads never pass through Streamlit or sit in
+Python memory. The app starts it in a background thread; it can also run alone:
+
+    FILE_SERVER_SECRET=... python -m utils.file_server --port 8502
+
+The server does not go through the app's login. Instead every URL carries an
+expiry time and an HMAC signature made with FILE_SERVER_SECRET, and only pages
+behind require_auth hand those URLs out (see get_download_url). A server run on
+its own must share FILE_SERVER_SECRET with the app; when it is unset, the app
+signs with a random per-process key that only its embedded server knows. Keep the
+port off the public network or behind a proxy all the same.
+"""
+import os
+import re
+import hmac
+import time
+import hashlib
+import secrets
+import argparse
+import threading
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote, parse_qs, quote
+from utils.file_handler import FileHandler, CHUNK_SIZE
+from utils.blob_store import is_blob_id
+
+FILE_SERVER_HOST = os.getenv('FILE_SERVER_HOST', '127.0.0.1')
+FILE_SERVER_PORT = int(os.getenv('FILE_SERVER_PORT', '8502'))
+
+# Signed URLs stay valid for at least this many seconds
+FILE_URL_TTL = int(os.getenv('FILE_URL_TTL', '3600'))
+
+_url_secret = (os.getenv('FILE_SERVER_SECRET') or secrets.token_hex(32)).encode()
+
+_server_lock = threading.Lock()
+_server = None
+
+class FileRequestHandler(BaseHTTPRequestHandler):
+    """Serve /files/<blob ID or upload filename>?expires=..&sig=..&name=<download filename>"""
+    
+    file_handler = None
+    protocol_version = 'HTTP/1.1'
+    
+    def do_HEAD(self):
+        self._serve(send_body=False)
+    
+    def do_GET(self):
+        self._serve(send_body=True)
+    
+    def _serve(self, send_body):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        name = unquote(url.path)[len('/files/'):]
+        if not verify_signature(name, query.get('expires', [''])[0], query.get('sig', [''])[0]):
+            self._send_empty(403)
+            return
+        file_ref = self._file_ref(unquote(url.path))
+        info = self.file_handler.get_file_info(file_ref) if file_ref else {'exists': False}
+        if not info['exists']:
+            self._send_empty(404)
+            return
+        
+        if self._not_modified(info):
+            self.send_response(304)
+            self._send_validators(info)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        size = info['size']
+        byte_range = self._byte_range(size, info)
+        if byte_range == 'unsatisfiable':
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        download_name = query.get('name', [os.path.basename(file_ref)])[0]
+        start, end = byte_range or (0, size)
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Type', mimetypes.guess_type(download_name)[0] or 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start))
+        self.send_header('Content-Disposition', f"attachment; filename*=UTF-8''{quote(download_name)}")
+        self.send_header('Accept-Ranges', 'bytes')
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{size}')
+        self._send_validators(info)
+        self.end_headers()
+        if send_body and end > start:
+            self._send_file(file_ref, start, end)
+    
+    def _file_ref(self, path):
+        """Map a URL path to a blob ID or a file directly inside the upload directory"""
+        if not path.startswith('/files/'):
+            return None
+        name = path[len('/files/'):]
+        if is_blob_id(name) and re.fullmatch(r'sha256:[0-9a-f]{64}', name):
+            return name
+        if not name or name != os.path.basename(name) or name.startswith('.'):
+            return None
+        return os.path.join(self.file_handler.upload_dir, name)
+    
+    def _not_modified(self, info):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            return info['etag'] in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(info['mtime']) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+    
+    def _byte_range(self, size, info):
+        """Parse a single-range Range header into (start, end), None for the whole file"""
+        header = self.headers.get('Range')
+        if not header:
+            return None
+        # A stale If-Range means the client's partial copy is outdated: send everything
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range.strip() != info['etag']:
+            return None
+        match = re.fullmatch(r'bytes=(\d*)-(\d*)', header.strip())
+        if not match or match.group(1) == match.group(2) == '':
+            return None
+        if match.group(1) == '':
+            suffix = int(match.group(2))
+            if suffix == 0:
+                return 'unsatisfiable'
+            return max(size - suffix, 0), size
+        start = int(match.group(1))
+        end = min(int(match.group(2)) + 1, size) if match.group(2) else size
+        if start >= size or end <= start:
+            return 'unsatisfiable'
+        return start, end
+    
+    def _send_validators(self, info):
+        self.send_header('ETag', info['etag'])
+        self.send_header('Last-Modified', formatdate(info['mtime'], usegmt=True))
+        self.send_header('Cache-Control', 'private, max-age=3600')
+    
+    def _send_file(self, file_ref, start, end):
+        try:
+            local_path = self.file_handler.resolve_path(file_ref)
+            # sendfile copies from the page cache to the socket without touching Python memory
+            if local_path is not None and hasattr(os, 'sendfile'):
+                with open(local_path, 'rb') as f:
+                    offset = start
+                    while offset < end:
+                        sent = os.sendfile(self.connection.fileno(), f.fileno(), offset, min(end - offset, CHUNK_SIZE))
+                        if sent == 0:
+                            break
+                        offset += sent
+                return
+            for chunk in self.file_handler.iter_file_chunks(file_ref, CHUNK_SIZE, start, end):
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        pass
+
+def _signature(name, expires):
+    return hmac.new(_url_secret, f"{name}\n{expires}".encode(), hashlib.sha256).hexdigest()
+
+def verify_signature(name, expires, signature):
+    """Check a download URL's signature and that it hasn't expired"""
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(_signature(name, expires), signature)
+
+def create_server(host=None, port=None, file_handler=None):
+    """Build a threaded download server bound to host:port"""
+    handler = type('BoundFileRequestHandler', (FileRequestHandler,), {'file_handler': file_handler or FileHandler()})
+    return ThreadingHTTPServer((host or FILE_SERVER_HOST, port or FILE_SERVER_PORT), handler)
+
+def ensure_file_server():
+    """Start the download server in a daemon thread once per process.
+    
+    Returns False if the port is taken, e.g. by a server run from another process;
+    that is not retried on later calls.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return bool(_server)
+        try:
+            _server = create_server()
+        except OSError as e:
+            print(f"File server not started: {e}")
+            _server = False
+            return False
+        threading.Thread(target=_server.serve_forever, name='file-server', daemon=True).start()
+        return True
+
+def get_download_url(file_ref, filename=None):
+    """Signed URL of a stored file on the download server, valid for at least FILE_URL_TTL seconds"""
+    # Set FILE_SERVER_URL when browsers reach the server through another host or a proxy
+    base_url = os.getenv('FILE_SERVER_URL', f'http://localhost:{FILE_SERVER_PORT}')
+    name = file_ref if is_blob_id(file_ref) else os.path.basename(file_ref)
+    # Expiry is rounded up to the next TTL window so the URL, and the browser's cached
+    # copy, stay the same across reruns within a window
+    expires = (int(time.time()) // FILE_URL_TTL + 2) * FILE_URL_TTL
+    url = f"{base_url.rstrip('/')}/files/{quote(name)}?expires={expires}&sig={_signature(name, expires)}"
+    if filename:
+        url += f"&name={quote(filename)}"
+    return url
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve V-Learn uploads")
+    parser.add_argument('--host', default=FILE_SERVER_HOST)
+    parser.add_argument('--port', type=int, default=FILE_SERVER_PORT)
+    args = parser.parse_args(argv)
+    if not os.getenv('FILE_SERVER_SECRET'):
+        parser.error("set FILE_SERVER_SECRET to the value the app signs download URLs with")
+    
+    server = create_server(args.host, args.port)
+    print(f"Serving uploads on http://{args.host}:{args.port}/files/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import os
+import hashlib
+import tempfile
+import threading
+from utils.blob_store import BLOB_ID_PREFIX, is_blob_id
+
+# Widths generated for every uploaded image; listing cards use CARD_WIDTH
+THUMBNAIL_WIDTHS = (320, 640)
+CARD_WIDTH = 640
+
+THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', '80'))
+
+DERIVATIVES_PREFIX = 'derivatives'
+
+class ImageDerivatives:
+    """Downscaled, recompressed copies of uploaded images cached in storage.
+    
+    Derivatives live at derivatives/<source sha256>_<width>.<ext>, so they are
+    shared by every row pointing at the same content and never go stale. Pillow
+    is imported lazily; without it (or for unreadable images) callers get the
+    original file back.
+    """
+    
+    def __init__(self, file_handler):
+        self.file_handler = file_handler
+        self.storage = file_handler.storage
+        self._digests = {}
+        self._lock = threading.Lock()
+    
+    def get_thumbnail(self, file_ref, width=CARD_WIDTH):
+        """Get the path or URL of a thumbnail for a stored image, generating it on first request"""
+        if not file_ref or not self.file_handler.get_file_info(file_ref)['exists']:
+            return self.file_handler.resolve_path(file_ref)
+        try:
+            key = self.create(file_ref, width)
+            if key:
+                return self.storage.local_path(key) or self.storage.presign(key)
+        except Exception as e:
+            print(f"Error creating thumbnail: {e}")
+        return self.file_handler.get_location(file_ref)
+    
+    def create(self, file_ref, width):
+        """Create one thumbnail if it doesn't exist yet and return its storage key.
+        
+        Returns None when Pillow is unavailable; errors are raised to the caller.
+        """
+        digest = self._source_digest(file_ref)
+        for extension in ('webp', 'jpg'):
+            key = self._derivative_key(digest, width, extension)
+            if self.storage.exists(key):
+                return key
+        with self.file_handler.open_local(file_ref) as source_path:
+            return self._generate(source_path, digest, width)
+    
+    def generate_all(self, file_ref, widths=THUMBNAIL_WIDTHS):
+        """Create every thumbnail size for an uploaded image"""
+        return [self.create(file_ref, width) for width in widths]
+    
+    def _source_digest(self, file_ref):
+        if is_blob_id(file_ref):
+            return file_ref[len(BLOB_ID_PREFIX):]
+        # Legacy paths are hashed once per process and re-hashed if the file changes
+        stat = os.stat(file_ref)
+        key = (file_ref, stat.st_mtime, stat.st_size)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            for chunk in self.file_handler.iter_file_chunks(file_ref):
+                sha.update(chunk)
+            digest = sha.hexdigest()
+            with self._lock:
+                self._digests[key] = digest
+        return digest
+    
+    def _derivative_key(self, digest, width, extension):
+        return f"{DERIVATIVES_PREFIX}/{digest}_{width}.{extension}"
+    
+    def _generate(self, source_path, digest, width):
+        try:
+            from PIL import Image, features
+        except ImportError:
+            return None
+        
+        with Image.open(source_path) as image:
+            image.draft('RGB', (width, width))  # lets JPEG decode at reduced size
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.LANCZOS)
+            
+            if features.check('webp'):
+                extension, save_format = 'webp', 'WEBP'
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            else:
+                extension, save_format = 'jpg', 'JPEG'
+                if image.mode != 'RGB':
+                    image = image.convert('RGB')
+            
+            key = self._derivative_key(digest, width, extension)
+            fd, temp_path = tempfile.mkstemp(dir=self.storage.temp_dir, prefix='.thumb_', suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    image.save(temp_file, save_format, quality=THUMBNAIL_QUALITY, optimize=True)
+                self.storage.store_file(key, temp_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            return key
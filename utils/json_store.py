@@ -0,0 +1,284 @@
+import os
+import json
+import uuid
+import tempfile
+import threading
+from contextlib import contextmanager
+from utils.storage import fsync_directory
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking falls back to in-process only
+    fcntl = None
+
+class JsonLogStore:
+    """Embedded JSON store: a snapshot file plus an append-only JSON-lines write-ahead log.
+    
+    Every change is appended to <name>.wal.jsonl as one operation per line, so a write
+    costs O(changes) rather than rewriting the file. After compact_every operations
+    the state is written to the snapshot (same format as the original .json files)
+    by atomic rename, and a fresh log is started. The state is held in memory and
+    caught up from the log tail on each access, so changes made by other processes
+    are seen; an flock on <name>.lock serializes writers across processes.
+    """
+    
+    def __init__(self, snapshot_path, default, compact_every=None):
+        base = os.path.splitext(snapshot_path)[0]
+        self.snapshot_path = snapshot_path
+        self.wal_path = base + '.wal.jsonl'
+        self.lock_path = base + '.lock'
+        self.default = default
+        self.compact_every = compact_every or int(os.getenv('JSON_STORE_COMPACT_EVERY', '500'))
+        self.fsync = os.getenv('JSON_STORE_FSYNC', 'true').lower() in ('1', 'true', 'yes')
+        self._lock = threading.RLock()
+        self._state = None
+        self._wal_id = None
+        self._wal_offset = 0
+        self._wal_entries = 0
+    
+    # Subclasses define the in-memory state and how operations change it
+    def _state_from_snapshot(self, data):
+        raise NotImplementedError
+    
+    def _state_to_snapshot(self, state):
+        raise NotImplementedError
+    
+    def _apply(self, state, op):
+        raise NotImplementedError
+    
+    def exists(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.wal_path)
+    
+    @contextmanager
+    def _file_lock(self, exclusive):
+        with self._lock:
+            with open(self.lock_path, 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    @contextmanager
+    def reading(self):
+        """Context manager yielding the up-to-date state; callers must copy what they keep"""
+        with self._file_lock(exclusive=False):
+            self._refresh()
+            yield self._state
+    
+    def mutate(self, change):
+        """Apply change(state) -> list of operations atomically and log them"""
+        with self._file_lock(exclusive=True):
+            self._refresh()
+            ops = change(self._state)
+            if ops:
+                self._append(ops)
+    
+    def compact(self):
+        with self._file_lock(exclusive=True):
+            self._refresh()
+            self._compact()
+    
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                return self._state_from_snapshot(json.load(f))
+        except (FileNotFoundError, ValueError):
+            return self._state_from_snapshot(self.default)
+    
+    def _read_wal_id(self):
+        """Each log starts with a header naming it, so a replaced log is never read from a stale offset"""
+        try:
+            with open(self.wal_path, 'rb') as f:
+                header = json.loads(f.readline())
+                return header.get('wal_id')
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def _refresh(self):
+        wal_id = self._read_wal_id()
+        if self._state is None or wal_id != self._wal_id:
+            self._state = self._load_snapshot()
+            self._wal_id = wal_id
+            self._wal_offset = 0
+            self._wal_entries = 0
+        if wal_id is None:
+            return
+        
+        with open(self.wal_path, 'rb') as f:
+            f.seek(self._wal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # A torn write from a crash; the next append starts a new line after it
+                    self._wal_offset += len(line)
+                    break
+                self._wal_offset += len(line)
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    continue
+                if 'op' in op:
+                    self._apply(self._state, op)
+                    self._wal_entries += 1
+    
+    def _append(self, ops):
+        if self._wal_id is None:
+            self._start_wal()
+        data = ''.join(json.dumps(op, separators=(',', ':')) + '\n' for op in ops).encode()
+        with open(self.wal_path, 'a+b') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    data = b'\n' + data
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            self._wal_offset = f.tell()
+        for op in ops:
+            self._apply(self._state, op)
+        self._wal_entries += len(ops)
+        if self._wal_entries >= self.compact_every:
+            self._compact()
+    
+    def _write_atomic(self, path, data):
+        directory = os.path.dirname(path) or '.'
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.json_store_', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+            fsync_directory(directory)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def _start_wal(self):
+        wal_id = uuid.uuid4().hex
+        header = json.dumps({'wal_id': wal_id}) + '\n'
+        self._write_atomic(self.wal_path, header.encode())
+        self._wal_id = wal_id
+        self._wal_offset = len(header)
+        self._wal_entries = 0
+    
+    def _compact(self):
+        # Snapshot first: if we crash before the new log replaces the old one, replaying
+        # the old log over the new snapshot is harmless because operations are idempotent
+        snapshot = json.dumps(self._state_to_snapshot(self._state), indent=2)
+        self._write_atomic(self.snapshot_path, snapshot.encode())
+        self._start_wal()
+
+class RecordStore(JsonLogStore):
+    """A list of dicts keyed by their 'id', e.g. resources.json"""
+    
+    def _state_from_snapshot(self, data):
+        return {record['id']: record for record in data}
+    
+    def _state_to_snapshot(self, state):
+        return list(state.values())
+    
+    def _apply(self, state, op):
+        if op['op'] == 'put':
+            state[op['id']] = op['value']
+        elif op['op'] == 'delete':
+            state.pop(op['id'], None)
+    
+    def load(self):
+        with self.reading() as state:
+            return [dict(record) for record in state.values()]
+    
+    def insert(self, record):
+        """Add a record under the next free ID and return the ID"""
+        inserted = {}
+        
+        def change(state):
+            inserted['id'] = max(state, default=0) + 1
+            return [{'op': 'put', 'id': inserted['id'], 'value': dict(record, id=inserted['id'])}]
+        self.mutate(change)
+        return inserted['id']
+    
+    def save(self, records):
+        """Store a full list of records, logging only the records that changed"""
+        records = [dict(record) for record in records]
+        
+        def change(state):
+            ops = []
+            ids = set()
+            for record in records:
+                ids.add(record['id'])
+                if state.get(record['id']) != record:
+                    ops.append({'op': 'put', 'id': record['id'], 'value': record})
+            ops.extend({'op': 'delete', 'id': record_id} for record_id in state if record_id not in ids)
+            return ops
+        self.mutate(change)
+
+class ListSetStore(JsonLogStore):
+    """A dict of named lists without duplicates, e.g. user_data.json"""
+    
+    def _state_from_snapshot(self, data):
+        # dicts keep insertion order and give O(1) membership tests
+        return {name: dict.fromkeys(items) for name, items in data.items()}
+    
+    def _state_to_snapshot(self, state):
+        return {name: list(items) for name, items in state.items()}
+    
+    def _apply(self, state, op):
+        items = state.setdefault(op['list'], {})
+        if op['op'] == 'add':
+            items[op['item']] = None
+        elif op['op'] == 'remove':
+            items.pop(op['item'], None)
+    
+    def load(self):
+        with self.reading() as state:
+            return self._state_to_snapshot(state)
+    
+    def contains(self, name, item):
+        with self.reading() as state:
+            return item in state.get(name, {})
+    
+    def update(self, add=(), remove=()):
+        """Add and remove (list name, item) pairs; only real changes are logged"""
+        def change(state):
+            ops = [
+                {'op': 'remove', 'list': name, 'item': item}
+                for name, item in remove if item in state.get(name, {})
+            ]
+            ops.extend(
+                {'op': 'add', 'list': name, 'item': item}
+                for name, item in add if item not in state.get(name, {})
+            )
+            return ops
+        self.mutate(change)
+    
+    def save(self, lists):
+        """Store full lists, logging only the items added or removed"""
+        def change(state):
+            ops = []
+            for name, items in lists.items():
+                current = state.get(name, {})
+                wanted = dict.fromkeys(items)
+                ops.extend({'op': 'remove', 'list': name, 'item': item} for item in current if item not in wanted)
+                ops.extend({'op': 'add', 'list': name, 'item': item} for item in wanted if item not in current)
+            return ops
+        self.mutate(change)
+
+# Stores are loaded once per process and shared, like database engines
+_stores_lock = threading.Lock()
+_stores = {}
+
+def get_json_store(snapshot_path, store_class, default):
+    """Get the process-wide store for a snapshot file"""
+    key = os.path.abspath(snapshot_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = store_class(snapshot_path, default)
+            _stores[key] = store
+        return store
@@ -0,0 +1,118 @@
+"""Maintenance commands for the V-Learn database.
+
+Run from the project root:
+
+    python -m utils.maintenance rebuild-counters
+    python -m utils.maintenance rebuild-search-index
+    python -m utils.maintenance rebuild-technologies
+    python -m utils.maintenance rebuild-likes
+    python -m utils.maintenance backfill-blobs
+    python -m utils.maintenance rebuild-blob-refcounts
+    python -m utils.maintenance extract-text
+    python -m utils.maintenance gc-uploads [--dry-run]
+"""
+import os
+import argparse
+from utils.database import get_database_manager
+from utils.file_handler import FileHandler
+from utils.upload_gc import UploadGC
+
+def rebuild_counters(db, args):
+    count = db.rebuild_counters()
+    print(f"Rebuilt {count} counters")
+
+def rebuild_search_index(db, args):
+    count = db.rebuild_search_index()
+    print(f"Indexed {count} items")
+
+def rebuild_technologies(db, args):
+    count = db.rebuild_project_technologies()
+    print(f"Indexed {count} project technologies")
+
+def rebuild_likes(db, args):
+    count = db.rebuild_project_likes()
+    print(f"Recounted likes for {count} projects")
+
+def backfill_blobs(db, args):
+    """Move legacy top-level uploads into the blob store and repoint their rows.
+    
+    Rows are matched on the path exactly as stored (uploads/x, ./uploads/x, an
+    absolute path, ...), and a legacy file is removed only once no row uses it.
+    """
+    file_handler = FileHandler()
+    # Legacy paths are opened relative to the working directory, so group the stored
+    # values by the file they resolve to
+    stored_paths = {}
+    for stored_path in db.get_legacy_file_references():
+        stored_paths.setdefault(os.path.realpath(stored_path), []).append(stored_path)
+    
+    mapping = {}
+    moved = {}
+    reclaimed = 0
+    with os.scandir(file_handler.upload_dir) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            legacy_path = os.path.join(file_handler.upload_dir, entry.name)
+            blob_id, size, created = file_handler.blob_store.put_file(legacy_path)
+            if not created:
+                reclaimed += size
+            refs = stored_paths.get(os.path.realpath(legacy_path), [])
+            for stored_path in refs:
+                mapping[stored_path] = blob_id
+            moved[legacy_path] = refs
+    
+    # Repoint rows before removing the legacy files so nothing dangles on failure
+    updated = db.replace_file_references(mapping)
+    still_referenced = db.get_referenced_files(list(mapping))
+    removed = 0
+    for legacy_path, refs in moved.items():
+        if any(ref in still_referenced for ref in refs):
+            print(f"Kept {legacy_path}: a row still references it")
+            continue
+        os.remove(legacy_path)
+        removed += 1
+    db.rebuild_blob_refcounts()
+    print(f"Moved {removed} of {len(moved)} files into the blob store, updated {updated} rows, "
+          f"deduplicated {reclaimed} bytes")
+
+def rebuild_blob_refcounts(db, args):
+    count = db.rebuild_blob_refcounts()
+    print(f"Recounted references for {count} blobs")
+
+def extract_text(db, args):
+    """Queue text extraction for File resources that don't have extracted text yet"""
+    resource_ids = db.get_resources_missing_text()
+    for resource_id in resource_ids:
+        db.enqueue_job('extract_text', {'resource_id': resource_id})
+    print(f"Queued text extraction for {len(resource_ids)} resources; run python -m utils.worker to process them")
+
+def gc_uploads(db, args):
+    """Quarantine unreferenced uploads and delete ones quarantined longer than the grace period"""
+    report = UploadGC(db, FileHandler()).run(dry_run=args.dry_run)
+    dry_run_note = " (dry run, nothing changed)" if args.dry_run else ""
+    print(f"Scanned {report['scanned']} uploads{dry_run_note}")
+    print(f"Quarantined {report['quarantined']} files ({report['quarantined_bytes']} bytes), "
+          f"restored {report['restored']}")
+    print(f"Deleted {report['deleted']} files, reclaimed {report['reclaimed_bytes']} bytes")
+
+COMMANDS = {
+    'rebuild-counters': rebuild_counters,
+    'rebuild-search-index': rebuild_search_index,
+    'rebuild-technologies': rebuild_technologies,
+    'rebuild-likes': rebuild_likes,
+    'backfill-blobs': backfill_blobs,
+    'rebuild-blob-refcounts': rebuild_blob_refcounts,
+    'extract-text': extract_text,
+    'gc-uploads': gc_uploads
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="V-Learn maintenance commands")
+    parser.add_argument('command', choices=sorted(COMMANDS))
+    parser.add_argument('--dry-run', action='store_true', help="Report what gc-uploads would do without changing files")
+    args = parser.parse_args(argv)
+    COMMANDS[args.command](get_database_manager(), args)
+
+if __name__ == '__main__':
+    main()
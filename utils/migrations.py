@@ -0,0 +1,309 @@
+"""Versioned schema migrations for the V-Learn database.
+
+Run from the project root:
+
+    python -m utils.migrations upgrade            # apply every pending migration
+    python -m utils.migrations upgrade --to 3     # stop at version 3
+    python -m utils.migrations downgrade          # revert the latest migration
+    python -m utils.migrations downgrade --to 2   # revert down to version 2
+    python -m utils.migrations current
+    python -m utils.migrations history
+"""
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.declarative import declarative_base
+from utils.database import (
+    DatabaseManager, DocumentationLink, Resource, Project, UserData, UserItemState, CacheGeneration,
+    PlatformCounter, Blob, Job, ResourceText, ProjectTechnology, ProjectLike, USER_STATES
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking falls back to in-process only
+    fcntl = None
+
+MigrationBase = declarative_base()
+
+# Key of the Postgres advisory lock held while migrating ("VLMG")
+MIGRATION_LOCK_ID = 0x564C4D47
+
+# Database URLs whose migration lock the current thread holds, so nested callers don't wait on themselves
+_held_locks = threading.local()
+
+class SchemaMigration(MigrationBase):
+    __tablename__ = 'schema_migrations'
+    
+    version = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+class Migration:
+    """One schema version: upgrade and downgrade callables taking the DatabaseManager"""
+    
+    def __init__(self, version, name, upgrade, downgrade):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.downgrade = downgrade
+
+def _create_tables(*models):
+    def upgrade(db):
+        for model in models:
+            model.__table__.create(bind=db.engine, checkfirst=True)
+    return upgrade
+
+def _drop_tables(*models):
+    def downgrade(db):
+        for model in reversed(models):
+            model.__table__.drop(bind=db.engine, checkfirst=True)
+    return downgrade
+
+# Version 1: the original tables, seeded so later data migrations can resolve references
+def _upgrade_core_tables(db):
+    _create_tables(DocumentationLink, Resource, Project, UserData)(db)
+    db.initialize_default_data()
+
+# Version 2: normalized user item state
+def _upgrade_user_item_state(db):
+    _create_tables(UserItemState)(db)
+    db.migrate_user_data_json()
+    db.resolve_untyped_item_states()
+
+def _downgrade_user_item_state(db):
+    # Copy item IDs back into the JSON columns before dropping the table
+    session = db.get_session()
+    try:
+        for user_data in session.query(UserData).all():
+            user_refs = db.get_user_item_refs(user_data.user_id)
+            for state in USER_STATES:
+                setattr(user_data, state, [item_id for _, item_id in user_refs[state]])
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+    _drop_tables(UserItemState)(db)
+
+# Version 3: cache generation counters
+def _upgrade_cache_generations(db):
+    _create_tables(CacheGeneration)(db)
+    db.ensure_cache_generations()
+
+# Version 4: indexes on the columns the pages filter and sort on
+HOT_FILTER_INDEXES = [
+    ('ix_resources_category', 'resources', 'category'),
+    ('ix_resources_type', 'resources', 'type'),
+    ('ix_resources_author', 'resources', 'author'),
+    ('ix_resources_created_at', 'resources', 'created_at, id'),
+    ('ix_projects_category', 'projects', 'category'),
+    ('ix_projects_created_at', 'projects', 'created_at, id'),
+    ('ix_documentation_links_category', 'documentation_links', 'category')
+]
+
+def _upgrade_hot_filter_indexes(db):
+    with db.engine.begin() as connection:
+        for name, table, columns in HOT_FILTER_INDEXES:
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+        
+        # Keep the oldest row per user before making user_id unique
+        connection.execute(text("""
+            DELETE FROM user_data WHERE id NOT IN (
+                SELECT keep_id FROM (SELECT MIN(id) AS keep_id FROM user_data GROUP BY user_id) AS keep
+            )
+        """))
+        connection.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ux_user_data_user_id ON user_data (user_id)"))
+        
+        if db.engine.dialect.name == 'postgresql':
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_projects_technologies "
+                "ON projects USING GIN ((technologies::jsonb) jsonb_path_ops)"
+            ))
+
+def _downgrade_hot_filter_indexes(db):
+    with db.engine.begin() as connection:
+        for name in ['ix_projects_technologies', 'ux_user_data_user_id'] + [index[0] for index in HOT_FILTER_INDEXES]:
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+# Version 5: materialized counters
+def _upgrade_platform_counters(db):
+    _create_tables(PlatformCounter)(db)
+    db.rebuild_counters()
+
+# Version 6: content-addressed upload blobs
+def _upgrade_blobs(db):
+    _create_tables(Blob)(db)
+    db.rebuild_blob_refcounts()
+
+# Version 7: background job queue
+def _upgrade_jobs(db):
+    _create_tables(Job)(db)
+    with db.engine.begin() as connection:
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_jobs_status_run_after ON jobs (status, run_after)"))
+
+# Version 8: extracted document text, indexed in a new search body column
+def _upgrade_resource_texts(db):
+    _create_tables(ResourceText)(db)
+    if db.search_index.available:
+        db.search_index.recreate()
+        db.rebuild_search_index()
+    for resource_id in db.get_resources_missing_text():
+        db.enqueue_job('extract_text', {'resource_id': resource_id})
+
+# Version 9: normalized project technology index
+def _upgrade_project_technologies(db):
+    _create_tables(ProjectTechnology)(db)
+    db.rebuild_project_technologies()
+
+# Version 10: per-user project likes and an index for the "Most liked" sort
+def _upgrade_project_likes(db):
+    _create_tables(ProjectLike)(db)
+    with db.engine.begin() as connection:
+        # Keyset pagination compares likes, which NULLs would break
+        connection.execute(text("UPDATE projects SET likes = 0 WHERE likes IS NULL"))
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_projects_likes ON projects (likes, id)"))
+
+def _downgrade_project_likes(db):
+    with db.engine.begin() as connection:
+        connection.execute(text("DROP INDEX IF EXISTS ix_projects_likes"))
+    _drop_tables(ProjectLike)(db)
+
+MIGRATIONS = [
+    Migration(1, 'create_core_tables', _upgrade_core_tables,
+              _drop_tables(DocumentationLink, Resource, Project, UserData)),
+    Migration(2, 'user_item_state', _upgrade_user_item_state, _downgrade_user_item_state),
+    Migration(3, 'cache_generations', _upgrade_cache_generations, _drop_tables(CacheGeneration)),
+    Migration(4, 'hot_filter_indexes', _upgrade_hot_filter_indexes, _downgrade_hot_filter_indexes),
+    Migration(5, 'platform_counters', _upgrade_platform_counters, _drop_tables(PlatformCounter)),
+    Migration(6, 'blobs', _upgrade_blobs, _drop_tables(Blob)),
+    Migration(7, 'jobs', _upgrade_jobs, _drop_tables(Job)),
+    Migration(8, 'resource_texts', _upgrade_resource_texts, _drop_tables(ResourceText)),
+    Migration(9, 'project_technologies', _upgrade_project_technologies, _drop_tables(ProjectTechnology)),
+    Migration(10, 'project_likes', _upgrade_project_likes, _downgrade_project_likes)
+]
+
+HEAD = MIGRATIONS[-1].version
+
+def current_version(db):
+    """Get the highest applied migration version, or 0 for an empty database"""
+    SchemaMigration.__table__.create(bind=db.engine, checkfirst=True)
+    session = db.get_session()
+    try:
+        versions = [row[0] for row in session.query(SchemaMigration.version)]
+        return max(versions) if versions else 0
+    finally:
+        session.close()
+
+@contextmanager
+def migration_lock(db):
+    """Hold a database-wide lock so only one process (app replica, worker, CLI) migrates at a time.
+    
+    Postgres uses a session advisory lock. Migrations on SQLite run over several
+    pooled connections, which a BEGIN EXCLUSIVE on one of them would block, so
+    SQLite takes an flock on <database file>.lock instead. Re-entrant per thread.
+    """
+    held = getattr(_held_locks, 'urls', None)
+    if held is None:
+        held = _held_locks.urls = set()
+    if db.database_url in held:
+        yield
+        return
+    held.add(db.database_url)
+    try:
+        with _acquire_migration_lock(db):
+            yield
+    finally:
+        held.discard(db.database_url)
+
+@contextmanager
+def _acquire_migration_lock(db):
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {'id': MIGRATION_LOCK_ID})
+            connection.commit()
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {'id': MIGRATION_LOCK_ID})
+                connection.commit()
+        return
+    database = db.engine.url.database
+    if db.engine.dialect.name != 'sqlite' or not database or database == ':memory:' or not fcntl:
+        yield
+        return
+    with open(f"{database}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def upgrade(db, target=None):
+    """Apply pending migrations up to target (default: latest) and return the applied versions"""
+    target = HEAD if target is None else target
+    applied = []
+    with migration_lock(db):
+        for migration in MIGRATIONS:
+            # Re-read under the lock: another process may have applied versions meanwhile
+            if migration.version <= current_version(db) or migration.version > target:
+                continue
+            migration.upgrade(db)
+            session = db.get_session()
+            try:
+                session.add(SchemaMigration(version=migration.version, name=migration.name))
+                session.commit()
+            except IntegrityError:
+                # Already recorded, e.g. by a process that doesn't take the lock
+                session.rollback()
+                continue
+            finally:
+                session.close()
+            applied.append(migration.version)
+    return applied
+
+def downgrade(db, target=None):
+    """Revert migrations above target (default: one step back) and return the reverted versions"""
+    with migration_lock(db):
+        version = current_version(db)
+        target = max(version - 1, 0) if target is None else target
+        reverted = []
+        for migration in reversed(MIGRATIONS):
+            if migration.version > version or migration.version <= target:
+                continue
+            migration.downgrade(db)
+            session = db.get_session()
+            try:
+                session.query(SchemaMigration).filter_by(version=migration.version).delete()
+                session.commit()
+            finally:
+                session.close()
+            reverted.append(migration.version)
+    return reverted
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the V-Learn database schema")
+    parser.add_argument('command', choices=['upgrade', 'downgrade', 'current', 'history'])
+    parser.add_argument('--to', type=int, dest='target', help="Target schema version")
+    args = parser.parse_args(argv)
+    
+    db = DatabaseManager(initialize=False)
+    if args.command == 'upgrade':
+        applied = upgrade(db, args.target)
+        print(f"Applied migrations: {applied or 'none'}")
+    elif args.command == 'downgrade':
+        reverted = downgrade(db, args.target)
+        print(f"Reverted migrations: {reverted or 'none'}")
+    elif args.command == 'current':
+        print(f"Current schema version: {current_version(db)} (head: {HEAD})")
+    else:
+        version = current_version(db)
+        for migration in MIGRATIONS:
+            marker = 'x' if migration.version <= version else ' '
+            print(f"[{marker}] {migration.version:03d} {migration.name}")
+
+if __name__ == '__main__':
+    main()
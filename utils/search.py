@@ -0,0 +1,171 @@
+import re
+from sqlalchemy import text, bindparam, Integer
+from sqlalchemy.exc import OperationalError
+
+# Each indexed item type gets a small code so SQLite FTS rows can be keyed by rowid
+ITEM_TYPE_CODES = {
+    'resource': 1,
+    'project': 2,
+    'documentation': 3
+}
+
+# Column weights: title, description, author, tags, body (extracted document text)
+FIELD_WEIGHTS = (10.0, 4.0, 2.0, 2.0, 1.0)
+
+class SearchIndex:
+    """Ranked full-text index over resources, projects and documentation links.
+    
+    Uses a GIN-indexed tsvector table on PostgreSQL and an FTS5 virtual table on
+    SQLite. On any other database `available` is False and callers fall back to
+    LIKE filtering.
+    """
+    
+    def __init__(self, engine):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.available = False
+    
+    def create(self):
+        """Create the index table if it doesn't exist"""
+        try:
+            with self.engine.begin() as connection:
+                if self.dialect == 'postgresql':
+                    connection.execute(text("""
+                        CREATE TABLE IF NOT EXISTS search_documents (
+                            item_type VARCHAR(50) NOT NULL,
+                            item_id INTEGER NOT NULL,
+                            document TSVECTOR NOT NULL,
+                            PRIMARY KEY (item_type, item_id)
+                        )
+                    """))
+                    connection.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_search_documents_document "
+                        "ON search_documents USING GIN (document)"
+                    ))
+                    self.available = True
+                elif self.dialect == 'sqlite':
+                    connection.execute(text("""
+                        CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+                            item_type UNINDEXED, item_id UNINDEXED,
+                            title, description, author, tags, body,
+                            tokenize = 'unicode61 remove_diacritics 2'
+                        )
+                    """))
+                    self.available = True
+        except OperationalError as e:
+            # e.g. SQLite built without FTS5
+            print(f"Full-text search unavailable: {e}")
+            self.available = False
+        return self.available
+    
+    def recreate(self):
+        """Drop and recreate the index table, e.g. after its columns change; it must be rebuilt afterwards"""
+        table = 'search_documents' if self.dialect == 'postgresql' else 'search_fts'
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        return self.create()
+    
+    def index_item(self, connection, item_type, item_id, title, description=None, author=None, tags=None, body=None):
+        """Add or replace one item in the index using the caller's connection or session"""
+        if not self.available:
+            return
+        params = {
+            'item_type': item_type,
+            'item_id': item_id,
+            'title': title or '',
+            'description': description or '',
+            'author': author or '',
+            'tags': tags or '',
+            'body': body or ''
+        }
+        if self.dialect == 'postgresql':
+            connection.execute(text("""
+                INSERT INTO search_documents (item_type, item_id, document)
+                VALUES (:item_type, :item_id,
+                    setweight(to_tsvector('simple', :title), 'A') ||
+                    setweight(to_tsvector('simple', :description), 'B') ||
+                    setweight(to_tsvector('simple', :author), 'C') ||
+                    setweight(to_tsvector('simple', :tags), 'C') ||
+                    setweight(to_tsvector('simple', :body), 'D'))
+                ON CONFLICT (item_type, item_id) DO UPDATE SET document = EXCLUDED.document
+            """), params)
+        else:
+            params['rowid'] = self._rowid(item_type, item_id)
+            connection.execute(text("DELETE FROM search_fts WHERE rowid = :rowid"), params)
+            connection.execute(text("""
+                INSERT INTO search_fts (rowid, item_type, item_id, title, description, author, tags, body)
+                VALUES (:rowid, :item_type, :item_id, :title, :description, :author, :tags, :body)
+            """), params)
+    
+    def count(self):
+        """Number of indexed items"""
+        if not self.available:
+            return 0
+        table = 'search_documents' if self.dialect == 'postgresql' else 'search_fts'
+        with self.engine.connect() as connection:
+            return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    
+    def clear(self, connection):
+        """Remove every item from the index"""
+        if not self.available:
+            return
+        table = 'search_documents' if self.dialect == 'postgresql' else 'search_fts'
+        connection.execute(text(f"DELETE FROM {table}"))
+    
+    def search(self, query, item_types=None, limit=20):
+        """Search the index and return (item_type, item_id, rank) tuples, best match first"""
+        match = self.build_match(query)
+        if not self.available or not match:
+            return []
+        
+        stmt, params = self._match_sql(match, item_types, ranked=True)
+        params['limit'] = limit
+        with self.engine.connect() as connection:
+            rows = connection.execute(stmt, params)
+            return [(row.item_type, row.item_id, row.rank) for row in rows]
+    
+    def match_ids(self, query, item_type):
+        """Selectable of the item IDs of one type matching a query, for use in IN (...) filters"""
+        match = self.build_match(query)
+        stmt, params = self._match_sql(match, [item_type], ranked=False)
+        return stmt.bindparams(**params).columns(item_id=Integer)
+    
+    def build_match(self, query):
+        """Turn user input into a prefix-matching query for the active backend"""
+        terms = re.findall(r"\w+", (query or '').lower())
+        if not terms:
+            return None
+        if self.dialect == 'postgresql':
+            return ' & '.join(f"{term}:*" for term in terms)
+        return ' '.join(f'"{term}"*' for term in terms)
+    
+    def _match_sql(self, match, item_types, ranked):
+        params = {'match': match}
+        type_filter = ''
+        if item_types:
+            type_filter = 'AND item_type IN :item_types'
+            params['item_types'] = list(item_types)
+        
+        if self.dialect == 'postgresql':
+            columns = "item_type, item_id, ts_rank(document, query) AS rank" if ranked else "item_id"
+            sql = f"""
+                SELECT {columns} FROM search_documents, to_tsquery('simple', :match) AS query
+                WHERE document @@ query {type_filter}
+            """
+            if ranked:
+                sql += " ORDER BY rank DESC LIMIT :limit"
+        else:
+            weights = ', '.join(str(w) for w in (0.0, 0.0) + FIELD_WEIGHTS)
+            # bm25() is lower for better matches; negate it so rank sorts like ts_rank
+            columns = f"item_type, item_id, -bm25(search_fts, {weights}) AS rank" if ranked else "item_id"
+            sql = f"SELECT {columns} FROM search_fts WHERE search_fts MATCH :match {type_filter}"
+            if ranked:
+                sql += " ORDER BY rank DESC LIMIT :limit"
+        
+        stmt = text(sql)
+        if item_types:
+            stmt = stmt.bindparams(bindparam('item_types', expanding=True))
+        return stmt, params
+    
+    def _rowid(self, item_type, item_id):
+        return item_id * 8 + ITEM_TYPE_CODES[item_type]
@@ -0,0 +1,343 @@
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+
+def fsync_directory(directory):
+    """Persist a rename by fsyncing its directory (no-op where unsupported)"""
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+class StorageBackend:
+    """Where uploaded files live. Keys are '/'-separated paths such as 'ab/cd/<sha256>'.
+    
+    stat() returns {'size', 'mtime', 'etag'} or None if the key doesn't exist.
+    """
+    
+    # Directory for spooling temporary files; None means the system default
+    temp_dir = None
+    
+    def put_stream(self, key, stream):
+        """Write a readable stream to key and return the number of bytes written"""
+        raise NotImplementedError
+    
+    def store_file(self, key, file_path):
+        """Move a local file into storage at key; the local file is consumed"""
+        with open(file_path, 'rb') as f:
+            self.put_stream(key, f)
+        os.remove(file_path)
+    
+    def get_stream(self, key, start=0, end=None, chunk_size=CHUNK_SIZE):
+        """Yield the bytes of key in chunks, optionally limited to the range [start, end)"""
+        raise NotImplementedError
+    
+    def stat(self, key):
+        raise NotImplementedError
+    
+    def exists(self, key):
+        return self.stat(key) is not None
+    
+    def touch(self, key):
+        """Reset a stored file's modification time to now"""
+        raise NotImplementedError
+    
+    def delete(self, key):
+        """Delete key; returns False if it didn't exist"""
+        raise NotImplementedError
+    
+    def move(self, key, new_key):
+        """Rename a stored file; the moved file's modification time is reset to now"""
+        raise NotImplementedError
+    
+    def iter_files(self, prefix=''):
+        """Lazily yield (key, size, mtime) for every stored file whose key starts with prefix"""
+        raise NotImplementedError
+    
+    def presign(self, key, filename=None, expires=3600):
+        """A time-limited URL browsers can fetch key from, or None if the backend can't make one"""
+        return None
+    
+    def local_path(self, key):
+        """Path of key on the local filesystem, or None for remote backends"""
+        return None
+
+class LocalStorage(StorageBackend):
+    """Files under a directory on local (or shared network) disk"""
+    
+    def __init__(self, root):
+        self.root = root
+        self.temp_dir = root
+        os.makedirs(root, exist_ok=True)
+    
+    def local_path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+    
+    def put_stream(self, key, stream):
+        # Write to a temporary file and rename so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix='.upload_', suffix='.part')
+        written = 0
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    temp_file.write(chunk)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            self.store_file(key, temp_path)
+            return written
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def store_file(self, key, file_path):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(file_path, path)
+        fsync_directory(os.path.dirname(path))
+    
+    def get_stream(self, key, start=0, end=None, chunk_size=CHUNK_SIZE):
+        with open(self.local_path(key), 'rb') as f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = f.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+    
+    def stat(self, key):
+        try:
+            stat = os.stat(self.local_path(key))
+        except FileNotFoundError:
+            return None
+        return {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'etag': f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        }
+    
+    def touch(self, key):
+        os.utime(self.local_path(key))
+    
+    def delete(self, key):
+        path = self.local_path(key)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        return True
+    
+    def move(self, key, new_key):
+        self.store_file(new_key, self.local_path(key))
+        self.touch(new_key)
+    
+    def iter_files(self, prefix=''):
+        directory, _, name_prefix = prefix.rpartition('/')
+        base = self.local_path(directory) if directory else self.root
+        if not os.path.isdir(base):
+            return
+        yield from self._scan(base, directory, name_prefix)
+    
+    def _scan(self, directory, key_dir, name_prefix=''):
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.startswith(name_prefix):
+                    continue
+                key = f"{key_dir}/{entry.name}" if key_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._scan(entry.path, key)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat()
+                    yield key, stat.st_size, stat.st_mtime
+
+# S3 clients are thread-safe and pool their HTTP connections, so one per endpoint is
+# shared by every FileHandler in the process; transfers share a bounded slot pool.
+_s3_lock = threading.Lock()
+_s3_clients = {}
+_transfer_slots = threading.BoundedSemaphore(int(os.getenv('S3_MAX_TRANSFERS', '8')))
+
+class S3Storage(StorageBackend):
+    """Files in an S3-compatible bucket (AWS S3, MinIO, ...). Requires boto3 (the s3 extra).
+    
+    Large uploads use multipart transfers with a bounded number of parallel parts,
+    and at most S3_MAX_TRANSFERS transfers run at once per process.
+    """
+    
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None):
+        from boto3.s3.transfer import TransferConfig
+        
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.endpoint_url = endpoint_url
+        self.region = region
+        max_concurrency = int(os.getenv('S3_MAX_CONCURRENCY', '4'))
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '16')) * 1024 * 1024,
+            multipart_chunksize=int(os.getenv('S3_MULTIPART_CHUNK_MB', '16')) * 1024 * 1024,
+            max_concurrency=max_concurrency,
+            use_threads=True
+        )
+        self.client = self._get_client(max_concurrency)
+    
+    def _get_client(self, max_concurrency):
+        import boto3
+        from botocore.config import Config
+        
+        key = (self.endpoint_url, self.region)
+        with _s3_lock:
+            client = _s3_clients.get(key)
+            if client is None:
+                config = Config(
+                    max_pool_connections=max(10, max_concurrency * 2),
+                    retries={'max_attempts': 5, 'mode': 'standard'}
+                )
+                client = boto3.session.Session().client(
+                    's3', endpoint_url=self.endpoint_url, region_name=self.region, config=config
+                )
+                _s3_clients[key] = client
+            return client
+    
+    def _object_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+    
+    def _storage_key(self, object_key):
+        return object_key[len(self.prefix) + 1:] if self.prefix else object_key
+    
+    def put_stream(self, key, stream):
+        counter = _CountingReader(stream)
+        with _transfer_slots:
+            self.client.upload_fileobj(counter, self.bucket, self._object_key(key), Config=self.transfer_config)
+        return counter.bytes_read
+    
+    def store_file(self, key, file_path):
+        with _transfer_slots:
+            self.client.upload_file(file_path, self.bucket, self._object_key(key), Config=self.transfer_config)
+        os.remove(file_path)
+    
+    def get_stream(self, key, start=0, end=None, chunk_size=CHUNK_SIZE):
+        params = {'Bucket': self.bucket, 'Key': self._object_key(key)}
+        if start or end is not None:
+            params['Range'] = f"bytes={start}-{'' if end is None else end - 1}"
+        body = self.client.get_object(**params)['Body']
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+    
+    def stat(self, key):
+        from botocore.exceptions import ClientError
+        
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return {
+            'size': head['ContentLength'],
+            'mtime': head['LastModified'].timestamp(),
+            'etag': head['ETag']
+        }
+    
+    def touch(self, key):
+        # Copying an object onto itself with replaced metadata resets LastModified
+        object_key = self._object_key(key)
+        self.client.copy_object(
+            Bucket=self.bucket, Key=object_key,
+            CopySource={'Bucket': self.bucket, 'Key': object_key},
+            Metadata={'touched': datetime.utcnow().isoformat()}, MetadataDirective='REPLACE'
+        )
+    
+    def delete(self, key):
+        if not self.exists(key):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        return True
+    
+    def move(self, key, new_key):
+        with _transfer_slots:
+            self.client.copy(
+                {'Bucket': self.bucket, 'Key': self._object_key(key)},
+                self.bucket, self._object_key(new_key), Config=self.transfer_config
+            )
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+    
+    def iter_files(self, prefix=''):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(prefix)):
+            for item in page.get('Contents', []):
+                yield self._storage_key(item['Key']), item['Size'], item['LastModified'].timestamp()
+    
+    def presign(self, key, filename=None, expires=3600):
+        params = {'Bucket': self.bucket, 'Key': self._object_key(key)}
+        if filename:
+            params['ResponseContentDisposition'] = f'attachment; filename="{filename}"'
+        return self.client.generate_presigned_url('get_object', Params=params, ExpiresIn=expires)
+
+class _CountingReader:
+    """Count the bytes read through a stream"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+    
+    def read(self, size=-1):
+        chunk = self.stream.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+_storage_lock = threading.Lock()
+_storages = {}
+
+def get_storage(upload_dir=None):
+    """Get the process-wide storage backend selected by STORAGE_BACKEND (local or s3)"""
+    backend = os.getenv('STORAGE_BACKEND', 'local').lower()
+    upload_dir = upload_dir or os.getenv('UPLOAD_DIR', 'uploads')
+    key = (backend, upload_dir)
+    with _storage_lock:
+        storage = _storages.get(key)
+        if storage is None:
+            if backend == 's3':
+                bucket = os.getenv('S3_BUCKET')
+                if not bucket:
+                    raise ValueError("S3_BUCKET environment variable not found")
+                storage = S3Storage(
+                    bucket,
+                    prefix=os.getenv('S3_PREFIX', ''),
+                    endpoint_url=os.getenv('S3_ENDPOINT_URL'),
+                    region=os.getenv('S3_REGION')
+                )
+            elif backend == 'local':
+                storage = LocalStorage(upload_dir)
+            else:
+                raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+            _storages[key] = storage
+        return storage
+
+def copy_to_temp_file(storage, key, suffix=''):
+    """Download a stored file to a temporary local file and return its path; the caller removes it"""
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            for chunk in storage.get_stream(key):
+                temp_file.write(chunk)
+        return temp_path
+    except BaseException:
+        os.remove(temp_path)
+        raise
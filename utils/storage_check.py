@@ -0,0 +1,130 @@
+"""Conformance checks for the upload storage backends.
+
+Each backend gets the same round trip through the StorageBackend contract
+(put_stream, ranged get_stream, stat, touch, iter_files, move, presign,
+store_file, delete) under a scratch key prefix that is removed afterwards:
+
+    python -m utils.storage_check local
+    python -m utils.storage_check s3 --bucket scratch --endpoint-url http://localhost:9000
+
+The s3 run needs boto3 (pip install '.[s3]') and credentials in the usual AWS
+environment variables. Any S3-compatible server works, e.g. a local MinIO
+(minio server /tmp/minio) or moto (python -m moto.server -p 9000). Pass
+--size-mb above S3_MULTIPART_THRESHOLD_MB to exercise multipart transfers.
+"""
+import os
+import uuid
+import shutil
+import argparse
+import tempfile
+import urllib.request
+from utils.storage import LocalStorage, S3Storage
+
+BACKENDS = ('local', 's3')
+
+def check_conformance(storage, size):
+    """Run the StorageBackend contract against a storage and return a list of failure messages"""
+    failures = []
+    
+    def check(condition, message):
+        if not condition:
+            failures.append(message)
+    
+    def read(key, start=0, end=None):
+        return b''.join(storage.get_stream(key, start, end, chunk_size=64 * 1024))
+    
+    prefix = f"storage-check/{uuid.uuid4().hex}/"
+    key = prefix + 'original'
+    new_key = prefix + 'moved/renamed'
+    # A repeating non-uniform pattern so misplaced ranges don't compare equal by accident
+    payload = (bytes(range(256)) * (size // 256 + 1))[:size]
+    
+    try:
+        check(storage.stat(key) is None and not storage.exists(key), "stat of a missing key is not None")
+        
+        with tempfile.TemporaryFile() as f:
+            f.write(payload)
+            f.seek(0)
+            written = storage.put_stream(key, f)
+        check(written == size, f"put_stream returned {written}, expected {size}")
+        info = storage.stat(key)
+        check(info is not None and info['size'] == size and info['etag'],
+              "stat after put_stream has the wrong size or no etag")
+        check(read(key) == payload, "get_stream does not return the stored bytes")
+        
+        for start, end in [(0, 10), (10, None), (size - 5, size), (size // 3, size // 3 + 1000)]:
+            check(read(key, start, end) == payload[start:end], f"get_stream range [{start}, {end}) is wrong")
+        
+        storage.touch(key)
+        touched = storage.stat(key)
+        check(touched is not None and touched['size'] == size and touched['mtime'] >= info['mtime'],
+              "touch changed the file or moved its mtime back")
+        
+        listed = {name: file_size for name, file_size, _ in storage.iter_files(prefix)}
+        check(listed == {key: size}, f"iter_files({prefix!r}) returned {sorted(listed)}")
+        
+        storage.move(key, new_key)
+        check(not storage.exists(key), "move left the old key behind")
+        check(read(new_key) == payload, "move did not carry the bytes to the new key")
+        
+        url = storage.presign(new_key, filename='check.bin', expires=60)
+        if url is not None:
+            with urllib.request.urlopen(url) as response:
+                check(response.read() == payload, "presigned URL does not return the stored bytes")
+                check('check.bin' in (response.headers.get('Content-Disposition') or ''),
+                      "presigned URL does not set the download filename")
+        
+        fd, temp_path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload[:1000])
+        storage.store_file(key, temp_path)
+        check(not os.path.exists(temp_path), "store_file did not consume the local file")
+        check(read(key) == payload[:1000], "store_file did not store the file's bytes")
+        
+        check(storage.delete(new_key), "delete of an existing key returned False")
+        check(not storage.exists(new_key), "delete left the key behind")
+        check(storage.delete(new_key) is False, "delete of a missing key did not return False")
+    finally:
+        for stored_key, _, _ in list(storage.iter_files(prefix)):
+            storage.delete(stored_key)
+    return failures
+
+def check_backend(backend, size, bucket=None, endpoint_url=None, region=None):
+    """Check one backend; local runs in a temporary directory. Returns a list of failures"""
+    if backend == 'local':
+        scratch_dir = tempfile.mkdtemp(prefix='vlearn_storage_')
+        try:
+            return check_conformance(LocalStorage(scratch_dir), size)
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    storage = S3Storage(bucket, prefix=os.getenv('S3_PREFIX', ''), endpoint_url=endpoint_url, region=region)
+    return check_conformance(storage, size)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check V-Learn upload storage backends")
+    parser.add_argument('backends', nargs='*', metavar='backend', help="local and/or s3 (default: local)")
+    parser.add_argument('--bucket', default=os.getenv('S3_BUCKET'), help="Scratch bucket for the s3 backend")
+    parser.add_argument('--endpoint-url', default=os.getenv('S3_ENDPOINT_URL'), help="e.g. a MinIO server")
+    parser.add_argument('--region', default=os.getenv('S3_REGION'))
+    parser.add_argument('--size-mb', type=float, default=1, help="Size of the test file")
+    args = parser.parse_args(argv)
+    backends = args.backends or ['local']
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"invalid backend: {backend} (choose from {', '.join(BACKENDS)})")
+    if 's3' in backends and not args.bucket:
+        parser.error("the s3 backend needs --bucket or S3_BUCKET")
+    
+    size = max(2048, int(args.size_mb * 1024 * 1024))
+    failed = False
+    for backend in backends:
+        failures = check_backend(backend, size, args.bucket, args.endpoint_url, args.region)
+        print(f"{backend}: {'OK' if not failures else f'{len(failures)} failures'}")
+        for failure in failures:
+            print(f"  FAIL {failure}")
+        failed = failed or bool(failures)
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
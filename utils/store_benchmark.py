@@ -0,0 +1,168 @@
+"""Conformance checks and a benchmark for the data backends.
+
+Each backend gets a fresh scratch store (a temporary directory for json, a
+temporary database file for sqlite) and runs the same checks and workload;
+throughput and latency percentiles are reported per operation:
+
+    python -m utils.store_benchmark json sqlite --operations 500
+    python -m utils.store_benchmark postgres --postgres-url postgresql://.../scratch
+
+The postgres run writes to the given database, so point it at a scratch one.
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from utils.data_store import get_data_store
+
+BENCHMARK_USER = 'benchmark_user'
+BACKENDS = ('json', 'sqlite', 'postgres')
+
+def check_conformance(store):
+    """Run the DataStore contract against a store and return a list of failure messages"""
+    failures = []
+    
+    def check(condition, message):
+        if not condition:
+            failures.append(message)
+    
+    link_id = store.add_documentation_link("Conformance link", "https://example.com", "A link", "Tools", 4)
+    link = next((link for link in store.load_documentation_links() if link['id'] == link_id), None)
+    check(link is not None and link['url'] == "https://example.com" and link['rating'] == 4,
+          "add_documentation_link result not returned by load_documentation_links")
+    
+    resource_id = store.add_resource("Conformance resource", "Tester", "Testing", "Link", "A resource",
+                                     content="https://example.com")
+    resource = next((resource for resource in store.load_resources() if resource['id'] == resource_id), None)
+    check(resource is not None and resource['title'] == "Conformance resource" and resource['type'] == "Link",
+          "add_resource result not returned by load_resources")
+    
+    project_id = store.add_project("Conformance project", "Tester", "Testing", "A project", technologies=["Python"])
+    project = next((project for project in store.load_projects() if project['id'] == project_id), None)
+    check(project is not None and project['technologies'] == ["Python"],
+          "add_project result not returned by load_projects")
+    
+    store.add_bookmark(resource_id)
+    store.add_bookmark(resource_id)
+    check(store.load_user_data()['bookmarks'].count(resource_id) == 1, "add_bookmark is not idempotent")
+    store.remove_bookmark(resource_id)
+    check(resource_id not in store.load_user_data()['bookmarks'], "remove_bookmark left the bookmark")
+    
+    store.add_todo(resource_id)
+    check(resource_id in store.load_user_data()['todo'], "add_todo didn't add the item")
+    store.add_completed(resource_id)
+    user_data = store.load_user_data()
+    check(resource_id in user_data['completed'] and resource_id not in user_data['todo'],
+          "add_completed didn't move the item from todo to completed")
+    store.remove_completed(resource_id)
+    store.remove_todo(resource_id)
+    user_data = store.load_user_data()
+    check(resource_id not in user_data['completed'] and resource_id not in user_data['todo'],
+          "remove_completed/remove_todo left the item")
+    
+    store.save_user_data({'bookmarks': [resource_id], 'completed': [], 'todo': [project_id]})
+    user_data = store.load_user_data()
+    check(user_data['bookmarks'] == [resource_id] and user_data['todo'] == [project_id],
+          "save_user_data result not returned by load_user_data")
+    store.save_user_data({'bookmarks': [], 'completed': [], 'todo': []})
+    return failures
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def run_workload(store, operations):
+    """Time a mixed catalog/user-state workload and return {operation: stats}"""
+    resource_ids = []
+    timings = {}
+    
+    def timed(name, call):
+        start = time.perf_counter()
+        result = call()
+        timings.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+    
+    for i in range(operations):
+        resource_ids.append(timed('add_resource', lambda: store.add_resource(
+            f"Benchmark resource {i}", "Benchmark", f"Category {i % 5}", "Link", "Benchmark workload",
+            content="https://example.com"
+        )))
+    for i in range(operations):
+        item_id = resource_ids[i]
+        timed('add_bookmark', lambda: store.add_bookmark(item_id))
+        timed('add_completed', lambda: store.add_completed(item_id))
+        if i % 2:
+            timed('remove_bookmark', lambda: store.remove_bookmark(item_id))
+    # Reads are rarer than toggles on the pages but scan every row. The database
+    # backends' catalog cache is emptied first so each read reaches the backend.
+    cache = getattr(store, 'cache', None)
+    for _ in range(max(1, operations // 10)):
+        if cache is not None:
+            cache.clear()
+        timed('load_resources', store.load_resources)
+        timed('load_user_data', store.load_user_data)
+    
+    report = {}
+    for name, samples in timings.items():
+        samples.sort()
+        total = sum(samples)
+        report[name] = {
+            'count': len(samples),
+            'ops_per_sec': len(samples) / total if total else 0.0,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p95_ms': percentile(samples, 0.95) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000
+        }
+    return report
+
+def benchmark_backend(backend, operations, postgres_url=None):
+    """Check and benchmark one backend in a scratch location; returns (failures, report)"""
+    scratch_dir = tempfile.mkdtemp(prefix=f'vlearn_{backend}_')
+    try:
+        if backend == 'json':
+            location = scratch_dir
+        elif backend == 'sqlite':
+            location = os.path.join(scratch_dir, 'benchmark.db')
+        else:
+            if not postgres_url:
+                raise ValueError("The postgres benchmark needs --postgres-url pointing at a scratch database")
+            location = postgres_url
+        store = get_data_store(backend, location, user_id=BENCHMARK_USER)
+        failures = check_conformance(store)
+        return failures, run_workload(store, operations)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and benchmark V-Learn data backends")
+    parser.add_argument('backends', nargs='*', metavar='backend',
+                        help="json, sqlite and/or postgres (default: json sqlite)")
+    parser.add_argument('--operations', type=int, default=500, help="Items written per workload phase")
+    parser.add_argument('--postgres-url', help="Scratch Postgres database for the postgres backend")
+    args = parser.parse_args(argv)
+    # argparse checks even an empty nargs='*' list against choices, so validate here
+    backends = args.backends or ['json', 'sqlite']
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"invalid backend: {backend} (choose from {', '.join(BACKENDS)})")
+    
+    failed = False
+    for backend in backends:
+        failures, report = benchmark_backend(backend, args.operations, args.postgres_url)
+        print(f"\n{backend}: {'conformance OK' if not failures else f'{len(failures)} conformance failures'}")
+        for failure in failures:
+            print(f"  FAIL {failure}")
+        failed = failed or bool(failures)
+        print(f"  {'operation':<16}{'count':>7}{'ops/sec':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name, stats in report.items():
+            print(f"  {name:<16}{stats['count']:>7}{stats['ops_per_sec']:>11.0f}"
+                  f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}")
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
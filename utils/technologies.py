@@ -0,0 +1,74 @@
+import re
+
+# Longest technology name kept, matching the project_technologies.name column
+MAX_TECHNOLOGY_LENGTH = 100
+
+# Spellings users type for the same technology, mapped to its canonical name.
+# Keys are lowercased with spaces, dots, dashes and underscores removed.
+TECHNOLOGY_ALIASES = {
+    'python': 'Python',
+    'py': 'Python',
+    'python3': 'Python',
+    'javascript': 'JavaScript',
+    'js': 'JavaScript',
+    'typescript': 'TypeScript',
+    'ts': 'TypeScript',
+    'react': 'React',
+    'reactjs': 'React',
+    'node': 'Node.js',
+    'nodejs': 'Node.js',
+    'html/css': 'HTML/CSS',
+    'html': 'HTML/CSS',
+    'css': 'HTML/CSS',
+    'sql': 'SQL',
+    'postgres': 'PostgreSQL',
+    'postgresql': 'PostgreSQL',
+    'mysql': 'MySQL',
+    'mongodb': 'MongoDB',
+    'mongo': 'MongoDB',
+    'docker': 'Docker',
+    'kubernetes': 'Kubernetes',
+    'k8s': 'Kubernetes',
+    'aws': 'AWS',
+    'amazonwebservices': 'AWS',
+    'git': 'Git',
+    'api': 'API',
+    'restapi': 'API',
+    'machinelearning': 'Machine Learning',
+    'ml': 'Machine Learning',
+    'golang': 'Go',
+    'go': 'Go',
+    'vue': 'Vue.js',
+    'vuejs': 'Vue.js',
+    'nextjs': 'Next.js',
+    'django': 'Django',
+    'flask': 'Flask',
+    'flutter': 'Flutter',
+    'tensorflow': 'TensorFlow',
+    'pytorch': 'PyTorch'
+}
+
+def _alias_key(name):
+    return re.sub(r'[\s._-]+', '', name.lower())
+
+def technology_key(name):
+    """The key a technology is indexed and filtered by; spellings of one technology share it"""
+    return canonical_technology(name).lower()
+
+def canonical_technology(name):
+    """The canonical display name for a technology as a user typed it"""
+    name = re.sub(r'\s+', ' ', (name or '').strip())[:MAX_TECHNOLOGY_LENGTH]
+    return TECHNOLOGY_ALIASES.get(_alias_key(name), name)
+
+def normalize_technologies(names):
+    """Canonicalize a list of technologies, dropping blanks and duplicates but keeping order"""
+    normalized = {}
+    for name in names or []:
+        canonical = canonical_technology(name)
+        if canonical:
+            normalized.setdefault(canonical.lower(), canonical)
+    return list(normalized.values())
+
+def parse_technologies(text):
+    """Split a comma-separated technology list as typed into a form"""
+    return normalize_technologies((text or '').split(','))
@@ -0,0 +1,149 @@
+import os
+import re
+import codecs
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Text is read and yielded in bounded pieces so a large upload never sits in memory whole
+TEXT_CHUNK_SIZE = 64 * 1024
+
+# XML namespaces used by Office Open XML documents
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DRAWING_NS = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+EXTRACTABLE_EXTENSIONS = {'txt', 'docx', 'pptx', 'xlsx', 'pdf'}
+
+def get_extension(filename):
+    return os.path.splitext(filename or '')[1].lower().lstrip('.')
+
+def can_extract(filename):
+    """Check whether text can be extracted from a file of this type"""
+    return get_extension(filename) in EXTRACTABLE_EXTENSIONS
+
+def extract_pages(file_path, filename=None):
+    """Yield the plain text of a document one page (slide, sheet row block, text chunk) at a time.
+    
+    filename decides the format and defaults to file_path, which matters for blob
+    store paths that have no extension. Unsupported formats yield nothing.
+    """
+    extension = get_extension(filename or file_path)
+    if extension == 'txt':
+        return _extract_txt(file_path)
+    if extension == 'docx':
+        return _extract_docx(file_path)
+    if extension == 'pptx':
+        return _extract_pptx(file_path)
+    if extension == 'xlsx':
+        return _extract_xlsx(file_path)
+    if extension == 'pdf':
+        return _extract_pdf(file_path)
+    return iter(())
+
+def _extract_txt(file_path):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(TEXT_CHUNK_SIZE)
+            text = decoder.decode(chunk, final=not chunk)
+            if text:
+                yield text
+            if not chunk:
+                break
+
+def _iter_elements(archive, member, tag):
+    """Stream the elements with a given tag out of one XML member of a zip archive"""
+    with archive.open(member) as stream:
+        parents = []
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag == tag:
+                yield element
+                # Detach handled elements so the partial tree stays small
+                element.clear()
+                if parents:
+                    parents[-1].remove(element)
+
+def _extract_docx(file_path):
+    with zipfile.ZipFile(file_path) as archive:
+        paragraphs = []
+        size = 0
+        for paragraph in _iter_elements(archive, 'word/document.xml', f'{WORD_NS}p'):
+            text = ''.join(node.text or '' for node in paragraph.iter(f'{WORD_NS}t'))
+            if not text:
+                continue
+            paragraphs.append(text)
+            size += len(text)
+            if size >= TEXT_CHUNK_SIZE:
+                yield '\n'.join(paragraphs)
+                paragraphs, size = [], 0
+        if paragraphs:
+            yield '\n'.join(paragraphs)
+
+def _numbered_members(archive, pattern):
+    """Archive members matching pattern (with one numeric group), in numeric order"""
+    numbered = []
+    for name in archive.namelist():
+        match = re.fullmatch(pattern, name)
+        if match:
+            numbered.append((int(match.group(1)), name))
+    return [name for _, name in sorted(numbered)]
+
+def _extract_pptx(file_path):
+    with zipfile.ZipFile(file_path) as archive:
+        for slide in _numbered_members(archive, r'ppt/slides/slide(\d+)\.xml'):
+            runs = [node.text for node in _iter_elements(archive, slide, f'{DRAWING_NS}t') if node.text]
+            if runs:
+                yield '\n'.join(runs)
+
+def _extract_xlsx(file_path):
+    with zipfile.ZipFile(file_path) as archive:
+        shared_strings = []
+        if 'xl/sharedStrings.xml' in archive.namelist():
+            for item in _iter_elements(archive, 'xl/sharedStrings.xml', f'{SHEET_NS}si'):
+                shared_strings.append(''.join(node.text or '' for node in item.iter(f'{SHEET_NS}t')))
+        
+        for sheet in _numbered_members(archive, r'xl/worksheets/sheet(\d+)\.xml'):
+            rows = []
+            size = 0
+            for row in _iter_elements(archive, sheet, f'{SHEET_NS}row'):
+                values = []
+                for cell in row.iter(f'{SHEET_NS}c'):
+                    cell_type = cell.get('t')
+                    if cell_type == 'inlineStr':
+                        values.append(''.join(node.text or '' for node in cell.iter(f'{SHEET_NS}t')))
+                        continue
+                    value = cell.find(f'{SHEET_NS}v')
+                    if value is None or value.text is None:
+                        continue
+                    if cell_type == 's':
+                        index = int(value.text)
+                        values.append(shared_strings[index] if index < len(shared_strings) else '')
+                    else:
+                        values.append(value.text)
+                if values:
+                    line = '\t'.join(values)
+                    rows.append(line)
+                    size += len(line)
+                if size >= TEXT_CHUNK_SIZE:
+                    yield '\n'.join(rows)
+                    rows, size = [], 0
+            if rows:
+                yield '\n'.join(rows)
+
+def _extract_pdf(file_path):
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        # Fail the job instead of storing no pages, which would mark the PDF done with no text
+        raise RuntimeError("pypdf is not installed; cannot extract PDF text") from e
+    # PdfReader parses pages on demand from the open file rather than loading it whole
+    with open(file_path, 'rb') as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            text = page.extract_text() or ''
+            if text.strip():
+                yield text
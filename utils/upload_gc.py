@@ -0,0 +1,144 @@
+import os
+import re
+import time
+from utils.blob_store import BLOB_ID_PREFIX, blob_key
+from utils.image_derivatives import DERIVATIVES_PREFIX
+
+QUARANTINE_DIR = '.quarantine'
+
+# Directories under uploads/ that hold derived or in-flight data rather than uploads
+SKIPPED_DIRS = {QUARANTINE_DIR, DERIVATIVES_PREFIX}
+
+BLOB_KEY_PATTERN = re.compile(r'([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})')
+
+class UploadGC:
+    """Two-phase collector for upload files that no resource or project references.
+    
+    A run quarantines unreferenced files older than the grace period by moving them
+    under .quarantine/ in storage, and deletes quarantined files once they have sat
+    there for a further grace period. Files referenced again in the meantime are
+    restored. Storage is listed lazily (os.scandir for local disk, paginated listing
+    for S3) and references are looked up in batches, so memory use doesn't grow with
+    the number of uploads. Only the legacy path references from before the blob
+    store are read up front, to match them by the file they resolve to.
+    """
+    
+    def __init__(self, db, file_handler, grace_period=None, batch_size=500):
+        self.db = db
+        self.file_handler = file_handler
+        self.storage = file_handler.storage
+        self.grace_period = (
+            grace_period if grace_period is not None
+            else float(os.getenv('UPLOAD_GC_GRACE_HOURS', '24')) * 3600
+        )
+        self.batch_size = batch_size
+        self.legacy_references = {}
+    
+    def run(self, dry_run=False):
+        """Run both phases and return a report of what was (or would be) done"""
+        report = {
+            'scanned': 0,
+            'quarantined': 0,
+            'quarantined_bytes': 0,
+            'restored': 0,
+            'deleted': 0,
+            'reclaimed_bytes': 0
+        }
+        cutoff = time.time() - self.grace_period
+        # Rows may spell a legacy path differently from UPLOAD_DIR (uploads/x, ./uploads/x,
+        # an absolute path), so they are matched by the file they resolve to. New uploads
+        # are stored as blobs, so this only holds the rows from before the blob store.
+        self.legacy_references = {}
+        for stored_path in self.db.get_legacy_file_references():
+            self.legacy_references.setdefault(os.path.realpath(stored_path), []).append(stored_path)
+        self._purge_quarantine(cutoff, report, dry_run)
+        self._quarantine_orphans(cutoff, report, dry_run)
+        return report
+    
+    def _quarantine_orphans(self, cutoff, report, dry_run):
+        files = (
+            (key, size, mtime) for key, size, mtime in self.storage.iter_files()
+            if key.split('/', 1)[0] not in SKIPPED_DIRS
+        )
+        for batch in self._batches(files):
+            report['scanned'] += len(batch)
+            referenced = self._referenced_keys([key for key, _, _ in batch])
+            for key, size, mtime in batch:
+                if key in referenced or mtime > cutoff:
+                    continue
+                report['quarantined'] += 1
+                report['quarantined_bytes'] += size
+                if not dry_run:
+                    # Moving resets the mtime, so the quarantine clock starts now
+                    self.storage.move(key, f"{QUARANTINE_DIR}/{key}")
+    
+    def _purge_quarantine(self, cutoff, report, dry_run):
+        forgotten_blobs = []
+        for batch in self._batches(self.storage.iter_files(f"{QUARANTINE_DIR}/")):
+            original_keys = {key: key[len(QUARANTINE_DIR) + 1:] for key, _, _ in batch}
+            referenced = self._referenced_keys(list(original_keys.values()))
+            for key, size, mtime in batch:
+                original_key = original_keys[key]
+                if original_key in referenced:
+                    report['restored'] += 1
+                    if not dry_run:
+                        self.storage.move(key, original_key)
+                    continue
+                if mtime > cutoff:
+                    continue
+                report['deleted'] += 1
+                report['reclaimed_bytes'] += size
+                if dry_run:
+                    continue
+                self.storage.delete(key)
+                # A blob uploaded again since it was quarantined is live at its normal key
+                file_ref = self._blob_id(original_key)
+                if file_ref and not self.storage.exists(blob_key(file_ref)):
+                    forgotten_blobs.append(file_ref)
+                    self._delete_derivatives(file_ref[len(BLOB_ID_PREFIX):], report)
+        if forgotten_blobs:
+            self.db.forget_blobs(forgotten_blobs)
+    
+    def _delete_derivatives(self, digest, report):
+        for key, size, _ in list(self.storage.iter_files(f"{DERIVATIVES_PREFIX}/{digest}_")):
+            report['reclaimed_bytes'] += size
+            self.storage.delete(key)
+    
+    def _blob_id(self, key):
+        """The blob ID stored at a storage key, or None for a legacy upload"""
+        match = BLOB_KEY_PATTERN.fullmatch(key)
+        return BLOB_ID_PREFIX + match.group(3) if match else None
+    
+    def _file_refs(self, key):
+        """The values database rows could hold for the file at a storage key.
+        
+        Returns None for a legacy upload that can't be resolved to a local path; the
+        collector leaves those alone rather than risk deleting a referenced file.
+        """
+        blob_id = self._blob_id(key)
+        if blob_id:
+            return [blob_id]
+        # Anything else is a legacy upload saved directly in the upload directory
+        local_path = self.storage.local_path(key)
+        if local_path is None:
+            return None
+        return self.legacy_references.get(os.path.realpath(local_path), [])
+    
+    def _referenced_keys(self, keys):
+        """The subset of storage keys that some row references or that can't be resolved"""
+        refs = {key: self._file_refs(key) for key in keys}
+        referenced = self.db.get_referenced_files([ref for values in refs.values() if values for ref in values])
+        return {
+            key for key, values in refs.items()
+            if values is None or any(ref in referenced for ref in values)
+        }
+    
+    def _batches(self, items):
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
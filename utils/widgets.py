@@ -0,0 +1,16 @@
+import streamlit as st
+
+def facet_selectbox(label, values, selected, key):
+    """A filter dropdown whose options show their match counts, like Programming (1,204).
+    
+    values is a list of (value, count) pairs, as returned by the facet queries.
+    """
+    counts = dict(values)
+    options = ["All"] + [value for value, _ in values]
+    # Keep the current choice selectable even when other filters leave it no matches
+    if selected not in options:
+        options.append(selected)
+    return st.selectbox(
+        label, options, key=key,
+        format_func=lambda option: option if option == "All" else f"{option} ({counts.get(option, 0):,})"
+    )
@@ -0,0 +1,130 @@
+"""Background worker for upload post-processing.
+
+Run from the project root:
+
+    python -m utils.worker                  # run until interrupted
+    python -m utils.worker --processes 4    # size of the process pool
+    python -m utils.worker --once           # drain the queue and exit
+"""
+import os
+import time
+import socket
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from utils.database import get_database_manager
+from utils.file_handler import FileHandler
+from utils.text_extraction import extract_pages
+
+def generate_thumbnails(file_ref):
+    FileHandler().derivatives.generate_all(file_ref)
+
+def extract_text(resource_id):
+    db = get_database_manager()
+    resource = db.get_resource(resource_id)
+    if not resource or not resource['file_path']:
+        return
+    with FileHandler().open_local(resource['file_path']) as file_path:
+        filename = resource['original_filename'] or file_path
+        db.store_resource_text(resource_id, extract_pages(file_path, filename))
+
+# Job kind -> handler; handlers run in pool processes and receive the job payload as kwargs
+JOB_HANDLERS = {
+    'generate_thumbnails': generate_thumbnails,
+    'extract_text': extract_text
+}
+
+def run_job(kind, payload):
+    """Run one job in a pool process"""
+    handler = JOB_HANDLERS.get(kind)
+    if handler is None:
+        raise ValueError(f"Unknown job kind: {kind}")
+    handler(**payload)
+
+def _record_failure(db, job, worker_id, error):
+    status = db.fail_job(job['id'], error, worker_id)
+    if status is None:
+        print(f"Job {job['id']} ({job['kind']}) failed after it was taken back from this worker: {error}")
+        return
+    print(f"Job {job['id']} ({job['kind']}) failed, now {status}: {error}")
+
+def run_worker(processes=None, poll_interval=None, once=False):
+    """Claim queued jobs and run them on a process pool until interrupted (or the queue drains with once)"""
+    processes = processes or int(os.getenv('WORKER_PROCESSES', str(os.cpu_count() or 1)))
+    poll_interval = poll_interval if poll_interval is not None else float(os.getenv('WORKER_POLL_INTERVAL', '2'))
+    db = get_database_manager()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+    
+    pool = ProcessPoolExecutor(max_workers=processes)
+    running = {}
+    try:
+        while True:
+            # Keep this worker's jobs fresh so other workers don't requeue them while they run
+            db.heartbeat_jobs([job['id'] for job in running.values()], worker_id)
+            db.requeue_stale_jobs(worker_id=worker_id)
+            broken = False
+            while len(running) < processes:
+                job = db.claim_job(worker_id, kinds=list(JOB_HANDLERS))
+                if job is None:
+                    break
+                try:
+                    running[pool.submit(run_job, job['kind'], job['payload'])] = job
+                except BrokenProcessPool as e:
+                    _record_failure(db, job, worker_id, e)
+                    processed += 1
+                    broken = True
+                    break
+            
+            if not running and not broken:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+            
+            done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED) if running else (set(), set())
+            for future in done:
+                job = running.pop(future)
+                try:
+                    future.result()
+                    if db.complete_job(job['id'], worker_id):
+                        print(f"Job {job['id']} ({job['kind']}) done")
+                    else:
+                        print(f"Job {job['id']} ({job['kind']}) finished after it was taken back from this worker")
+                except BrokenProcessPool as e:
+                    _record_failure(db, job, worker_id, e)
+                    broken = True
+                except Exception as e:
+                    _record_failure(db, job, worker_id, e)
+                processed += 1
+            
+            if broken:
+                # A pool process died (e.g. killed for using too much memory). Which job caused
+                # it is unknown, so every job in flight uses up an attempt and the pool is rebuilt.
+                error = BrokenProcessPool("A worker process died while running the job")
+                for job in running.values():
+                    _record_failure(db, job, worker_id, error)
+                    processed += 1
+                running.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=processes)
+                print("Worker process died; restarted the process pool")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return processed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run V-Learn background jobs")
+    parser.add_argument('--processes', type=int, help="Number of worker processes")
+    parser.add_argument('--poll-interval', type=float, help="Seconds between queue polls")
+    parser.add_argument('--once', action='store_true', help="Exit once the queue is empty")
+    args = parser.parse_args(argv)
+    
+    try:
+        processed = run_worker(args.processes, args.poll_interval, args.once)
+        print(f"Processed {processed} jobs")
+    except KeyboardInterrupt:
+        print("Worker stopped")
+
+if __name__ == '__main__':
+    main()